@@ -1,7 +1,7 @@
 # inventory_management/inventory/admin.py
 
 from django.contrib import admin
-from .models import InventoryItem, Location, Project, InventoryLog, UIDCategorySequence, InventoryDocument, ItemCategory,DocumentTag,ItemStatus
+from .models import InventoryItem, Location, Project, InventoryLog, UIDCategorySequence, InventoryDocument, ItemCategory,DocumentTag,ItemStatus,InventoryCounter,ImportJob,ExportJob
 
 # Register your models here.
 
@@ -26,11 +26,29 @@ class ItemCategoryAdmin(admin.ModelAdmin):
 # Register UIDCategorySequence model
 @admin.register(UIDCategorySequence)
 class UIDCategorySequenceAdmin(admin.ModelAdmin):
-    list_display = ('category_prefix', 'year_month', 'last_sequence_number')
-    search_fields = ('category_prefix', 'year_month')
-    list_filter = ('year_month',)
+    list_display = ('category_prefix', 'day', 'last_sequence_number')
+    search_fields = ('category_prefix', 'day')
+    list_filter = ('day',)
     readonly_fields = ('last_sequence_number',) # Sequence number is auto-managed
 
+@admin.register(InventoryCounter)
+class InventoryCounterAdmin(admin.ModelAdmin):
+    list_display = ('dimension', 'key', 'count')
+    list_filter = ('dimension',)
+    readonly_fields = ('dimension', 'key', 'count') # Maintained by signals; repair with `manage.py recount`
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'original_name', 'kind', 'status', 'processed_rows', 'total_rows', 'error_count', 'created_by', 'created_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('processed_rows', 'total_rows', 'error_count', 'errors', 'error_sheet', 'result', 'started_at', 'finished_at') # Written by the import worker
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'format', 'status', 'row_count', 'size', 'created_by', 'created_at', 'last_used_at')
+    list_filter = ('status', 'format')
+    readonly_fields = ('signature', 'params', 'file', 'size', 'row_count', 'data_updated_at', 'data_count', 'data_versions', 'error', 'started_at', 'finished_at', 'last_used_at') # Written by the export worker
+
 @admin.register(InventoryItem)
 class InventoryItemAdmin(admin.ModelAdmin):
     # Added 'category' to list_display
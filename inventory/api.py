@@ -0,0 +1,144 @@
+# inventory_management/inventory/api.py
+
+"""
+JSON API for the dashboard table.
+
+``GET /inventory/api/items/`` returns only the requested ``fields`` (read
+with ``.values()``, so no model instances are built), sorted by one of the
+index-backed columns in ``SORTS``, in keyset chunks of up to ``MAX_LIMIT``
+rows. Follow ``next`` / ``previous`` to scroll; each chunk costs the same
+however deep into the table it is. Besides the FilterForm filters,
+``uid_prefix`` and ``received_from`` / ``received_to`` (ISO dates) narrow by
+the UID's parts, e.g. every laptop received this week.
+
+``GET /inventory/api/items/facets/`` takes the same filters and returns how
+many items each category/location/project/status choice would match.
+
+``GET /inventory/api/items/suggest/?q=...`` returns the closest serial / UID /
+name matches for a possibly mistyped value.
+"""
+
+from django.db.models import F
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from . import facets, fuzzy
+from .forms import FilterForm
+from .models import InventoryItem
+from .pagination import InvalidCursor, KeysetPaginator
+from .querysets import apply_filters
+
+# Public field name -> ORM path. Related names are flattened so no join is
+# made unless a client asks for them.
+ITEM_FIELDS = {
+    'id': 'id',
+    'item_name': 'item_name',
+    'uid_no': 'uid_no',
+    'uid_prefix': 'uid_prefix',
+    'uid_date': 'uid_date',
+    'uid_seq': 'uid_seq',
+    'serial_number': 'serial_number',
+    'quantity': 'quantity',
+    'price': 'price',
+    'status': 'status',
+    'description': 'description',
+    'invoice_number': 'invoice_number',
+    'owner_poc': 'owner_poc',
+    'category_id': 'category_id',
+    'category_name': 'category__name',
+    'location_id': 'location_id',
+    'location_name': 'location__name',
+    'project_id': 'project_id',
+    'project_name': 'project__name',
+    'last_transfer_date': 'last_transfer_date',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+DEFAULT_FIELDS = ['id', 'item_name', 'uid_no', 'serial_number', 'quantity', 'status', 'location_name']
+
+# Sortable columns; each has a unique or (column, id) index on InventoryItem.
+SORTS = ['item_name', 'uid_no', 'serial_number', 'status', 'quantity', 'created_at', 'updated_at']
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+MAX_SUGGESTIONS = 20
+
+
+def _parse_fields(raw):
+    if not raw:
+        return DEFAULT_FIELDS, []
+    requested = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in ITEM_FIELDS]
+    return requested, unknown
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def item_list(request):
+    fields, unknown = _parse_fields(request.GET.get('fields'))
+    if unknown:
+        return Response(
+            {'error': f"Unknown field(s): {', '.join(unknown)}.", 'allowed': list(ITEM_FIELDS)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    sort = request.GET.get('sort', 'item_name')
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in SORTS:
+        return Response({'error': f"Cannot sort by '{sort}'.", 'allowed': SORTS}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return Response({'error': "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+    filter_form = FilterForm(request.GET)
+    if not filter_form.is_valid():
+        return Response({'errors': filter_form.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    items = apply_filters(InventoryItem.objects.filter(is_deleted=False), filter_form.cleaned_data)
+
+    # id and the sort column ride along (under their own names) to build cursors.
+    columns = {name: F(ITEM_FIELDS[name]) for name in fields if name != ITEM_FIELDS[name]}
+    plain = [name for name in fields if name == ITEM_FIELDS[name]]
+    rows = items.values(*dict.fromkeys(plain + ['id', sort]), **columns)
+
+    paginator = KeysetPaginator(rows, sort, descending, limit)
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        return Response({'error': "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'results': [{name: row[name] for name in fields} for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+        'sort': ('-' if descending else '') + sort,
+        'fields': fields,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def item_facets(request):
+    filter_form = FilterForm(request.GET)
+    if not filter_form.is_valid():
+        return Response({'errors': filter_form.errors}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(facets.facet_counts(filter_form.cleaned_data))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def item_suggestions(request):
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return Response({'error': "q is required."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.GET.get('limit', 5)), 1), MAX_SUGGESTIONS)
+    except ValueError:
+        return Response({'error': "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'query': query, 'results': fuzzy.suggest(query, limit)})
@@ -0,0 +1,33 @@
+# inventory_management/inventory/bulk.py
+
+"""
+Bulk item creation.
+
+``bulk_create`` skips ``save()`` and the post_save signals, so
+``create_items`` does their work for the whole batch: UIDs are reserved a
+block per category prefix, and the search index, dashboard counters, facet
+cache and trigram index are updated once for all the new rows.
+"""
+
+from django.db import transaction
+
+from . import counters, facets, fuzzy, search, uids
+from .models import InventoryItem
+
+BATCH_SIZE = 500
+
+
+def create_items(items, batch_size=BATCH_SIZE):
+    """Inserts unsaved InventoryItems in batches; returns them with pks and UIDs set."""
+    items = list(items)
+    if not items:
+        return items
+    with transaction.atomic():
+        uids.assign_uids(items)
+        InventoryItem.objects.bulk_create(items, batch_size=batch_size)
+        counters.items_created(items)
+    search.index_items([item.pk for item in items])
+    facets.invalidate()
+    for item in items:
+        fuzzy.item_changed(item)
+    return items
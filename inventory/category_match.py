@@ -0,0 +1,157 @@
+# inventory_management/inventory/category_match.py
+
+"""
+Guesses an item's category from free text (descriptions, OCR lines).
+
+Every ``ItemCategory`` name, plus the synonyms in
+``INVENTORY_CATEGORY_SYNONYMS``, is compiled into one Aho-Corasick automaton,
+so a text is scanned once however many categories exist. A keyword only
+counts where it starts a word ("cable" matches "Cables", "ram" doesn't match
+"program"); of several hits the leftmost wins, then the longest.
+
+The compiled matcher is kept per process. Category saves and deletes drop it
+straight away in the process that made them and bump the 'categories'
+LookupVersion, which other processes (the import worker, other web workers)
+check at most every ``RECHECK_SECONDS``.
+"""
+
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+from django.conf import settings
+
+from . import lookups
+from .models import ItemCategory
+
+VERSION_NAME = 'categories'
+
+RECHECK_SECONDS = 5
+
+
+class Automaton:
+    """A plain Aho-Corasick automaton over lower-cased keywords."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]  # per state: [(keyword length, value)]
+
+    def add(self, keyword, value):
+        state = 0
+        for char in keyword:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        if not any(length == len(keyword) for length, _ in self.out[state]):
+            self.out[state].append((len(keyword), value))
+
+    def build(self):
+        """Computes the failure links; call once after the last add()."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                # A state also reports every keyword that ends at its failure state.
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def matches(self, text):
+        """Yields ``(start, length, value)`` for every keyword occurrence in ``text``."""
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, value in self.out[state]:
+                yield end - length + 1, length, value
+
+
+class CategoryMatcher:
+    def __init__(self, categories, synonyms=None):
+        self.names = {cat.id: cat.name for cat in categories}
+        by_name = {name.lower(): pk for pk, name in self.names.items()}
+        self.other_id = by_name.get('other')
+
+        self.automaton = Automaton()
+        for name, pk in by_name.items():
+            self.automaton.add(name, pk)
+        for name, keywords in (synonyms or {}).items():
+            pk = by_name.get(name.lower())
+            if pk is None:
+                continue
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if keyword:
+                    self.automaton.add(keyword, pk)
+        self.automaton.build()
+
+    def match(self, text):
+        """The id of the category ``text`` mentions, or None."""
+        if not text or not isinstance(text, str):
+            return None
+        text = text.lower()
+        best = None
+        for start, length, pk in self.automaton.matches(text):
+            if start and text[start - 1].isalnum():
+                continue
+            if best is None or (start, -length) < (best[0], -best[1]):
+                best = (start, length, pk)
+        return best[2] if best else None
+
+    def match_name(self, text, default='Other'):
+        """Like match(), but the category name, or ``default``."""
+        return self.names.get(self.match(text), default)
+
+    def match_many(self, series):
+        """
+        A Series of category ids (None where nothing matched) for a column of
+        texts. Each distinct value is scanned once.
+        """
+        texts = series.astype(object).where(series.notna(), None)
+        found = {text: self.match(text) for text in pd.unique(texts)}
+        return pd.Series([found[text] for text in texts], index=series.index, dtype=object)
+
+
+_lock = threading.Lock()
+_matcher = None
+_version = None
+_checked_at = 0.0
+
+
+def _current_version():
+    return lookups.current_versions([VERSION_NAME])[VERSION_NAME].version
+
+
+def matcher():
+    """The process's CategoryMatcher, rebuilt when categories have changed."""
+    global _matcher, _version, _checked_at
+    with _lock:
+        now = time.monotonic()
+        if _matcher is not None and now - _checked_at < RECHECK_SECONDS:
+            return _matcher
+        version = _current_version()
+        _checked_at = now
+        if _matcher is None or version != _version:
+            synonyms = getattr(settings, 'INVENTORY_CATEGORY_SYNONYMS', {})
+            _matcher = CategoryMatcher(ItemCategory.objects.only('id', 'name'), synonyms)
+            _version = version
+        return _matcher
+
+
+def invalidate():
+    """Drops this process's matcher and tells the others to rebuild theirs."""
+    global _matcher
+    with _lock:
+        _matcher = None
+    lookups.bump(VERSION_NAME)
@@ -0,0 +1,109 @@
+# inventory_management/inventory/counters.py
+
+"""
+Maintained item counts for the dashboard.
+
+Every active item contributes 1 to the 'total' counter and to one counter
+per dimension (its status, location, category and project). Writes apply
+the difference between an item's contribution before and after the change,
+so reads never have to COUNT(*) the inventory table.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import InventoryCounter, InventoryItem
+
+# dimension -> InventoryItem attribute holding its key
+DIMENSIONS = {
+    'status': 'status',
+    'location': 'location_id',
+    'category': 'category_id',
+    'project': 'project_id',
+}
+SNAPSHOT_FIELDS = ['is_deleted'] + list(DIMENSIONS.values())
+
+
+def _key(value):
+    return '' if value is None else str(value)
+
+
+def contribution(state):
+    """Counter keys an item with the given field ``state`` adds 1 to."""
+    if state is None or state.get('is_deleted'):
+        return Counter()
+    keys = Counter({('total', ''): 1})
+    for dimension, attname in DIMENSIONS.items():
+        keys[(dimension, _key(state.get(attname)))] += 1
+    return keys
+
+
+def snapshot(item):
+    """Current counter-relevant field values, or None if any are deferred."""
+    values = item.__dict__
+    if any(attname not in values for attname in SNAPSHOT_FIELDS):
+        return None
+    return {attname: values[attname] for attname in SNAPSHOT_FIELDS}
+
+
+def load_snapshot(pk):
+    return InventoryItem.objects.filter(pk=pk).values(*SNAPSHOT_FIELDS).first()
+
+
+def apply(deltas):
+    """Adds each non-zero delta in ``deltas`` to its counter row."""
+    with transaction.atomic():
+        for (dimension, key), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            rows = InventoryCounter.objects.filter(dimension=dimension, key=key)
+            if rows.update(count=F('count') + delta):
+                continue
+            _, created = InventoryCounter.objects.get_or_create(
+                dimension=dimension, key=key, defaults={'count': delta}
+            )
+            if not created:
+                rows.update(count=F('count') + delta)
+
+
+def item_changed(before, after):
+    deltas = contribution(after)
+    deltas.subtract(contribution(before))
+    apply(deltas)
+
+
+def items_created(items):
+    """For bulk_create paths, which don't send post_save."""
+    deltas = Counter()
+    for item in items:
+        deltas.update(contribution(snapshot(item)))
+    apply(deltas)
+
+
+def total():
+    row = InventoryCounter.objects.filter(dimension='total', key='').values_list('count', flat=True).first()
+    return row or 0
+
+
+def breakdown(dimension):
+    """{key: count} for one dimension, skipping empty counters."""
+    return dict(
+        InventoryCounter.objects.filter(dimension=dimension, count__gt=0)
+        .order_by('key').values_list('key', 'count')
+    )
+
+
+def recount():
+    """Rebuilds every counter from the inventory table; returns the new total."""
+    active = InventoryItem.objects.filter(is_deleted=False)
+    rows = [InventoryCounter(dimension='total', key='', count=active.count())]
+    for dimension, attname in DIMENSIONS.items():
+        for value, count in active.order_by().values_list(attname).annotate(n=Count('id')):
+            rows.append(InventoryCounter(dimension=dimension, key=_key(value), count=count))
+
+    with transaction.atomic():
+        InventoryCounter.objects.all().delete()
+        InventoryCounter.objects.bulk_create(rows)
+    return rows[0].count
@@ -0,0 +1,271 @@
+# inventory_management/inventory/export_jobs.py
+
+"""
+Background inventory exports with reusable artifacts.
+
+An export request is normalised (``normalise``) and hashed into a
+signature. If a finished ``ExportJob`` with that signature exists and the
+exported items haven't changed since it was built, the file it left on disk
+is served as is. Whether they have changed is judged by the items' latest
+``updated_at`` plus their count (the count catches purged items, which leave
+no newer timestamp behind) plus the versions of the lists whose names the
+export shows (``RELATED_LOOKUPS``: renaming a location changes every row in
+it without touching the items). Otherwise a job is queued, or an identical
+one already in progress is shared, and the browser polls
+``export_job_status`` until the download link appears.
+
+The stamp is taken when a worker claims the job, before the rows are read,
+so an item edited during a build makes that artifact stale rather than
+wrongly fresh. It is saved together with the 'running' status, so an
+identical request made while the build is under way finds and shares it.
+
+Jobs are claimed from the ExportJob table the same way import jobs are (see
+inventory.import_jobs) and run by ``manage.py run_export_jobs``, or, with
+``INVENTORY_EXPORT_JOBS_IN_PROCESS`` on, inside the web process. After each
+build, and on every worker poll, ``evict()`` removes artifacts older than
+``INVENTORY_EXPORT_CACHE_TTL``, artifacts replaced by a newer build of the
+same export, and then the least recently downloaded ones until the total is
+under ``INVENTORY_EXPORT_CACHE_MAX_BYTES``.
+"""
+
+import hashlib
+import json
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from . import exports, lookups
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+def worker_threads():
+    return getattr(settings, 'INVENTORY_EXPORT_WORKER_THREADS', 1)
+
+
+def normalise(data):
+    """
+    The canonical parameters of an export request (a QueryDict or dict):
+    the format name and the sorted, de-duplicated item ids, or None for the
+    whole inventory. Raises exports.UnavailableFormat for a bad format.
+    """
+    export_format = exports.get_format(data.get('format'))
+    raw_ids = data.get('item_ids') or ''
+    if isinstance(raw_ids, str):
+        raw_ids = raw_ids.split(',')
+    item_ids = sorted({int(item_id) for item_id in raw_ids if str(item_id).strip().isdigit()})
+    return {'format': export_format.extension, 'item_ids': item_ids or None}
+
+
+def signature(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _items(params):
+    return exports.export_items(params.get('item_ids'))
+
+
+# LookupVersion names (see inventory.lookups) of what ITEM_COLUMNS shows
+# besides the items' own fields: category, location, project and creator
+# names, and kit names and membership.
+RELATED_LOOKUPS = ('categories', 'locations', 'projects', 'users', 'kits')
+
+
+def data_stamp(params):
+    """
+    ``(latest updated_at, count, related versions)`` of the items an export
+    of ``params`` covers.
+    """
+    stamp = _items(params).order_by().aggregate(latest=Max('updated_at'), count=Count('id'))
+    versions = lookups.current_versions(RELATED_LOOKUPS)
+    related = ';'.join(f'{name}={versions[name].version}' for name in RELATED_LOOKUPS)
+    return stamp['latest'], stamp['count'], related
+
+
+def _same_data(latest, count, related):
+    return Q(data_count=count, data_versions=related) & (
+        Q(data_updated_at=latest) if latest else Q(data_updated_at__isnull=True)
+    )
+
+
+def _has_file(job):
+    return bool(job.file) and job.file.storage.exists(job.file.name)
+
+
+def fresh_artifact(params):
+    """The finished job whose file matches the items as they are now, or None."""
+    jobs = ExportJob.objects.filter(_same_data(*data_stamp(params)), signature=signature(params), status='done')
+    for job in jobs.order_by('-finished_at', '-id')[:3]:
+        if _has_file(job):
+            return job
+    return None
+
+
+def request_export(params, user):
+    """
+    The job answering an export of ``params``. Returns ``(job, created)``: a
+    fresh artifact, a queued job (which will read the data as it is when it
+    runs) or a running one over unchanged data is reused; otherwise a new
+    job is queued.
+    """
+    user = user if user and user.is_authenticated else None
+    digest = signature(params)
+    jobs = ExportJob.objects.filter(signature=digest).filter(
+        Q(status='queued') | (Q(status__in=['running', 'done']) & _same_data(*data_stamp(params)))
+    )
+    for job in jobs.order_by('-created_at', '-id')[:3]:
+        if job.status != 'done' or _has_file(job):
+            return job, False
+
+    job = ExportJob.objects.create(signature=digest, params=params, format=params['format'], created_by=user)
+    if getattr(settings, 'INVENTORY_EXPORT_JOBS_IN_PROCESS', False):
+        transaction.on_commit(lambda: _executor().submit(_run_pending_in_thread))
+    return job, True
+
+
+_executor_lock = threading.Lock()
+_pool = None
+
+
+def _executor():
+    global _pool
+    with _executor_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=worker_threads(), thread_name_prefix='export-job')
+        return _pool
+
+
+def _run_pending_in_thread():
+    close_old_connections()
+    try:
+        run_pending()
+    finally:
+        close_old_connections()
+
+
+def claim_next():
+    """
+    Marks the oldest queued job as running, stamped with the data it is about
+    to export, and returns it, or None if the queue is empty.
+    """
+    for job in ExportJob.objects.filter(status='queued').order_by('created_at', 'id')[:10]:
+        data_updated_at, data_count, data_versions = data_stamp(job.params)
+        claimed = ExportJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running', started_at=timezone.now(),
+            data_updated_at=data_updated_at, data_count=data_count, data_versions=data_versions,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run_pending():
+    """Runs queued jobs until the queue is empty; returns how many ran."""
+    count = 0
+    while True:
+        job = claim_next()
+        if job is None:
+            return count
+        run(job)
+        count += 1
+
+
+def fail_stale(max_age_seconds=None):
+    """Marks jobs left 'running' by a worker that died as failed."""
+    max_age = max_age_seconds or getattr(settings, 'INVENTORY_EXPORT_JOB_TIMEOUT', 60 * 60)
+    return ExportJob.objects.filter(
+        status='running', started_at__lt=timezone.now() - timedelta(seconds=max_age)
+    ).update(status='failed', finished_at=timezone.now(), error='The export worker stopped.')
+
+
+def run(job):
+    """Builds one claimed job's file, recording the outcome on the row."""
+    try:
+        export_format = exports.get_format(job.format)
+        with tempfile.TemporaryFile() as fileobj:
+            job.row_count = exports.write_file(
+                export_format, fileobj, _items(job.params), exports.ITEM_COLUMNS, sheet_name='Inventory Data'
+            )
+            fileobj.seek(0)
+            job.file.save(f"inventory_data_{job.pk}.{export_format.extension}", File(fileobj), save=False)
+        job.size = job.file.size
+        job.status = 'done'
+    except Exception as e:
+        logger.exception(f"Export job {job.pk} failed")
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = job.last_used_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'file', 'size', 'row_count', 'error', 'finished_at', 'last_used_at',
+    ])
+    evict()
+    return job
+
+
+def _discard(job):
+    if job.file:
+        job.file.delete(save=False)
+    job.delete()
+
+
+def evict(max_age_seconds=None, max_bytes=None):
+    """
+    Removes expired, superseded and, past the size budget, least recently
+    used artifacts (files and rows); returns how many jobs went.
+    """
+    max_age = max_age_seconds or getattr(settings, 'INVENTORY_EXPORT_CACHE_TTL', 24 * 60 * 60)
+    budget = max_bytes or getattr(settings, 'INVENTORY_EXPORT_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+    removed = 0
+
+    for job in ExportJob.objects.filter(
+        status__in=['done', 'failed'], finished_at__lt=timezone.now() - timedelta(seconds=max_age)
+    ):
+        _discard(job)
+        removed += 1
+
+    # Only the newest build of each export can still match the data.
+    seen = set()
+    for job in ExportJob.objects.filter(status='done').order_by('signature', '-finished_at', '-id'):
+        if job.signature in seen:
+            _discard(job)
+            removed += 1
+        seen.add(job.signature)
+
+    total = ExportJob.objects.filter(status='done').aggregate(total=Sum('size'))['total'] or 0
+    if total > budget:
+        for job in ExportJob.objects.filter(status='done').order_by('last_used_at', 'id'):
+            if total <= budget:
+                break
+            total -= job.size
+            _discard(job)
+            removed += 1
+    return removed
+
+
+def touch(job):
+    """Records a download, for the size-based eviction."""
+    job.last_used_at = timezone.now()
+    ExportJob.objects.filter(pk=job.pk).update(last_used_at=job.last_used_at)
+
+
+def summary(job):
+    """The JSON the status endpoint returns."""
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'format': job.format,
+        'row_count': job.row_count,
+        'size': job.size,
+        'error': job.error,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -0,0 +1,307 @@
+# inventory_management/inventory/exports.py
+
+"""
+Streaming inventory exports.
+
+An export is a queryset, a list of ``Column``s (header, ORM field path,
+display function) and a format. ``export_rows`` reads the columns' fields with
+``values_list().iterator(chunk_size=CHUNK_SIZE)``, so no model instances are
+built and the joins happen in SQL; kit names, being many-to-many, are
+fetched with one query per chunk. Memory stays flat whatever the row count.
+
+Formats (``FORMATS``):
+
+* ``csv`` and ``jsonl`` stream straight into a ``StreamingHttpResponse``.
+* ``xlsx`` runs xlsxwriter in ``constant_memory`` mode, which flushes every
+  row as it is written, into a temporary file sent with ``FileResponse``.
+  Past Excel's row limit the rows continue on a further sheet.
+* ``parquet`` goes through pandas and pyarrow a chunk at a time into a
+  temporary file; it is only offered when pyarrow is installed.
+"""
+
+import csv
+import importlib.util
+import json
+import tempfile
+from itertools import islice
+
+import xlsxwriter
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, StreamingHttpResponse
+
+from .models import InventoryItem, Kit
+
+CHUNK_SIZE = 2000
+
+# Not a values_list field: kit names are looked up per chunk.
+KITS = 'kits'
+
+
+class Column:
+    def __init__(self, header, field, display=None, kind='text'):
+        self.header = header
+        self.field = field
+        self.display = display
+        self.kind = kind  # 'text', 'int' or 'decimal', for typed formats
+
+
+def _or_na(value):
+    return value if value else 'N/A'
+
+
+def _timestamp(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def _timestamp_or_na(value):
+    return _timestamp(value) or 'N/A'
+
+
+_STATUS_LABELS = dict(InventoryItem.STATUS_CHOICES)
+
+
+def _status(value):
+    return _STATUS_LABELS.get(value, value)
+
+
+# The full inventory export.
+ITEM_COLUMNS = [
+    Column('UID No', 'uid_no'),
+    Column('Item Name', 'item_name'),
+    Column('Description', 'description'),
+    Column('Serial Number', 'serial_number'),
+    Column('Quantity', 'quantity', kind='int'),
+    Column('Price', 'price', kind='decimal'),
+    Column('Category', 'category__name', _or_na),
+    Column('Status', 'status', _status),
+    Column('Location', 'location__name', _or_na),
+    Column('Project', 'project__name', _or_na),
+    Column('Kit', KITS, lambda names: ', '.join(names) or 'N/A'),
+    Column('Created By', 'created_by__username', lambda value: value or ''),
+    Column('Created At', 'created_at', _timestamp),
+]
+
+# The dashboard's "export selected" download.
+SELECTED_ITEM_COLUMNS = [
+    Column('Item Name', 'item_name'),
+    Column('UID No', 'uid_no'),
+    Column('Serial Number', 'serial_number', _or_na),
+    Column('Quantity', 'quantity', kind='int'),
+    Column('Location', 'location__name', _or_na),
+    Column('Project', 'project__name', _or_na),
+    Column('Status', 'status', _status),
+    Column('Description', 'description', _or_na),
+    Column('Date Added', 'created_at', _timestamp_or_na),
+    Column('Created At', 'created_at', _timestamp_or_na),
+    Column('Updated At', 'updated_at', _timestamp_or_na),
+]
+
+# The audit log export.
+LOG_COLUMNS = [
+    Column('Timestamp', 'timestamp', _timestamp),
+    Column('User', 'user__username', _or_na),
+    Column('Action', 'action'),
+    Column('Item', 'inventory_item__item_name', _or_na),
+    Column('UID Number', 'uid_number', _or_na),
+    Column('Details', 'details'),
+]
+
+
+def export_items(item_ids=None):
+    """Items to export: all of them, or just ``item_ids``."""
+    items = InventoryItem.objects.all()
+    if item_ids is not None:
+        items = items.filter(id__in=item_ids)
+    return items.order_by('item_name', 'id')
+
+
+def _kit_names(item_ids):
+    names = {}
+    memberships = (
+        Kit.items.through.objects.filter(inventoryitem_id__in=item_ids)
+        .order_by('kit__name').values_list('inventoryitem_id', 'kit__name')
+    )
+    for item_id, name in memberships:
+        names.setdefault(item_id, []).append(name)
+    return names
+
+
+def export_rows(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Yields one list of display values per object, reading ``chunk_size`` rows at a time."""
+    fields = [column.field for column in columns if column.field != KITS]
+    wants_kits = any(column.field == KITS for column in columns)
+    values = queryset.values_list('id', *fields).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(values, chunk_size))
+        if not chunk:
+            return
+        kits = _kit_names([row[0] for row in chunk]) if wants_kits else {}
+        for row in chunk:
+            raw = iter(row[1:])
+            out = []
+            for column in columns:
+                value = kits.get(row[0], []) if column.field == KITS else next(raw)
+                out.append(column.display(value) if column.display else value)
+            yield out
+
+
+class _Echo:
+    """A write-only file that hands back what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+class CsvFormat:
+    extension = 'csv'
+    content_type = 'text/csv'
+    streaming = True
+
+    def available(self):
+        return True
+
+    def stream(self, columns, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow([column.header for column in columns])
+        for row in rows:
+            yield writer.writerow(row)
+
+
+class JsonLinesFormat:
+    extension = 'jsonl'
+    content_type = 'application/x-ndjson'
+    streaming = True
+
+    def available(self):
+        return True
+
+    def stream(self, columns, rows):
+        headers = [column.header for column in columns]
+        for row in rows:
+            yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+class XlsxFormat:
+    extension = 'xlsx'
+    content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    streaming = False
+
+    # Excel's limit per worksheet, header included.
+    MAX_ROWS = 1048576
+
+    def available(self):
+        return True
+
+    def write(self, fileobj, columns, rows, sheet_name='Sheet1'):
+        workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True})
+        bold = workbook.add_format({'bold': True})
+        headers = [column.header for column in columns]
+        worksheet, number, sheets = None, self.MAX_ROWS, 0
+        for row in rows:
+            if number == self.MAX_ROWS:
+                sheets += 1
+                worksheet = workbook.add_worksheet(sheet_name if sheets == 1 else f"{sheet_name} ({sheets})")
+                worksheet.write_row(0, 0, headers, bold)
+                number = 1
+            worksheet.write_row(number, 0, row)
+            number += 1
+        if worksheet is None:
+            workbook.add_worksheet(sheet_name).write_row(0, 0, headers, bold)
+        workbook.close()
+
+
+class ParquetFormat:
+    extension = 'parquet'
+    content_type = 'application/vnd.apache.parquet'
+    streaming = False
+
+    def available(self):
+        return importlib.util.find_spec('pyarrow') is not None
+
+    def write(self, fileobj, columns, rows, sheet_name=None):
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {'text': pa.string(), 'int': pa.int64(), 'decimal': pa.decimal128(10, 2)}
+        schema = pa.schema([(column.header, types[column.kind]) for column in columns])
+        headers = [column.header for column in columns]
+        writer = pq.ParquetWriter(fileobj, schema)
+        try:
+            # One row group per chunk, so only a chunk is held in memory.
+            while True:
+                chunk = list(islice(rows, CHUNK_SIZE))
+                if not chunk:
+                    break
+                frame = pd.DataFrame(chunk, columns=headers)
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        finally:
+            writer.close()
+
+
+FORMATS = {
+    'xlsx': XlsxFormat(),
+    'csv': CsvFormat(),
+    'jsonl': JsonLinesFormat(),
+    'parquet': ParquetFormat(),
+}
+
+
+class UnavailableFormat(Exception):
+    pass
+
+
+def get_format(name):
+    """The export format called ``name``; UnavailableFormat if unknown or missing its library."""
+    export_format = FORMATS.get((name or 'xlsx').lower())
+    if export_format is None:
+        raise UnavailableFormat(f"Unknown export format '{name}'. Choose one of: {', '.join(FORMATS)}.")
+    if not export_format.available():
+        raise UnavailableFormat(f"{export_format.extension} export needs pyarrow, which isn't installed.")
+    return export_format
+
+
+class _Counted:
+    """Wraps a row iterator, counting the rows that pass through."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def write_file(export_format, fileobj, queryset, columns, sheet_name='Sheet1'):
+    """Writes the export of ``queryset`` to the binary ``fileobj``; returns the row count."""
+    rows = _Counted(export_rows(queryset, columns))
+    if export_format.streaming:
+        for chunk in export_format.stream(columns, iter(rows)):
+            fileobj.write(chunk.encode('utf-8'))
+    else:
+        export_format.write(fileobj, columns, iter(rows), sheet_name=sheet_name)
+    return rows.count
+
+
+def response(export_format, queryset, columns, filename, sheet_name='Sheet1'):
+    """
+    A download of ``queryset`` in ``export_format``: streamed for CSV/JSONL,
+    otherwise written to a temporary file that is deleted once sent.
+    """
+    attachment = f"{filename}.{export_format.extension}"
+    if export_format.streaming:
+        rows = export_rows(queryset, columns)
+        streamed = StreamingHttpResponse(export_format.stream(columns, rows), content_type=export_format.content_type)
+        streamed['Content-Disposition'] = f'attachment; filename="{attachment}"'
+        return streamed
+
+    fileobj = tempfile.TemporaryFile()
+    try:
+        write_file(export_format, fileobj, queryset, columns, sheet_name=sheet_name)
+    except Exception:
+        fileobj.close()
+        raise
+    fileobj.seek(0)
+    return FileResponse(fileobj, as_attachment=True, filename=attachment, content_type=export_format.content_type)
@@ -0,0 +1,97 @@
+# inventory_management/inventory/facets.py
+
+"""
+Facet counts for the dashboard filters.
+
+For each filter dimension (category, location, project, status) this counts
+how many active items each choice would return given the rest of the current
+filters — one grouped ``values().annotate(Count)`` query per dimension rather
+than one COUNT per option. A dimension's own selection is left out of its
+query so the other choices in that dropdown keep their counts.
+
+Results are cached per normalised filter signature for ``CACHE_TIMEOUT``
+seconds. Item writes call ``invalidate()``, which bumps the ``facets``
+LookupVersion; its number is part of every cache key, so stale entries are
+simply never read. Keeping the generation in the database rather than the
+cache means a write in one process retires the entries of every other
+process, whatever cache backend each of them uses.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from . import lookups
+from .models import InventoryItem
+from .querysets import FILTER_DIMENSIONS, UID_FILTERS, apply_filters
+
+CACHE_TIMEOUT = 30
+
+VERSION_NAME = 'facets'
+
+# dimension -> (grouping column, label column)
+FACETS = {
+    'category': ('category_id', 'category__name'),
+    'location': ('location_id', 'location__name'),
+    'project': ('project_id', 'project__name'),
+    'status': ('status', None),
+}
+
+
+def signature(data):
+    """A stable key for FilterForm.cleaned_data: ids for models, folded search text."""
+    normalised = {}
+    for name in FILTER_DIMENSIONS + tuple(UID_FILTERS):
+        value = data.get(name)
+        if value:
+            normalised[name] = getattr(value, 'pk', str(value))
+    search_text = ' '.join((data.get('search') or '').lower().split())
+    if search_text:
+        normalised['search'] = search_text
+    payload = json.dumps(normalised, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _generation():
+    return lookups.current_versions([VERSION_NAME])[VERSION_NAME].version
+
+
+def invalidate():
+    """Drops every cached facet result; call after any item write."""
+    lookups.bump(VERSION_NAME)
+
+
+def _count(data, dimension):
+    column, label = FACETS[dimension]
+    queryset = apply_filters(
+        InventoryItem.objects.filter(is_deleted=False), data, exclude=dimension, ranked=False
+    )
+    columns = [column, label] if label else [column]
+    rows = queryset.order_by().values(*columns).annotate(count=Count('id'))
+
+    if label:
+        buckets = [{'id': row[column], 'name': row[label], 'count': row['count']} for row in rows]
+        return sorted(buckets, key=lambda b: (b['name'] is None, (b['name'] or '').lower()))
+
+    labels = dict(InventoryItem.STATUS_CHOICES)
+    buckets = [
+        {'id': row[column], 'name': labels.get(row[column], row[column]), 'count': row['count']}
+        for row in rows
+    ]
+    order = list(labels)
+    return sorted(buckets, key=lambda b: order.index(b['id']) if b['id'] in order else len(order))
+
+
+def facet_counts(data):
+    """
+    ``{dimension: [{'id', 'name', 'count'}, ...]}`` for FilterForm.cleaned_data.
+    Items without a location/project/category are reported under ``id: None``.
+    """
+    cache_key = f'inventory:facets:{_generation()}:{signature(data)}'
+    result = cache.get(cache_key)
+    if result is None:
+        result = {dimension: _count(data, dimension) for dimension in FACETS}
+        cache.set(cache_key, result, CACHE_TIMEOUT)
+    return result
@@ -5,6 +5,7 @@ from .models import InventoryItem, Project, ItemCategory, InventoryDocument, Inv
 from django.core.exceptions import ValidationError
 from decimal import Decimal # Import Decimal
 from inventory.models import Category,ItemStatus,Location
+from . import lookups
 
 User = get_user_model()
 
@@ -296,7 +297,7 @@ class FilterForm(forms.Form):
     )
     category = forms.ModelChoiceField(
         queryset=ItemCategory.objects.all().order_by('name'),
-        required=True,
+        required=False,
         empty_label="Select a Category",
         label='Category',
         widget=forms.Select(attrs={'class': 'form-control'})
@@ -321,6 +322,26 @@ class FilterForm(forms.Form):
         label='Project',
         widget=forms.Select(attrs={'class': 'form-control'})
     )
+    # Filters on the parts of the UID (prefix and the date it was issued).
+    uid_prefix = forms.CharField(
+        max_length=10,
+        required=False,
+        label='UID Prefix',
+        widget=forms.TextInput(attrs={'placeholder': 'UID prefix', 'class': 'form-control'})
+    )
+    received_from = forms.DateField(
+        required=False,
+        label='Received From',
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+    received_to = forms.DateField(
+        required=False,
+        label='Received To',
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+
+    def clean_uid_prefix(self):
+        return self.cleaned_data.get('uid_prefix', '').strip().upper()
 
 class ImportReviewForm(forms.Form):
     # This form is dynamically generated in the view, so we don't define fields here.
@@ -329,19 +350,32 @@ class ImportReviewForm(forms.Form):
 
 class ImportItemForm(forms.Form):
     # This form is no longer a ModelForm to avoid the FieldError
-    
+
     # Fields that come from the Excel sheet (not editable in form)
-    item_name = forms.CharField(max_length=100, required=False)
-    description = forms.CharField(max_length=200, required=False)
+    item_name = forms.CharField(max_length=255, required=False)
+    description = forms.CharField(required=False)
     quantity = forms.IntegerField(required=False, min_value=1, initial=1)
+    # The staged row this form was built from (see ImportStagingRow)
+    row_no = forms.IntegerField(widget=forms.HiddenInput)
 
-    # These are the fields to be manually entered by the user
-    uid_no = forms.CharField(max_length=20, required=False)
+    # These are the fields to be manually entered by the user. Choices are ids
+    # from the cached lookup lists, shared by every form on the review page,
+    # so validating a page runs no queries. Blanks are allowed while reviewing;
+    # the final import checks category, location and status are set.
     serial_number = forms.CharField(max_length=100, required=False)
-    category = forms.ModelChoiceField(queryset=ItemCategory.objects.all(), required=True)
-    location = forms.ModelChoiceField(queryset=Location.objects.all(), required=True)
-    status = forms.ModelChoiceField(queryset=ItemStatus.objects.all(), required=True)
-    project = forms.ModelChoiceField(queryset=Project.objects.all(), required=False)
+    category = forms.TypedChoiceField(coerce=int, empty_value=None, required=False)
+    location = forms.TypedChoiceField(coerce=int, empty_value=None, required=False)
+    status = forms.TypedChoiceField(coerce=int, empty_value=None, required=False)
+    project = forms.TypedChoiceField(coerce=int, empty_value=None, required=False)
+
+    # form field -> lookup list (see inventory.lookups)
+    CHOICE_LOOKUPS = {'category': 'categories', 'location': 'locations', 'status': 'statuses', 'project': 'projects'}
+
+    def __init__(self, *args, choices=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        choices = choices or lookups.choices(list(self.CHOICE_LOOKUPS.values()))
+        for field, lookup in self.CHOICE_LOOKUPS.items():
+            self.fields[field].choices = [('', '---------')] + choices[lookup]
 
 class InventoryForm(forms.ModelForm):
     # This field is now a single-select dropdown menu
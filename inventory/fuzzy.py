@@ -0,0 +1,230 @@
+# inventory_management/inventory/fuzzy.py
+
+"""
+Typo-tolerant ("did you mean") lookup on serial number, UID and item name.
+
+Both backends score with trigram similarity: the share of three-character
+chunks two strings have in common, so one misread character on a worn label
+still leaves most of them matching.
+
+* PostgreSQL uses ``pg_trgm`` with GIN trigram indexes (migration 0014).
+* Elsewhere an in-process ``TrigramIndex`` is built on first use, kept up to
+  date from the post_save / post_delete signals, and rebuilt in the
+  background every ``INVENTORY_FUZZY_INDEX_TTL`` seconds to pick up writes
+  made by other processes.
+"""
+
+import logging
+import re
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('serial_number', 'uid_no', 'item_name')
+
+# Same default as pg_trgm.similarity_threshold.
+MIN_SIMILARITY = 0.3
+
+# Grams shared by more items than this say little about the match and cost
+# the most to count, so they are skipped when rarer ones are available.
+COMMON_GRAM_LIMIT = 20000
+
+# Candidates re-scored exactly per requested suggestion.
+CANDIDATES_PER_RESULT = 20
+
+_WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def trigrams(value):
+    """pg_trgm-style trigrams: lowercased words, padded with two leading blanks and one trailing."""
+    grams = set()
+    for word in _WORD_RE.findall((value or '').lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a_grams, b_grams):
+    if not a_grams or not b_grams:
+        return 0.0
+    shared = len(a_grams & b_grams)
+    return shared / (len(a_grams) + len(b_grams) - shared)
+
+
+class TrigramIndex:
+    """
+    Posting lists of item ids per trigram, over all of ``FIELDS`` together.
+
+    Lists are compact ``array``s that only ever grow: an item that changes
+    gets its new grams appended, and stale entries are harmless because
+    candidates are re-scored against the item's current values. Removed
+    items are dropped from ``docs`` and skipped.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.docs = {}
+        self.built_at = None
+        self.lock = threading.Lock()
+
+    def _doc_grams(self, values):
+        grams = set()
+        for value in values:
+            grams |= trigrams(value)
+        return grams
+
+    def build(self, rows):
+        postings, docs = defaultdict(list), {}
+        for pk, *values in rows:
+            docs[pk] = tuple(values)
+            for gram in self._doc_grams(values):
+                postings[gram].append(pk)
+        postings = {gram: array('I', ids) for gram, ids in postings.items()}
+        with self.lock:
+            self.postings, self.docs = postings, docs
+            self.built_at = time.monotonic()
+
+    def add(self, pk, values):
+        values = tuple(values)
+        with self.lock:
+            old = self.docs.get(pk)
+            if old == values:
+                return
+            known = self._doc_grams(old) if old else set()
+            for gram in self._doc_grams(values) - known:
+                self.postings.setdefault(gram, array('I')).append(pk)
+            self.docs[pk] = values
+
+    def remove(self, pk):
+        with self.lock:
+            self.docs.pop(pk, None)
+
+    def search(self, query, limit):
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        lists = sorted((self.postings.get(g, ()) for g in query_grams), key=len)
+        lists = [p for p in lists if p]
+        rare = [p for p in lists if len(p) <= COMMON_GRAM_LIMIT]
+        hits = Counter()
+        for posting in rare or lists[:1]:
+            hits.update(posting)
+
+        scored = []
+        for pk, _ in hits.most_common(limit * CANDIDATES_PER_RESULT):
+            values = self.docs.get(pk)
+            if values is None:
+                continue
+            scores = [similarity(query_grams, trigrams(v)) for v in values]
+            best = max(range(len(FIELDS)), key=scores.__getitem__)
+            if scores[best] >= MIN_SIMILARITY:
+                scored.append((scores[best], pk, FIELDS[best]))
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return scored[:limit]
+
+
+_index = TrigramIndex()
+
+
+def _active_items():
+    from .models import InventoryItem
+    return InventoryItem.objects.filter(is_deleted=False)
+
+
+_refreshing = threading.Event()
+
+
+def _rebuild():
+    try:
+        _index.build(_active_items().order_by().values_list('id', *FIELDS).iterator(chunk_size=5000))
+    except Exception as e:
+        logger.error(f"Failed to rebuild the trigram index: {e}")
+    finally:
+        _refreshing.clear()
+        connection.close()
+
+
+def _local_index():
+    """
+    The first call builds the index in-line; later expiries rebuild it on a
+    background thread while the current one keeps answering.
+    """
+    if _index.built_at is None:
+        _index.build(_active_items().order_by().values_list('id', *FIELDS).iterator(chunk_size=5000))
+    elif time.monotonic() - _index.built_at > getattr(settings, 'INVENTORY_FUZZY_INDEX_TTL', 300):
+        if not _refreshing.is_set():
+            _refreshing.set()
+            threading.Thread(target=_rebuild, daemon=True).start()
+    return _index
+
+
+def item_changed(item):
+    """Keeps the in-process index current; a no-op until it has been built."""
+    if _index.built_at is None or connection.vendor == 'postgresql':
+        return
+    if item.is_deleted:
+        _index.remove(item.pk)
+    else:
+        _index.add(item.pk, [getattr(item, f) for f in FIELDS])
+
+
+def item_removed(pk):
+    if _index.built_at is not None:
+        _index.remove(pk)
+
+
+def _postgres_matches(query, limit):
+    # pg_trgm's % operator uses the GIN trigram indexes; %% escapes it for the DB-API.
+    score = "greatest(similarity(i.serial_number, %s), similarity(i.uid_no, %s), similarity(i.item_name, %s))"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""SELECT i.id, {score} AS score,
+                       similarity(i.serial_number, %s), similarity(i.uid_no, %s)
+                FROM inventory_inventoryitem i
+                WHERE NOT i.is_deleted
+                  AND (i.serial_number %% %s OR i.uid_no %% %s OR i.item_name %% %s)
+                ORDER BY score DESC, i.id
+                LIMIT %s""",
+            [query] * 8 + [limit]
+        )
+        matches = []
+        for pk, score, serial_score, uid_score in cursor.fetchall():
+            field = 'serial_number' if score == serial_score else 'uid_no' if score == uid_score else 'item_name'
+            matches.append((score, pk, field))
+        return matches
+
+
+def suggest(query, limit=5):
+    """
+    The ``limit`` active items most similar to ``query``, best first, as
+    dicts of id, uid_no, serial_number, item_name, ``similarity`` and the
+    ``matched_field`` that scored it.
+    """
+    query = (query or '').strip()
+    if not query:
+        return []
+
+    if connection.vendor == 'postgresql':
+        matches = _postgres_matches(query, limit)
+    else:
+        matches = _local_index().search(query, limit)
+
+    rows = _active_items().in_bulk([pk for _, pk, _ in matches])
+    return [
+        {
+            'id': pk,
+            'uid_no': rows[pk].uid_no,
+            'serial_number': rows[pk].serial_number,
+            'item_name': rows[pk].item_name,
+            'similarity': round(score, 3),
+            'matched_field': field,
+        }
+        for score, pk, field in matches if pk in rows
+    ]
@@ -0,0 +1,314 @@
+# inventory_management/inventory/import_jobs.py
+
+"""
+Background processing of spreadsheet uploads.
+
+The upload views only store the file and queue an ``ImportJob``; parsing,
+category matching and inserts happen in ``run()``, which records progress on
+the job after every batch so the browser can poll ``import_job_status``.
+Rows parsed for review are written to ``ImportStagingRow`` in batches, so
+neither the job nor the session ever holds the whole file.
+
+A direct import is validated in full first (``imports.Validator``). If any
+row is bad nothing is written, and the job fails with a downloadable error
+sheet listing every problem.
+
+Uploads are recognised by their SHA-256: sending the same file again
+returns the existing job rather than queueing another. A direct import also
+fingerprints each row it inserts (``ImportedRow``), so re-importing an
+edited copy of a file only applies its new and changed rows.
+
+The queue is the ImportJob table itself. Workers claim the oldest queued job
+with a conditional UPDATE (``status='queued'`` -> ``'running'``), which works
+the same on every database and never hands one job to two workers. Jobs are
+run by ``manage.py run_import_jobs`` (a pool of worker threads), or, with
+``INVENTORY_IMPORT_JOBS_IN_PROCESS`` on, by a small thread pool inside the
+web process as soon as the upload commits.
+"""
+
+import csv
+import logging
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import imports, spreadsheets
+from .models import ImportedRow, ImportJob, ImportStagingRow
+
+logger = logging.getLogger(__name__)
+
+# Row errors kept on the job for display; the full count is in error_count.
+MAX_STORED_ERRORS = 1000
+
+
+def worker_threads():
+    return getattr(settings, 'INVENTORY_IMPORT_WORKER_THREADS', 2)
+
+
+def enqueue(uploaded_file, user, kind='review', content_hash=''):
+    """
+    Stores the upload and queues a job for it. Returns ``(job, created)``:
+    if the same user already sent this exact file (same ``content_hash``) and
+    that job is still usable, it is returned instead and nothing is queued.
+    """
+    user = user if user and user.is_authenticated else None
+    if content_hash:
+        repeat = _repeat_of(content_hash, user, kind)
+        if repeat is not None:
+            return repeat, False
+
+    job = ImportJob(kind=kind, original_name=uploaded_file.name, content_hash=content_hash, created_by=user)
+    job.file.save(f"{uuid.uuid4().hex}{spreadsheets.extension(uploaded_file.name)}", uploaded_file, save=False)
+    job.save()
+    if getattr(settings, 'INVENTORY_IMPORT_JOBS_IN_PROCESS', False):
+        transaction.on_commit(lambda: _executor().submit(_run_pending_in_thread))
+    return job, True
+
+
+def _repeat_of(content_hash, user, kind):
+    """
+    The latest job for the same file, user and kind whose outcome still
+    stands: one that is queued or running, a finished import, or a finished
+    review with rows left to save. Failed jobs are always run again.
+    """
+    jobs = ImportJob.objects.filter(
+        content_hash=content_hash, kind=kind, created_by=user, status__in=['queued', 'running', 'done']
+    ).order_by('-created_at', '-id')
+    for job in jobs[:5]:
+        if job.kind == 'review' and job.status == 'done' and not job.staged_rows.exists():
+            continue
+        return job
+    return None
+
+
+_executor_lock = threading.Lock()
+_pool = None
+
+
+def _executor():
+    global _pool
+    with _executor_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=worker_threads(), thread_name_prefix='import-job')
+        return _pool
+
+
+def _run_pending_in_thread():
+    close_old_connections()
+    try:
+        run_pending()
+    finally:
+        close_old_connections()
+
+
+def claim_next():
+    """Marks the oldest queued job as running and returns it, or None if the queue is empty."""
+    for job in ImportJob.objects.filter(status='queued').order_by('created_at', 'id')[:10]:
+        claimed = ImportJob.objects.filter(pk=job.pk, status='queued').update(
+            status='running', started_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def run_pending():
+    """Runs queued jobs until the queue is empty; returns how many ran."""
+    count = 0
+    while True:
+        job = claim_next()
+        if job is None:
+            return count
+        run(job)
+        count += 1
+
+
+def fail_stale(max_age_seconds=None):
+    """
+    Marks jobs left 'running' by a worker that died as failed. They aren't
+    retried: a direct import may already have committed some batches.
+    """
+    max_age = max_age_seconds or getattr(settings, 'INVENTORY_IMPORT_JOB_TIMEOUT', 60 * 60)
+    return ImportJob.objects.filter(
+        status='running', started_at__lt=timezone.now() - timedelta(seconds=max_age)
+    ).update(status='failed', finished_at=timezone.now(), result={'message': 'The import worker stopped.'})
+
+
+def expire_staging(max_age_seconds=None):
+    """
+    Drops staged review rows of jobs older than INVENTORY_IMPORT_STAGING_TTL
+    that were never saved; returns how many rows went.
+    """
+    max_age = max_age_seconds or getattr(settings, 'INVENTORY_IMPORT_STAGING_TTL', 24 * 60 * 60)
+    deleted, _ = ImportStagingRow.objects.filter(
+        job__created_at__lt=timezone.now() - timedelta(seconds=max_age)
+    ).delete()
+    return deleted
+
+
+def _progress(job, processed, errors):
+    job.processed_rows = processed
+    job.error_count = len(errors)
+    ImportJob.objects.filter(pk=job.pk).update(processed_rows=processed, error_count=len(errors))
+
+
+def _run_review(job, read_batches):
+    parser = imports.ReviewParser()
+    # A job that is run again starts its staging from scratch.
+    ImportStagingRow.objects.filter(job=job).delete()
+    staged = 0
+    for df in read_batches():
+        rows = [ImportStagingRow(job=job, **record) for record in parser.parse_batch(df)]
+        ImportStagingRow.objects.bulk_create(rows)
+        staged += len(rows)
+        _progress(job, staged, [])
+    return [], {'row_count': staged}
+
+
+class _ChangedRows:
+    """
+    Re-reads a file's batches as ``(df, digests)``, leaving out rows that an
+    earlier import of a file with the same name, by the same user, already
+    inserted (matched by ``imports.row_digests``). ``unchanged`` counts the
+    rows left out by the latest pass.
+    """
+
+    def __init__(self, job, read_batches):
+        self.read_batches = read_batches
+        self.earlier = ImportedRow.objects.filter(
+            job__kind='import', job__created_by=job.created_by, job__original_name=job.original_name,
+        ).exclude(job=job)
+        self.has_earlier = self.earlier.exists()
+        self.unchanged = 0
+
+    def __call__(self):
+        self.unchanged = 0
+        for df in self.read_batches():
+            digests = imports.row_digests(df)
+            if self.has_earlier:
+                applied = set(self.earlier.filter(digest__in=set(digests.tolist())).values_list('digest', flat=True))
+                keep = ~digests.isin(applied)
+                self.unchanged += int((~keep).sum())
+                df, digests = df[keep], digests[keep]
+            yield df, digests
+
+
+def _validate(job, read_rows):
+    """
+    Checks the whole file before anything is written. Returns None if it is
+    clean, otherwise the job result, with every problem in ``job.error_sheet``.
+    """
+    with tempfile.TemporaryFile('w+', newline='', encoding='utf-8') as sheet_file:
+        sheet = csv.writer(sheet_file)
+        sheet.writerow(imports.ERROR_SHEET_HEADER)
+        validator = imports.Validator(sheet, keep=MAX_STORED_ERRORS)
+        checked = 0
+        for df, _ in read_rows():
+            if checked == 0 and not validator.check_columns(df):
+                break
+            validator.check_batch(df)
+            checked += len(df)
+            _progress(job, checked, validator.errors)
+
+        if not validator.error_count:
+            return None
+        sheet_file.seek(0)
+        name = f"{os.path.splitext(os.path.basename(job.original_name))[0]}-errors.csv"
+        job.error_sheet.save(name, File(sheet_file), save=False)
+
+    job.errors = [list(e) for e in validator.errors]
+    job.error_count = validator.error_count
+    return {
+        'stage': 'validation',
+        'message': f"{validator.error_count} problem(s) found; nothing was imported.",
+    }
+
+
+def _run_import(job, read_batches):
+    read_rows = _ChangedRows(job, read_batches)
+    failed = _validate(job, read_rows)
+    if failed is not None:
+        return job.errors, failed
+
+    importer = imports.Importer(job.created_by)
+    processed = 0
+    for df, digests in read_rows():
+        # Each batch commits on its own so progress and inserted rows show up as they land.
+        with transaction.atomic():
+            created = importer.import_batch(df)
+            ImportedRow.objects.bulk_create([ImportedRow(job=job, digest=digests[row]) for row in created])
+        processed += len(df)
+        _progress(job, processed, importer.result.errors)
+    result = importer.result
+    return result.errors, {'created': result.created, 'skipped': result.skipped, 'unchanged': read_rows.unchanged}
+
+
+def run(job):
+    """Processes one claimed job, recording its outcome on the row."""
+    runners = {'review': _run_review, 'import': _run_import}
+    try:
+        with job.file.open('rb') as fileobj:
+            job.total_rows = spreadsheets.count_rows(fileobj, job.original_name)
+            ImportJob.objects.filter(pk=job.pk).update(total_rows=job.total_rows)
+
+            upload = _NamedFile(fileobj, job.original_name)
+            errors, result = runners[job.kind](job, lambda: spreadsheets.read_batches(upload))
+
+        if job.error_sheet:
+            # Failed validation: errors and error_count already cover the whole file.
+            job.status = 'failed'
+        else:
+            job.status = 'done'
+            job.errors = [list(e) for e in errors[:MAX_STORED_ERRORS]]
+            job.error_count = len(errors)
+        job.result = result
+    except Exception as e:
+        logger.exception(f"Import job {job.pk} failed")
+        job.status = 'failed'
+        job.result = {'message': str(e)}
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'errors', 'error_count', 'result', 'error_sheet', 'total_rows', 'processed_rows', 'finished_at',
+    ])
+    return job
+
+
+class _NamedFile:
+    """A stored job file presented like an upload (a ``name`` and a ``file``)."""
+
+    def __init__(self, fileobj, name):
+        self.file = getattr(fileobj, 'file', fileobj)
+        self.name = os.path.basename(name)
+
+    def seek(self, offset):
+        self.file.seek(offset)
+
+
+def summary(job):
+    """The JSON the progress endpoint returns."""
+    percent = None
+    if job.status == 'done':
+        percent = 100
+    elif job.total_rows:
+        percent = min(99, int(job.processed_rows * 100 / job.total_rows))
+    return {
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'file': job.original_name,
+        'total_rows': job.total_rows,
+        'processed_rows': job.processed_rows,
+        'percent': percent,
+        'error_count': job.error_count,
+        'errors': job.errors[:50],
+        'result': job.result,
+    }
@@ -0,0 +1,346 @@
+# inventory_management/inventory/imports.py
+
+"""
+Set-based spreadsheet import.
+
+``import_rows`` takes the row batches from ``spreadsheets.read_batches`` and,
+per batch, resolves every category, location and status id with one
+``in_bulk`` each, checks serial numbers and UIDs against the database with
+one ``__in`` query each, and inserts the surviving rows through
+``bulk.create_items``. Rows that can't be imported are skipped and reported
+in ``ImportResult.errors`` with their spreadsheet row number; the rest of
+the file still goes in.
+
+``row_digests`` fingerprints rows so a re-import can tell which ones it has
+already applied (see ``import_jobs``).
+"""
+
+from decimal import Decimal, InvalidOperation
+
+import pandas as pd
+from django.db import transaction
+
+from . import bulk, category_match
+from .models import InventoryItem, ItemCategory, ItemStatus, Location
+
+# Spreadsheet row of the first data row (row 1 is the header).
+FIRST_ROW = 2
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []  # [(row number, message)]
+
+    @property
+    def skipped(self):
+        return len(self.errors)
+
+
+def clean_text(value):
+    """None for blanks and the 'nan'/'none' strings spreadsheets leave behind."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    text = str(value).strip()
+    return None if text.lower() in ('', 'nan', 'none') else text
+
+
+def _ids(column):
+    """Column values as ints (None where missing or not a number)."""
+    numbers = pd.to_numeric(column, errors='coerce')
+    return [int(n) if pd.notna(n) and float(n).is_integer() else None for n in numbers]
+
+
+def _column(df, name, default=None):
+    return df[name] if name in df.columns else pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def _canonical(column):
+    """A column as stripped strings, with whole floats written as ints (a blank cell turns 1 into 1.0)."""
+    if pd.api.types.is_float_dtype(column) and (column.dropna() % 1 == 0).all():
+        column = column.astype('Int64')
+    return column.astype('string').str.strip().fillna('')
+
+
+def row_digests(df):
+    """
+    A 64-bit fingerprint of each row's values, independent of column order,
+    as an int64 Series on ``df``'s index.
+    """
+    frame = pd.DataFrame({name: _canonical(df[name]) for name in sorted(df.columns)}, index=df.index)
+    hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return pd.Series(hashes.view('int64'), index=df.index)
+
+
+class Importer:
+    """Imports row batches for one file, remembering serials and UIDs across batches."""
+
+    def __init__(self, user):
+        self.user = user
+        self.result = ImportResult()
+        self.seen_serials = set()
+        self.seen_uids = set()
+
+    def import_batch(self, df):
+        """Inserts the valid rows of ``df``; returns ``{row label: item}`` for those inserted."""
+        rows = df.index.tolist()
+        serials = [clean_text(v) for v in _column(df, 'serial_number')]
+        uids = [clean_text(v) for v in _column(df, 'uid_no')]
+        category_ids = _ids(_column(df, 'category_id'))
+        location_ids = _ids(_column(df, 'location_id'))
+        status_ids = _ids(_column(df, 'status_id'))
+
+        categories = ItemCategory.objects.in_bulk({i for i in category_ids if i is not None})
+        locations = Location.objects.in_bulk({i for i in location_ids if i is not None})
+        statuses = ItemStatus.objects.in_bulk({i for i in status_ids if i is not None})
+        taken_serials = set(
+            InventoryItem.objects.filter(serial_number__in={s for s in serials if s})
+            .values_list('serial_number', flat=True)
+        )
+        taken_uids = set(
+            InventoryItem.objects.filter(uid_no__in={u for u in uids if u}).values_list('uid_no', flat=True)
+        )
+
+        names = _column(df, 'item_name').tolist()
+        descriptions = _column(df, 'description').tolist()
+        quantities = _column(df, 'quantity', 0).tolist()
+        prices = _column(df, 'unit_price', '0').tolist()
+
+        created = {}
+        for i, row in enumerate(rows):
+            row_no = row + FIRST_ROW
+            serial, uid = serials[i], uids[i]
+
+            if serial and (serial in taken_serials or serial in self.seen_serials):
+                self.result.errors.append((row_no, f"Serial Number '{serial}' is duplicate."))
+                continue
+            if uid and (uid in taken_uids or uid in self.seen_uids):
+                self.result.errors.append((row_no, f"UID '{uid}' is duplicate."))
+                continue
+
+            name = clean_text(names[i])
+            if not name:
+                self.result.errors.append((row_no, "Item name is required."))
+                continue
+
+            category = categories.get(category_ids[i])
+            location = locations.get(location_ids[i])
+            status = statuses.get(status_ids[i])
+            if not (category and location and status):
+                self.result.errors.append((row_no, "Missing Category, Location, or Status."))
+                continue
+
+            try:
+                quantity = int(quantities[i])
+                price = Decimal(str(prices[i]))
+                if not price.is_finite():
+                    raise InvalidOperation
+            except (TypeError, ValueError, InvalidOperation):
+                self.result.errors.append((row_no, "Quantity and unit price must be numbers."))
+                continue
+
+            if serial:
+                self.seen_serials.add(serial)
+            if uid:
+                self.seen_uids.add(uid)
+            created[row] = InventoryItem(
+                uid_no=uid,
+                item_name=name,
+                description=clean_text(descriptions[i]),
+                serial_number=serial,
+                quantity=quantity,
+                price=price,
+                category=category,
+                status=status.name,
+                location=location,
+                created_by=self.user,
+            )
+
+        bulk.create_items(list(created.values()))
+        self.result.created += len(created)
+        return created
+
+
+# Columns a direct import can't do without.
+REQUIRED_COLUMNS = ('item_name', 'category_id', 'location_id', 'status_id')
+
+# Largest price InventoryItem.price (10 digits, 2 decimal places) can hold.
+MAX_PRICE = Decimal('99999999.99')
+
+ERROR_SHEET_HEADER = ['Row', 'Column', 'Value', 'Problem']
+
+
+def _text(column):
+    """Stripped strings with blanks and 'nan'/'none' as <NA> (the vectorised clean_text)."""
+    text = column.astype('string').str.strip()
+    return text.mask(text.str.lower().isin(['', 'nan', 'none']))
+
+
+class Validator:
+    """
+    Checks row batches before anything is written, using whole-column pandas
+    operations and one query per lookup table and batch. Problems go to
+    ``sheet`` (a csv.writer, one line each); the first ``keep`` are also kept
+    in ``errors`` as (row, message) pairs.
+    """
+
+    def __init__(self, sheet=None, keep=1000):
+        self.sheet = sheet
+        self.keep = keep
+        self.error_count = 0
+        self.errors = []
+        self.seen_serials = set()
+        self.seen_uids = set()
+
+    def _flag(self, rows, mask, column, values, problem):
+        if not mask.any():
+            return
+        flagged = pd.DataFrame({'row': rows[mask], 'column': column, 'value': values[mask], 'problem': problem})
+        flagged['value'] = flagged['value'].astype(object).where(flagged['value'].notna(), '')
+        if self.sheet is not None:
+            self.sheet.writerows(flagged.itertuples(index=False, name=None))
+        for row, _, value, message in flagged.itertuples(index=False, name=None):
+            if len(self.errors) >= self.keep:
+                break
+            self.errors.append((row, f"{message} ({value})" if value != '' else message))
+        self.error_count += len(flagged)
+
+    def check_columns(self, df):
+        """False (and a problem per column) if required columns are missing."""
+        missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+        for column in missing:
+            self._flag(pd.Series([1]), pd.Series([True]), column, pd.Series(['']), f"Required column '{column}' is missing.")
+        return not missing
+
+    def check_batch(self, df):
+        rows = pd.Series(df.index + FIRST_ROW, index=df.index)
+
+        names = _text(_column(df, 'item_name'))
+        self._flag(rows, names.isna(), 'item_name', names, "Item name is required.")
+
+        for column, model, label in (
+            ('category_id', ItemCategory, 'category'),
+            ('location_id', Location, 'location'),
+            ('status_id', ItemStatus, 'status'),
+        ):
+            self._check_ids(rows, _column(df, column), column, model, label)
+
+        if 'quantity' in df.columns:
+            quantities = pd.to_numeric(df['quantity'], errors='coerce')
+            bad = quantities.isna() | (quantities % 1 != 0)
+            self._flag(rows, bad, 'quantity', df['quantity'], "Quantity must be a whole number.")
+        if 'unit_price' in df.columns:
+            prices = pd.to_numeric(df['unit_price'], errors='coerce')
+            bad = prices.isna() | ~prices.abs().le(float(MAX_PRICE))
+            self._flag(rows, bad, 'unit_price', df['unit_price'], f"Unit price must be a number up to {MAX_PRICE}.")
+
+        self._check_unique(rows, _text(_column(df, 'serial_number')), 'serial_number', 'Serial Number',
+                           self.seen_serials, 'serial_number')
+        self._check_unique(rows, _text(_column(df, 'uid_no')), 'uid_no', 'UID', self.seen_uids, 'uid_no')
+
+    def _check_ids(self, rows, column, name, model, label):
+        ids = pd.to_numeric(column, errors='coerce')
+        whole = ids.notna() & (ids % 1 == 0)
+        wanted = ids.where(whole, -1).astype('int64')
+        known = set(model.objects.filter(pk__in=wanted[whole].unique().tolist()).values_list('pk', flat=True))
+        found = whole & wanted.isin(known)
+        blank = _text(column).isna()
+        self._flag(rows, blank, name, column, f"{label.capitalize()} is required.")
+        self._flag(rows, ~blank & ~found, name, column, f"Unknown {label} id.")
+
+    def _check_unique(self, rows, values, name, label, seen, field):
+        present = values.notna()
+        in_file = present & (values.duplicated(keep='first') | values.isin(seen))
+        taken = set(
+            InventoryItem.objects.filter(**{f'{field}__in': values[present].unique().tolist()})
+            .values_list(field, flat=True)
+        )
+        in_db = present & ~in_file & values.isin(taken)
+        self._flag(rows, in_file, name, values, f"{label} appears more than once in the file.")
+        self._flag(rows, in_db, name, values, f"{label} already exists.")
+        seen.update(values[present].tolist())
+
+
+def commit_staged(job, user, chunk_size=1000):
+    """
+    Imports every reviewed row staged for ``job`` in one transaction, a
+    chunk at a time (one serial-number query and one ``bulk.create_items``
+    per chunk), then clears the staging. Rows whose serial number is already
+    taken are skipped and reported. The review sheet has no price column, so
+    items get the model's default price. Returns an ImportResult.
+    """
+    result = ImportResult()
+    seen_serials = set()
+    staged = job.staged_rows.select_related('category', 'status').order_by('row_no')
+    last_row = 0
+    with transaction.atomic():
+        while True:
+            rows = list(staged.filter(row_no__gt=last_row)[:chunk_size])
+            if not rows:
+                break
+            last_row = rows[-1].row_no
+
+            serials = [clean_text(row.serial_number) for row in rows]
+            taken = set(
+                InventoryItem.objects.filter(serial_number__in={s for s in serials if s})
+                .values_list('serial_number', flat=True)
+            )
+            items = []
+            for row, serial in zip(rows, serials):
+                if serial and (serial in taken or serial in seen_serials):
+                    result.errors.append((row.row_no, f"Serial Number '{serial}' already exists."))
+                    continue
+                if serial:
+                    seen_serials.add(serial)
+                items.append(InventoryItem(
+                    item_name=row.item_name,
+                    description=row.description,
+                    quantity=row.quantity or 1,
+                    serial_number=serial,
+                    category=row.category,
+                    location_id=row.location_id,
+                    status=row.status.name if row.status else None,
+                    project_id=row.project_id,
+                    created_by=user,
+                ))
+            bulk.create_items(items)
+            result.created += len(items)
+        job.staged_rows.all().delete()
+    return result
+
+
+def import_rows(batches, user):
+    """Imports every batch; returns an ImportResult."""
+    importer = Importer(user)
+    for df in batches:
+        importer.import_batch(df)
+    return importer.result
+
+
+class ReviewParser:
+    """
+    Turns uploaded rows into review records: name, description and quantity,
+    a category guessed from the description (falling back to 'Other') and a
+    blank serial number for the user to fill in.
+    """
+
+    def __init__(self):
+        self.matcher = category_match.matcher()
+
+    def parse_batch(self, df):
+        """One dict per row, with ``row_no`` the spreadsheet row number."""
+        names = [clean_text(v) for v in _column(df, 'item_name')]
+        descriptions = [clean_text(v) for v in _column(df, 'description')]
+        quantities = _ids(_column(df, 'quantity'))
+        category_ids = self.matcher.match_many(pd.Series(descriptions, dtype=object)).tolist()
+        return [
+            {
+                'row_no': row + FIRST_ROW,
+                'item_name': (names[i] or '')[:255],
+                'description': descriptions[i],
+                'quantity': quantities[i],
+                'serial_number': '',
+                'category_id': category_ids[i] or self.matcher.other_id,
+            }
+            for i, row in enumerate(df.index.tolist())
+        ]
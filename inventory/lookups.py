@@ -0,0 +1,75 @@
+# inventory_management/inventory/lookups.py
+
+"""
+Reference lists (locations, projects, users, categories, statuses) served as
+versioned JSON.
+
+The dashboard used to embed every Location, Project and User (password hash
+included) in each page. Now it links to ``lookup_list`` URLs carrying the
+current version; the payload is cached server-side per version and the
+browser revalidates it with ETag / Last-Modified.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ItemCategory, ItemStatus, Location, LookupVersion, Project
+
+User = get_user_model()
+
+# name -> (queryset factory, fields exposed to the browser)
+LOOKUPS = {
+    'locations': (lambda: Location.objects.order_by('name'), ('id', 'name')),
+    'projects': (lambda: Project.objects.order_by('name'), ('id', 'name')),
+    'users': (lambda: User.objects.filter(is_active=True).order_by('username'), ('id', 'username')),
+    'categories': (lambda: ItemCategory.objects.order_by('name'), ('id', 'name')),
+    'statuses': (lambda: ItemStatus.objects.order_by('name'), ('id', 'name')),
+}
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def current_versions(names=None):
+    """{name: LookupVersion} for the requested lookups, creating missing rows."""
+    names = list(names or LOOKUPS)
+    versions = {v.name: v for v in LookupVersion.objects.filter(name__in=names)}
+    for name in names:
+        if name not in versions:
+            versions[name], _ = LookupVersion.objects.get_or_create(name=name)
+    return versions
+
+
+def bump(name):
+    updated = LookupVersion.objects.filter(name=name).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        LookupVersion.objects.get_or_create(name=name)
+
+
+def payload(name, version):
+    """The JSON-ready rows for ``name``, cached under its version."""
+    cache_key = f'inventory:lookup:{name}:{version}'
+    rows = cache.get(cache_key)
+    if rows is None:
+        queryset, fields = LOOKUPS[name]
+        rows = list(queryset().values(*fields))
+        cache.set(cache_key, rows, CACHE_TIMEOUT)
+    return rows
+
+
+def choices(names):
+    """{name: [(id, label), ...]} for form choice fields, from the cached payloads."""
+    versions = current_versions(names)
+    result = {}
+    for name in names:
+        rows = payload(name, versions[name].version)
+        label = LOOKUPS[name][1][1]
+        result[name] = [(row['id'], row[label]) for row in rows]
+    return result
+
+
+def etag(name, version):
+    return f'"{name}-v{version}"'
@@ -0,0 +1,174 @@
+import statistics
+import threading
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, OperationalError, close_old_connections, connection
+
+from inventory import bulk, uids
+from inventory.models import InventoryItem, ItemCategory
+
+# Seconds the current thread's last UID allocation took (see _timed).
+_allocation = threading.local()
+
+# The uids function each mode's code path allocates through: InventoryItem.save()
+# calls uids.allocate, bulk.create_items calls uids.assign_uids.
+ALLOCATORS = {'save': 'allocate', 'bulk': 'assign_uids'}
+
+
+def _timed(allocate):
+    """Wraps a uids allocation function to time each call, per thread."""
+    def timed(*args, **kwargs):
+        began = time.perf_counter()
+        try:
+            return allocate(*args, **kwargs)
+        finally:
+            _allocation.seconds = time.perf_counter() - began
+    return timed
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates items from concurrent threads across several categories against the configured "
+        "database and reports throughput, latency percentiles, UID allocation (lock) wait and "
+        "uniqueness violations. Benchmark items and categories are removed afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent workers.")
+        parser.add_argument('--items', type=int, default=50, help="Items created per worker.")
+        parser.add_argument('--categories', type=int, default=4, help="Categories the workers spread over.")
+        parser.add_argument(
+            '--mode', choices=['save', 'bulk'], default='save',
+            help="'save': one save() per item; 'bulk': one reserved UID block and bulk_create per worker.",
+        )
+        parser.add_argument('--keep', action='store_true', help="Leave the benchmark items in the database.")
+
+    def handle(self, *args, **options):
+        threads, per_thread = options['threads'], options['items']
+        if threads < 1 or per_thread < 1 or options['categories'] < 1:
+            raise CommandError("--threads, --items and --categories must be at least 1.")
+
+        run_id = uuid.uuid4().hex[:8]
+        categories, created_categories = [], []
+        for k in range(options['categories']):
+            category, created = ItemCategory.objects.get_or_create(
+                prefix=f'BN{k}', defaults={'name': f'Benchmark {k}'}
+            )
+            categories.append(category)
+            if created:
+                created_categories.append(category.pk)
+
+        results = {'latencies': [], 'lock_waits': [], 'created': 0, 'unique_errors': 0, 'lock_errors': 0, 'errors': []}
+        lock = threading.Lock()
+        start_gate = threading.Barrier(threads)
+
+        def record(**values):
+            with lock:
+                for key, value in values.items():
+                    if isinstance(results[key], list):
+                        results[key].extend(value)
+                    else:
+                        results[key] += value
+
+        def worker(n):
+            close_old_connections()
+            try:
+                start_gate.wait()
+                if options['mode'] == 'bulk':
+                    self._bulk_worker(n, run_id, categories, per_thread, record)
+                else:
+                    self._save_worker(n, run_id, categories, per_thread, record)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        allocator = ALLOCATORS[options['mode']]
+        allocate = getattr(uids, allocator)
+        setattr(uids, allocator, _timed(allocate))
+        try:
+            started = time.perf_counter()
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            setattr(uids, allocator, allocate)
+
+        created = InventoryItem.objects.filter(item_name__startswith=f'bench-{run_id}-')
+        distinct_uids = created.values('uid_no').distinct().count()
+        self._report(options, results, elapsed, created.count(), distinct_uids)
+
+        if not options['keep']:
+            created.delete()
+            ItemCategory.objects.filter(pk__in=created_categories).delete()
+
+    def _save_worker(self, n, run_id, categories, per_thread, record):
+        for i in range(per_thread):
+            category = categories[(n + i) % len(categories)]
+            _allocation.seconds = 0.0
+            began = time.perf_counter()
+            try:
+                # save() allocates the UID itself; the time it spent doing so
+                # (queueing on the counter row) is reported separately.
+                InventoryItem(item_name=f'bench-{run_id}-{n}-{i}', category=category).save()
+            except IntegrityError as e:
+                record(unique_errors=1, errors=[str(e)])
+                continue
+            except OperationalError as e:
+                record(lock_errors=1, errors=[str(e)])
+                continue
+            done = time.perf_counter()
+            record(created=1, latencies=[done - began], lock_waits=[_allocation.seconds])
+
+    def _bulk_worker(self, n, run_id, categories, per_thread, record):
+        items = [
+            InventoryItem(item_name=f'bench-{run_id}-{n}-{i}', category=categories[(n + i) % len(categories)])
+            for i in range(per_thread)
+        ]
+        _allocation.seconds = 0.0
+        began = time.perf_counter()
+        try:
+            # create_items reserves the UID blocks itself.
+            bulk.create_items(items)
+        except IntegrityError as e:
+            record(unique_errors=1, errors=[str(e)])
+            return
+        except OperationalError as e:
+            record(lock_errors=1, errors=[str(e)])
+            return
+        done = time.perf_counter()
+        record(created=len(items), latencies=[done - began], lock_waits=[_allocation.seconds])
+
+    def _report(self, options, results, elapsed, rows, distinct_uids):
+        def ms(values, pct):
+            if not values:
+                return 'n/a'
+            ordered = sorted(values)
+            return f"{ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000:.1f} ms"
+
+        latencies, waits = results['latencies'], results['lock_waits']
+        unit = 'batch' if options['mode'] == 'bulk' else 'item'
+        self.stdout.write(
+            f"Database: {connection.vendor}; mode: {options['mode']}; "
+            f"{options['threads']} thread(s) x {options['items']} item(s) over {options['categories']} categories"
+        )
+        self.stdout.write(f"Elapsed: {elapsed:.2f} s; throughput: {results['created'] / elapsed:.1f} items/s")
+        self.stdout.write(f"Latency per {unit}: p50 {ms(latencies, 0.50)}, p99 {ms(latencies, 0.99)}")
+        self.stdout.write(
+            f"UID allocation wait per {unit}: p50 {ms(waits, 0.50)}, p99 {ms(waits, 0.99)}, "
+            f"total {sum(waits):.2f} s" + (f", mean {statistics.mean(waits) * 1000:.1f} ms" if waits else "")
+        )
+        self.stdout.write(
+            f"Created: {results['created']}; rows found: {rows}; distinct UIDs: {distinct_uids}; "
+            f"uniqueness violations: {results['unique_errors']}; lock timeouts: {results['lock_errors']}"
+        )
+        for error in results['errors'][:5]:
+            self.stdout.write(self.style.WARNING(f"  {error}"))
+
+        if results['unique_errors'] or distinct_uids != rows:
+            self.stdout.write(self.style.ERROR("Duplicate UIDs detected."))
+        else:
+            self.stdout.write(self.style.SUCCESS("No duplicate UIDs."))
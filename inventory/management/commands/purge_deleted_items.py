@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import purge
+
+
+class Command(BaseCommand):
+    help = "Permanently deletes soft-deleted items whose undo window has expired."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running, purging every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=30, help="Seconds between passes in --loop mode.")
+        parser.add_argument('--chunk-size', type=int, default=purge.DEFAULT_CHUNK_SIZE,
+                            help="Items logged and deleted per transaction.")
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            count = purge.purge_expired(options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f"Purged {count} item(s)."))
+            return
+
+        self.stdout.write(f"Purging expired deletions every {options['interval']}s (Ctrl+C to stop).")
+        try:
+            while True:
+                count = purge.purge_expired(options['chunk_size'])
+                if count:
+                    self.stdout.write(f"Purged {count} item(s).")
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Purge worker stopped.")
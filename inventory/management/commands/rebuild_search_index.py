@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from inventory import search
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the dashboard full-text search index from the inventory table."
+
+    def handle(self, *args, **options):
+        backend = search.search_backend()
+        if backend == 'icontains':
+            self.stdout.write(self.style.WARNING("Full-text search is disabled or unavailable; nothing to rebuild."))
+            return
+        count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} item(s) using the {backend} backend."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory import counters
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the dashboard item counters (totals per status, location, category and project)."
+
+    def handle(self, *args, **options):
+        total = counters.recount()
+        self.stdout.write(self.style.SUCCESS(f"Counters rebuilt: {total} active item(s)."))
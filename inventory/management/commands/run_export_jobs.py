@@ -0,0 +1,60 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from inventory import export_jobs
+
+
+class Command(BaseCommand):
+    help = "Builds queued inventory exports (ExportJob rows) and evicts old export files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running, polling the queue every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=2, help="Seconds between queue polls in --loop mode.")
+        parser.add_argument('--threads', type=int, default=export_jobs.worker_threads(),
+                            help="Exports built at the same time.")
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            count = self._drain(options['threads'])
+            evicted = export_jobs.evict()
+            self.stdout.write(self.style.SUCCESS(f"Built {count} export(s); evicted {evicted} old one(s)."))
+            return
+
+        self.stdout.write(
+            f"Building exports on {options['threads']} thread(s), polling every {options['interval']}s (Ctrl+C to stop)."
+        )
+        try:
+            while True:
+                stale = export_jobs.fail_stale()
+                if stale:
+                    self.stdout.write(f"Marked {stale} abandoned export(s) as failed.")
+                evicted = export_jobs.evict()
+                if evicted:
+                    self.stdout.write(f"Evicted {evicted} old export(s).")
+                count = self._drain(options['threads'])
+                if count:
+                    self.stdout.write(f"Built {count} export(s).")
+                close_old_connections()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Export worker stopped.")
+
+    def _drain(self, threads):
+        """Runs queued jobs on ``threads`` workers until the queue is empty."""
+        counts = []
+
+        def work():
+            try:
+                counts.append(export_jobs.run_pending())
+            finally:
+                close_old_connections()
+
+        workers = [threading.Thread(target=work) for _ in range(max(threads, 1))]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        return sum(counts)
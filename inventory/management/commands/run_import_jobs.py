@@ -0,0 +1,59 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from inventory import import_jobs
+
+
+class Command(BaseCommand):
+    help = "Processes queued spreadsheet imports (ImportJob rows) on a pool of worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running, polling the queue every --interval seconds.")
+        parser.add_argument('--interval', type=int, default=2, help="Seconds between queue polls in --loop mode.")
+        parser.add_argument('--threads', type=int, default=import_jobs.worker_threads(),
+                            help="Jobs processed at the same time.")
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            count = self._drain(options['threads'])
+            self.stdout.write(self.style.SUCCESS(f"Processed {count} import job(s)."))
+            return
+
+        self.stdout.write(
+            f"Processing import jobs on {options['threads']} thread(s), polling every {options['interval']}s (Ctrl+C to stop)."
+        )
+        try:
+            while True:
+                stale = import_jobs.fail_stale()
+                if stale:
+                    self.stdout.write(f"Marked {stale} abandoned job(s) as failed.")
+                expired = import_jobs.expire_staging()
+                if expired:
+                    self.stdout.write(f"Discarded {expired} unsaved review row(s).")
+                count = self._drain(options['threads'])
+                if count:
+                    self.stdout.write(f"Processed {count} import job(s).")
+                close_old_connections()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Import worker stopped.")
+
+    def _drain(self, threads):
+        """Runs queued jobs on ``threads`` workers until the queue is empty."""
+        counts = []
+
+        def work():
+            try:
+                counts.append(import_jobs.run_pending())
+            finally:
+                close_old_connections()
+
+        workers = [threading.Thread(target=work) for _ in range(max(threads, 1))]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        return sum(counts)
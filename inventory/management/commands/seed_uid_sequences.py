@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory import uids
+
+
+class Command(BaseCommand):
+    help = "Seeds the per-(prefix, day) UID counters from the UIDs already issued."
+
+    def handle(self, *args, **options):
+        changed = uids.seed_sequences()
+        self.stdout.write(self.style.SUCCESS(f"UID counters seeded: {changed} created or raised."))
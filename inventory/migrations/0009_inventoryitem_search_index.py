@@ -0,0 +1,54 @@
+# Generated by Django 4.2.23 on 2026-10-17 09:12
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE inventory_inventoryitem ADD COLUMN search_vector tsvector")
+        schema_editor.execute(
+            "CREATE INDEX inventory_item_search_gin ON inventory_inventoryitem USING GIN (search_vector)"
+        )
+        schema_editor.execute("""
+            UPDATE inventory_inventoryitem AS i SET search_vector =
+                setweight(to_tsvector('simple', coalesce(i.item_name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(i.uid_no, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(i.serial_number, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(
+                    (SELECT l.name FROM inventory_location l WHERE l.id = i.location_id), '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(i.status, '')), 'C') ||
+                setweight(to_tsvector('simple', coalesce(i.description, '')), 'D')
+        """)
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute("""
+            CREATE VIRTUAL TABLE inventory_inventoryitem_fts USING fts5(
+                item_name, uid_no, serial_number, location, status, description
+            )
+        """)
+        schema_editor.execute("""
+            INSERT INTO inventory_inventoryitem_fts
+                (rowid, item_name, uid_no, serial_number, location, status, description)
+            SELECT i.id, i.item_name, i.uid_no, i.serial_number, l.name, i.status, i.description
+            FROM inventory_inventoryitem i LEFT JOIN inventory_location l ON l.id = i.location_id
+        """)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS inventory_item_search_gin")
+        schema_editor.execute("ALTER TABLE inventory_inventoryitem DROP COLUMN IF EXISTS search_vector")
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS inventory_inventoryitem_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_inventoryitem_owner_poc_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-17 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_inventoryitem_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorylog',
+            index=models.Index(fields=['timestamp', 'id'], name='inventory_log_ts_id_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.23 on 2026-10-17 18:53
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_counters(apps, schema_editor):
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    InventoryCounter = apps.get_model('inventory', 'InventoryCounter')
+    active = InventoryItem.objects.filter(is_deleted=False)
+    rows = [InventoryCounter(dimension='total', key='', count=active.count())]
+    for dimension, attname in [('status', 'status'), ('location', 'location_id'),
+                               ('category', 'category_id'), ('project', 'project_id')]:
+        for value, count in active.order_by().values_list(attname).annotate(n=Count('id')):
+            rows.append(InventoryCounter(dimension=dimension, key='' if value is None else str(value), count=count))
+    InventoryCounter.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_inventorylog_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('status', 'Status'), ('location', 'Location'), ('category', 'Category'), ('project', 'Project')], max_length=20)),
+                ('key', models.CharField(blank=True, help_text='Status value or related object id; blank for none', max_length=64)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Inventory Counter',
+                'verbose_name_plural': 'Inventory Counters',
+                'unique_together': {('dimension', 'key')},
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.23 on 2026-10-17 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_inventorycounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LookupVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
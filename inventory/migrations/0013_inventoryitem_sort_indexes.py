@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-17 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_lookupversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['item_name', 'id'], name='inv_item_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['status', 'id'], name='inv_item_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['quantity', 'id'], name='inv_item_quantity_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['created_at', 'id'], name='inv_item_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['updated_at', 'id'], name='inv_item_updated_id_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.23 on 2026-10-17 14:05
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    'inventory_item_serial_trgm': 'serial_number',
+    'inventory_item_uid_trgm': 'uid_no',
+    'inventory_item_name_trgm': 'item_name',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Other backends use the in-process index in inventory.fuzzy.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON inventory_inventoryitem USING GIN ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_inventoryitem_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_inventoryitem_trigram_indexes'),
+    ]
+
+    operations = [
+        # The counter is now per (prefix, day) and holds YYMMDD, not YYMM.
+        migrations.RenameField(
+            model_name='uidcategorysequence',
+            old_name='year_month',
+            new_name='day',
+        ),
+        migrations.AlterField(
+            model_name='uidcategorysequence',
+            name='category_prefix',
+            field=models.CharField(help_text='Matches ItemCategory prefix', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='uidcategorysequence',
+            name='last_sequence_number',
+            field=models.IntegerField(default=0, help_text='Last sequence number used for this category and day'),
+        ),
+        migrations.AlterField(
+            model_name='uidcategorysequence',
+            name='day',
+            field=models.CharField(help_text='Date part of the UID, format YYMMDD, e.g., 231205 for 5 Dec 2023', max_length=6),
+        ),
+    ]
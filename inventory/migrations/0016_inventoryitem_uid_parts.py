@@ -0,0 +1,75 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:06
+
+import re
+from datetime import datetime
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def split_uid(uid, prefixes):
+    # Known category prefixes first (longest wins), then any digit-free prefix.
+    for prefix in prefixes:
+        match = re.match(rf'^({re.escape(prefix)})(\d{{6}})(\d{{4,}})$', uid)
+        if match:
+            break
+    else:
+        match = re.match(r'^(\D+)(\d{6})(\d{4,})$', uid)
+    # Parts that wouldn't fit uid_prefix (10 chars) or uid_seq (a 32-bit int) are left empty.
+    if not match or len(match.group(1)) > 10 or int(match.group(3)) > 2147483647:
+        return None
+    try:
+        day = datetime.strptime(match.group(2), '%y%m%d').date()
+    except ValueError:
+        return None
+    return match.group(1), day, int(match.group(3))
+
+
+def backfill_uid_parts(apps, schema_editor):
+    InventoryItem = apps.get_model('inventory', 'InventoryItem')
+    ItemCategory = apps.get_model('inventory', 'ItemCategory')
+    prefixes = sorted(filter(None, ItemCategory.objects.values_list('prefix', flat=True)), key=len, reverse=True)
+
+    batch = []
+    items = InventoryItem.objects.exclude(uid_no__isnull=True).only('id', 'uid_no').order_by('id')
+    for item in items.iterator(chunk_size=BATCH_SIZE):
+        parts = split_uid(item.uid_no, prefixes)
+        if parts:
+            item.uid_prefix, item.uid_date, item.uid_seq = parts
+            batch.append(item)
+        if len(batch) >= BATCH_SIZE:
+            InventoryItem.objects.bulk_update(batch, ['uid_prefix', 'uid_date', 'uid_seq'])
+            batch = []
+    if batch:
+        InventoryItem.objects.bulk_update(batch, ['uid_prefix', 'uid_date', 'uid_seq'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_uidcategorysequence_per_day'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='uid_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='uid_prefix',
+            field=models.CharField(blank=True, editable=False, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='uid_seq',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['uid_prefix', 'uid_date', 'uid_seq'], name='inv_item_uid_parts_idx'),
+        ),
+        migrations.RunPython(backfill_uid_parts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inventory', '0016_inventoryitem_uid_parts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('review', 'Parse for review'), ('import', 'Direct import')], default='review', max_length=10)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('file', models.FileField(upload_to='import_jobs/')),
+                ('original_name', models.CharField(max_length=255)),
+                ('total_rows', models.PositiveIntegerField(blank=True, help_text='Estimated before processing starts', null=True)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list, help_text='[row number, message] pairs, capped')),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='inv_import_job_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0017_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportStagingRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_no', models.PositiveIntegerField(help_text='Spreadsheet row number')),
+                ('item_name', models.CharField(blank=True, max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('quantity', models.IntegerField(blank=True, null=True)),
+                ('serial_number', models.CharField(blank=True, max_length=100)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventory.itemcategory')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='staged_rows', to='inventory.importjob')),
+            ],
+            options={
+                'ordering': ['job', 'row_no'],
+                'indexes': [models.Index(fields=['job', 'row_no'], name='inv_import_staging_row_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0018_importstagingrow'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='error_sheet',
+            field=models.FileField(blank=True, help_text='Every validation problem, as CSV', upload_to='import_jobs/errors/'),
+        ),
+    ]
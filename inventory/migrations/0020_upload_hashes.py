@@ -0,0 +1,45 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inventory', '0019_importjob_error_sheet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the uploaded file', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='InvoiceScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('original_name', models.CharField(max_length=255)),
+                ('invoice_number', models.CharField(blank=True, max_length=100)),
+                ('items', models.JSONField(blank=True, default=list)),
+                ('file_path', models.CharField(blank=True, help_text='Saved invoice, relative to MEDIA_ROOT', max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.BigIntegerField(help_text="64-bit hash of the row's values")),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='imported_rows', to='inventory.importjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['digest'], name='inv_imported_row_digest_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0020_upload_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importstagingrow',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventory.location'),
+        ),
+        migrations.AddField(
+            model_name='importstagingrow',
+            name='project',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventory.project'),
+        ),
+        migrations.AddField(
+            model_name='importstagingrow',
+            name='status',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='inventory.itemstatus'),
+        ),
+    ]
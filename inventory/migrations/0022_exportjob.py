@@ -0,0 +1,41 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('inventory', '0021_importstagingrow_assignments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.CharField(help_text='SHA-256 of the normalised export parameters', max_length=64)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('format', models.CharField(max_length=10)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('file', models.FileField(blank=True, upload_to='export_jobs/')),
+                ('size', models.PositiveBigIntegerField(default=0, help_text='Bytes on disk')),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('data_updated_at', models.DateTimeField(blank=True, help_text='Latest item updated_at when the build started', null=True)),
+                ('data_count', models.PositiveIntegerField(blank=True, help_text='Items exported, counted when the build started', null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('last_used_at', models.DateTimeField(blank=True, help_text='Last download; eviction drops the least recently used first', null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='inv_export_job_queue_idx'), models.Index(fields=['signature', 'status'], name='inv_export_job_sig_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-17 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0022_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='data_versions',
+            field=models.CharField(blank=True, help_text='Versions of the related lists (names, kits) when the build started', max_length=255),
+        ),
+    ]
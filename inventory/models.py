@@ -6,7 +6,6 @@ from django.contrib.auth import get_user_model
 import uuid
 from django.db import transaction
 from datetime import date
-from django.db.models import Max
 
 
 from django.db.models import F
@@ -121,17 +120,17 @@ class ItemCategory(models.Model):
         return self.name
 
 class UIDCategorySequence(models.Model):
-    category_prefix = models.CharField(max_length=10, unique=True, help_text="Matches ItemCategory prefix")
-    year_month = models.CharField(max_length=4, help_text="Format YYMM, e.g., 2312 for Dec 2023")
-    last_sequence_number = models.IntegerField(default=0, help_text="Last sequence number used for this category and month")
+    category_prefix = models.CharField(max_length=10, help_text="Matches ItemCategory prefix")
+    day = models.CharField(max_length=6, help_text="Date part of the UID, format YYMMDD, e.g., 231205 for 5 Dec 2023")
+    last_sequence_number = models.IntegerField(default=0, help_text="Last sequence number used for this category and day")
 
     class Meta:
-        unique_together = ('category_prefix', 'year_month')
+        unique_together = ('category_prefix', 'day')
         verbose_name = "UID Category Sequence"
         verbose_name_plural = "UID Category Sequences"
 
     def __str__(self):
-        return f"{self.category_prefix}-{self.year_month}: {self.last_sequence_number}"
+        return f"{self.category_prefix}-{self.day}: {self.last_sequence_number}"
     
 class InventoryItem(models.Model):
     STATUS_CHOICES = [
@@ -150,6 +149,10 @@ class InventoryItem(models.Model):
     image = models.ImageField(upload_to='inventory_images/', blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Offline')
     uid_no = models.CharField(max_length=50, unique=True, editable=False, blank=True, null=True)
+    # uid_no split into its parts ({prefix}{yymmdd}{seq}), filled when the UID is assigned.
+    uid_prefix = models.CharField(max_length=10, editable=False, blank=True, null=True)
+    uid_date = models.DateField(editable=False, blank=True, null=True)
+    uid_seq = models.PositiveIntegerField(editable=False, blank=True, null=True)
     serial_number = models.CharField(max_length=100, unique=True, blank=True, null=True)
     quantity = models.IntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00')) 
@@ -169,6 +172,17 @@ class InventoryItem(models.Model):
     class Meta:
         ordering = ['item_name']
         verbose_name_plural = "Inventory Items"
+        indexes = [
+            # (column, id) pairs back the whitelisted dashboard/API sorts and
+            # their keyset cursors; uid_no and serial_number are already unique.
+            models.Index(fields=['item_name', 'id'], name='inv_item_name_id_idx'),
+            models.Index(fields=['status', 'id'], name='inv_item_status_id_idx'),
+            models.Index(fields=['quantity', 'id'], name='inv_item_quantity_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='inv_item_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='inv_item_updated_id_idx'),
+            # "All laptops received this week": prefix equality plus a date range.
+            models.Index(fields=['uid_prefix', 'uid_date', 'uid_seq'], name='inv_item_uid_parts_idx'),
+        ]
 
     def __str__(self):
         return f"{self.item_name} ({self.uid_no or self.serial_number or 'N/A'})"
@@ -176,39 +190,69 @@ class InventoryItem(models.Model):
     def is_in_kit(self):
         return self.kits.exists()
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The UID as stored, so save() only splits it again once it changes.
+        instance._stored_uid_no = instance.__dict__.get('uid_no')
+        return instance
+
     def save(self, *args, **kwargs):
         # Generate a UID only if it's a new item and a UID has not been set yet.
+        # The number comes from the per-(prefix, day) counter in
+        # UIDCategorySequence; see inventory.uids.
+        from . import uids
         if not self.pk and not self.uid_no:
-            # Check if a category is linked to the item
-            if self.category:
-                category_prefix = self.category.prefix
-            else:
-                # Fallback to a default prefix if no category is assigned
-                category_prefix = "OTH"
-
-            today_str = date.today().strftime('%y%m%d')
-            prefix_with_date = f"{category_prefix}{today_str}"
-            
-            # Find the highest existing UID number for the day and category
-            with transaction.atomic():
-                max_uid = InventoryItem.objects.select_for_update().filter(
-                    uid_no__startswith=prefix_with_date
-                ).aggregate(max_uid=Max('uid_no'))
-
-                latest_seq = 0
-                if max_uid['max_uid']:
-                    try:
-                        # Extract the numeric part of the UID and convert to an integer
-                        latest_seq = int(max_uid['max_uid'][-4:])
-                    except (ValueError, IndexError):
-                        # Reset sequence if the UID format is unexpected
-                        latest_seq = 0
-                
-                # Increment the sequence number and format the new UID
-                next_seq = latest_seq + 1
-                self.uid_no = f"{prefix_with_date}{next_seq:04d}"
-
-        super().save(*args, **kwargs)
+            uids.allocate(self)
+        elif self.uid_no and self.uid_no != getattr(self, '_stored_uid_no', None):
+            uids.fill_parts(self)
+
+        # post_save handlers (counters) run inside save_base, so they commit
+        # or roll back together with the row itself.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._stored_uid_no = self.uid_no
+
+
+class InventoryCounter(models.Model):
+    """
+    Running count of active (not soft-deleted) items, overall and per status,
+    location, category and project. Maintained by the signal handlers in
+    inventory.signals; `manage.py recount` rebuilds it from scratch.
+    """
+    DIMENSION_CHOICES = [
+        ('total', 'Total'),
+        ('status', 'Status'),
+        ('location', 'Location'),
+        ('category', 'Category'),
+        ('project', 'Project'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=64, blank=True, help_text="Status value or related object id; blank for none")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('dimension', 'key')
+        verbose_name = "Inventory Counter"
+        verbose_name_plural = "Inventory Counters"
+
+    def __str__(self):
+        return f"{self.dimension}:{self.key or '-'} = {self.count}"
+
+
+class LookupVersion(models.Model):
+    """
+    Version stamp for a reference list served by the lookup endpoints
+    (locations, projects, users). Bumped whenever a row in that list changes,
+    so browsers can cache the JSON and revalidate with a cheap ETag check.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
 
 
 class Kit(models.Model):
@@ -233,6 +277,10 @@ class InventoryLog(models.Model):
     class Meta:
         ordering = ['-timestamp']
         verbose_name_plural = "Inventory Logs"
+        indexes = [
+            # Backs keyset pagination of the audit log (timestamp, id).
+            models.Index(fields=['timestamp', 'id'], name='inventory_log_ts_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.timestamp.strftime('%Y-%m-%d %H:%M')} - {self.user.username if self.user else 'N/A'} - {self.action} - {self.inventory_item.item_name if self.inventory_item else self.uid_number}"
@@ -259,4 +307,157 @@ class InventoryDocument(models.Model):
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class ImportJob(models.Model):
+    """
+    A spreadsheet upload processed off the request path by the import worker
+    (`manage.py run_import_jobs`, see inventory.import_jobs). The browser
+    polls its progress through the import_job_status endpoint.
+    """
+    KIND_CHOICES = [
+        ('review', 'Parse for review'),
+        ('import', 'Direct import'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='review')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='import_jobs/')
+    original_name = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the uploaded file")
+    total_rows = models.PositiveIntegerField(blank=True, null=True, help_text="Estimated before processing starts")
+    processed_rows = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="[row number, message] pairs, capped")
+    error_count = models.PositiveIntegerField(default=0)
+    result = models.JSONField(default=dict, blank=True)
+    error_sheet = models.FileField(upload_to='import_jobs/errors/', blank=True, help_text="Every validation problem, as CSV")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # The worker's queue scan: oldest queued job first.
+            models.Index(fields=['status', 'created_at'], name='inv_import_job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.original_name}) - {self.status}"
+
+
+class ImportStagingRow(models.Model):
+    """
+    One parsed spreadsheet row waiting for review, keyed by the ImportJob
+    (the import batch) it came from. The review page reads these a page at a
+    time and writes the reviewer's edits back; the session only carries the
+    job id.
+    """
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='staged_rows')
+    row_no = models.PositiveIntegerField(help_text="Spreadsheet row number")
+    item_name = models.CharField(max_length=255, blank=True)
+    description = models.TextField(blank=True, null=True)
+    quantity = models.IntegerField(blank=True, null=True)
+    serial_number = models.CharField(max_length=100, blank=True)
+    category = models.ForeignKey(ItemCategory, on_delete=models.SET_NULL, null=True, blank=True)
+    location = models.ForeignKey(Location, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.ForeignKey(ItemStatus, on_delete=models.SET_NULL, null=True, blank=True)
+    project = models.ForeignKey(Project, on_delete=models.SET_NULL, null=True, blank=True)
+
+    class Meta:
+        ordering = ['job', 'row_no']
+        indexes = [
+            models.Index(fields=['job', 'row_no'], name='inv_import_staging_row_idx'),
+        ]
+
+    def __str__(self):
+        return f"Import #{self.job_id} row {self.row_no}: {self.item_name}"
+
+
+
+class ImportedRow(models.Model):
+    """
+    Fingerprint of a spreadsheet row a direct import inserted. When the same
+    user uploads a file of the same name again, rows whose fingerprint is
+    already recorded are left alone and only new or changed rows go in.
+    """
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='imported_rows')
+    digest = models.BigIntegerField(help_text="64-bit hash of the row's values")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['digest'], name='inv_imported_row_digest_idx'),
+        ]
+
+    def __str__(self):
+        return f"Import #{self.job_id} row {self.digest:x}"
+
+
+class InvoiceScan(models.Model):
+    """
+    The OCR result for an invoice file, keyed by the file's SHA-256, so
+    uploading the same invoice again reuses it instead of calling the OCR
+    service twice.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    original_name = models.CharField(max_length=255)
+    invoice_number = models.CharField(max_length=100, blank=True)
+    items = models.JSONField(default=list, blank=True)
+    file_path = models.CharField(max_length=500, blank=True, help_text="Saved invoice, relative to MEDIA_ROOT")
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.original_name} ({self.invoice_number or 'no invoice number'})"
+
+
+class ExportJob(models.Model):
+    """
+    An inventory export built off the request path by the export worker
+    (`manage.py run_export_jobs`, see inventory.export_jobs) and kept on disk,
+    so a repeat of the same export against unchanged items is served as is.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    signature = models.CharField(max_length=64, help_text="SHA-256 of the normalised export parameters")
+    params = models.JSONField(default=dict, blank=True)
+    format = models.CharField(max_length=10)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='export_jobs/', blank=True)
+    size = models.PositiveBigIntegerField(default=0, help_text="Bytes on disk")
+    row_count = models.PositiveIntegerField(default=0)
+    data_updated_at = models.DateTimeField(blank=True, null=True, help_text="Latest item updated_at when the build started")
+    data_count = models.PositiveIntegerField(blank=True, null=True, help_text="Items exported, counted when the build started")
+    data_versions = models.CharField(
+        max_length=255, blank=True, help_text="Versions of the related lists (names, kits) when the build started"
+    )
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    last_used_at = models.DateTimeField(blank=True, null=True, help_text="Last download; eviction drops the least recently used first")
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # The worker's queue scan: oldest queued job first.
+            models.Index(fields=['status', 'created_at'], name='inv_export_job_queue_idx'),
+            # Finding a reusable artifact for a request.
+            models.Index(fields=['signature', 'status'], name='inv_export_job_sig_idx'),
+        ]
+
+    def __str__(self):
+        return f"Export #{self.pk} ({self.format}) - {self.status}"
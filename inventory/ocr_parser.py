@@ -5,23 +5,12 @@ import json
 import time
 from django.conf import settings
 from decimal import Decimal
-CATEGORY_KEYWORDS = {
-    "server": "Server",
-    "docking": "Docking Station",
-    "monitor": "Monitor",
-    "printer": "Printer",
-    "cable": "Cables",
-    "charger": "Chargers",
-    "laptop": "Laptop",
-}
+from . import category_match
+
 
 def map_category(item_name, description):
-    """Map to category by keyword, fallback to 'Other'."""
-    text = f"{item_name} {description}".lower()
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        if any(keyword in text for keyword in keywords):
-            return category
-    return "Other"
+    """Map to a category name by keyword (see inventory.category_match), fallback to 'Other'."""
+    return category_match.matcher().match_name(f"{item_name} {description}")
 
 def normalize_items(scanned_items, invoice_number=None, temp_file_url=None):
     """Ensure all items are returned with consistent structure and safe defaults."""
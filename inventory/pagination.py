@@ -0,0 +1,206 @@
+# inventory_management/inventory/pagination.py
+
+"""
+Keyset (cursor) pagination for large listings.
+
+``Paginator`` pages with OFFSET and a full COUNT(*), so page N of the audit
+log costs N times page 1. ``KeysetPaginator`` instead orders by the active
+sort column plus ``id`` and asks for the rows strictly after (or before) the
+last row it handed out, which an index on the sort column can answer
+directly. The position travels between requests as an opaque cursor token.
+
+``paginate()`` keeps the familiar numbered pages for result sets no larger
+than ``INVENTORY_NUMBERED_PAGINATION_MAX_ROWS`` and switches to cursors
+above that.
+"""
+
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import F, Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(direction, value, pk):
+    # isoformat() keeps microseconds; DjangoJSONEncoder would round them off
+    # and make rows sharing a millisecond fall between two pages.
+    if isinstance(value, (datetime, date, time)):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    payload = json.dumps([direction, value, pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+    if direction not in ('next', 'prev') or not isinstance(pk, int):
+        raise InvalidCursor(token)
+    return direction, value, pk
+
+
+class KeysetPage:
+    """A page of rows plus the cursor tokens for its neighbours."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+class KeysetPaginator:
+    """
+    Pages ``queryset`` ordered by ``(sort_field, id)``. NULLs sort first in
+    ascending order and last in descending order on every backend, so a
+    descending walk is the exact mirror of an ascending one.
+    """
+
+    def __init__(self, queryset, sort_field, descending=False, per_page=10):
+        self.queryset = queryset
+        self.sort_field = sort_field
+        self.descending = descending
+        self.per_page = int(per_page)
+        self.field = self._resolve_field(queryset.model, sort_field)
+
+    @staticmethod
+    def _resolve_field(model, path):
+        field = None
+        for part in path.split('__'):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                raise ValueError(f"Cannot keyset-paginate on '{path}'.")
+            model = field.related_model if field.is_relation else model
+        if field.is_relation:
+            field = field.target_field
+        return field
+
+    def _ordering(self, descending):
+        column = F(self.sort_field)
+        if descending:
+            return [column.desc(nulls_last=True), F('id').desc()]
+        return [column.asc(nulls_first=True), F('id').asc()]
+
+    def _after(self, value, pk, descending):
+        """Rows that follow ``(value, pk)`` in the given walk order."""
+        field = self.sort_field
+        if not descending:
+            if value is None:
+                return Q(**{f'{field}__isnull': True, 'id__gt': pk}) | Q(**{f'{field}__isnull': False})
+            return Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk})
+        if value is None:
+            return Q(**{f'{field}__isnull': True, 'id__lt': pk})
+        return (
+            Q(**{f'{field}__lt': value}) |
+            Q(**{field: value, 'id__lt': pk}) |
+            Q(**{f'{field}__isnull': True})
+        )
+
+    def _row_key(self, obj):
+        if isinstance(obj, dict):  # rows from .values()
+            return obj[self.sort_field], obj['id']
+        value = obj
+        for part in self.sort_field.split('__'):
+            value = getattr(value, part, None) if value is not None else None
+        if hasattr(value, '_meta'):
+            value = value.pk
+        return value, obj.pk
+
+    def page(self, cursor=None):
+        direction, value, pk = ('next', None, None)
+        if cursor:
+            direction, value, pk = decode_cursor(cursor)
+            try:
+                value = self.field.to_python(value) if value is not None else None
+            except Exception:
+                raise InvalidCursor(cursor)
+
+        backwards = direction == 'prev'
+        walk_descending = self.descending != backwards
+        rows = self.queryset.order_by(*self._ordering(walk_descending))
+        if pk is not None:
+            rows = rows.filter(self._after(value, pk, walk_descending))
+
+        rows = list(rows[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            first_key, last_key = self._row_key(rows[0]), self._row_key(rows[-1])
+            if has_more or backwards:
+                next_cursor = encode_cursor('next', *last_key)
+            if (has_more and backwards) or (not backwards and pk is not None):
+                previous_cursor = encode_cursor('prev', *first_key)
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+def paginate(request, queryset, sort_field, descending=False, page_size=10):
+    """
+    Returns ``(page_obj, cursor_mode)`` for ``queryset``.
+
+    Numbered pages are used while the result set fits under the configured
+    limit (checked with a bounded COUNT over ``LIMIT n + 1``); bigger result
+    sets, or any request that already carries a ``cursor``, get keyset pages.
+    ``sort_field=None`` forces numbered pages, for orderings such as search
+    rank that a cursor can't follow.
+    """
+    limit = getattr(settings, 'INVENTORY_NUMBERED_PAGINATION_MAX_ROWS', 5000)
+    cursor = request.GET.get('cursor')
+
+    use_cursor = sort_field is not None and (
+        cursor or queryset.order_by()[:limit + 1].count() > limit
+    )
+    if use_cursor:
+        paginator = KeysetPaginator(queryset, sort_field, descending, page_size)
+        try:
+            return paginator.page(cursor), True
+        except InvalidCursor:
+            return paginator.page(None), True
+
+    paginator = Paginator(queryset, page_size)
+    page_number = request.GET.get('page', 1)
+    try:
+        page_obj = paginator.page(page_number)
+    except PageNotAnInteger:
+        page_obj = paginator.page(1)
+    except EmptyPage:
+        page_obj = paginator.page(paginator.num_pages)
+    return page_obj, False
+
+
+def pagination_query(request):
+    """The current query string minus ``page``/``cursor``, for building page links."""
+    params = request.GET.copy()
+    params.pop('page', None)
+    params.pop('cursor', None)
+    return params.urlencode()
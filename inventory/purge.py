@@ -0,0 +1,93 @@
+# inventory_management/inventory/purge.py
+
+"""
+Hard-deletes soft-deleted items once their undo window has passed.
+
+Runs from the ``purge_deleted_items`` management command (once, or as a
+loop worker) rather than on the dashboard request path. Expired rows are
+taken in id-ordered chunks; each chunk gets its purge log rows in a single
+bulk_create, its dependent rows removed with one statement per table, and
+the items themselves deleted with a single raw DELETE. That skips Django's
+delete collector and the per-row post_delete handlers, so the search index,
+facet cache and kit lookup version are brought up to date once per chunk
+instead. Counters and the fuzzy index need nothing: a soft-deleted item
+already left both when it was deleted.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import facets, lookups, search
+from .models import InventoryDocument, InventoryItem, InventoryLog, Kit, TechnicalData
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def undo_window():
+    return timedelta(seconds=getattr(settings, 'INVENTORY_UNDO_WINDOW_SECONDS', 30))
+
+
+def expired_items(now=None):
+    expiry_time = (now or timezone.now()) - undo_window()
+    return InventoryItem.objects.filter(is_deleted=True, deleted_at__lt=expiry_time).order_by('id')
+
+
+def _delete_chunk(ids):
+    """
+    Deletes the given (locked) items and what hangs off them; returns the
+    number of items deleted.
+    """
+    InventoryLog.objects.filter(inventory_item_id__in=ids).update(inventory_item=None)
+    InventoryDocument.objects.filter(inventory_item_id__in=ids).delete()
+    TechnicalData.objects.filter(item_id__in=ids).delete()
+    kit_rows, _ = Kit.items.through.objects.filter(inventoryitem_id__in=ids).delete()
+
+    # No expiry re-check needed: the rows are locked, so none was restored.
+    items = InventoryItem.objects.filter(id__in=ids)
+    deleted = items._raw_delete(items.db)
+
+    search.remove_items(ids)
+    facets.invalidate()
+    if kit_rows:
+        lookups.bump('kits')
+    return deleted
+
+
+def purge_expired(chunk_size=DEFAULT_CHUNK_SIZE, now=None):
+    """Purges every expired item; returns how many were deleted."""
+    expired = expired_items(now)
+    purged = 0
+    last_id = 0
+
+    while True:
+        with transaction.atomic():
+            chunk = list(
+                expired.filter(id__gt=last_id).select_for_update()
+                .values('id', 'item_name', 'uid_no')[:chunk_size]
+            )
+            if not chunk:
+                break
+            ids = [row['id'] for row in chunk]
+            last_id = ids[-1]
+
+            InventoryLog.objects.bulk_create([
+                InventoryLog(
+                    user=None,  # system action
+                    inventory_item=None,
+                    action="item_purged",
+                    details=f'Item "{row["item_name"]}" (UID {row["uid_no"]}) was permanently deleted.',
+                    uid_number=row['uid_no'],
+                )
+                for row in chunk
+            ])
+            purged += _delete_chunk(ids)
+
+    if purged:
+        logger.info(f"Purged {purged} items permanently.")
+    return purged
@@ -0,0 +1,69 @@
+# inventory_management/inventory/querysets.py
+
+from django.db.models import Aggregate, CharField, Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import search
+from .models import InventoryDocument, Kit
+
+
+class GroupConcat(Aggregate):
+    """Comma-separated aggregate: GROUP_CONCAT on SQLite, STRING_AGG on PostgreSQL."""
+    function = 'GROUP_CONCAT'
+    template = "%(function)s(%(expressions)s, ', ')"
+    output_field = CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='STRING_AGG', **extra_context)
+
+
+def with_row_annotations(queryset):
+    """
+    Annotates ``document_count`` and ``kit_names`` onto each item and joins
+    the foreign keys the dashboard/exports display, so a page of rows costs
+    a single query. Correlated subqueries keep the outer query free of a
+    GROUP BY, so only the rows actually returned are counted.
+    """
+    document_count = (
+        InventoryDocument.objects.filter(inventory_item=OuterRef('pk'))
+        .values('inventory_item')
+        .annotate(c=Count('id'))
+        .values('c')
+    )
+    kit_names = (
+        Kit.items.through.objects.filter(inventoryitem=OuterRef('pk'))
+        .values('inventoryitem')
+        .annotate(names=GroupConcat('kit__name'))
+        .values('names')
+    )
+    return queryset.select_related('location', 'project', 'category').annotate(
+        document_count=Coalesce(Subquery(document_count, output_field=IntegerField()), 0),
+        kit_names=Subquery(kit_names, output_field=CharField()),
+    )
+
+
+FILTER_DIMENSIONS = ('category', 'location', 'project', 'status')
+
+# FilterForm field -> lookup on the decomposed UID columns.
+UID_FILTERS = {
+    'uid_prefix': 'uid_prefix',
+    'received_from': 'uid_date__gte',
+    'received_to': 'uid_date__lte',
+}
+
+
+def apply_filters(queryset, data, exclude=None, ranked=True):
+    """
+    Applies FilterForm.cleaned_data (search, category, status, location,
+    project and the UID prefix/date range). ``exclude`` skips one
+    dimension, as facet counts need.
+    """
+    for name in FILTER_DIMENSIONS:
+        if name != exclude and data.get(name):
+            queryset = queryset.filter(**{name: data[name]})
+    for name, lookup in UID_FILTERS.items():
+        if data.get(name):
+            queryset = queryset.filter(**{lookup: data[name]})
+    if data.get('search'):
+        queryset = search.search_items(queryset, data['search'], ranked=ranked)
+    return queryset
@@ -0,0 +1,187 @@
+# inventory_management/inventory/search.py
+
+"""
+Full-text search index behind the dashboard search box.
+
+PostgreSQL keeps a weighted ``tsvector`` in ``inventoryitem.search_vector``
+(GIN indexed); SQLite keeps an FTS5 shadow table whose rowid is the item id.
+Both are created by migration 0009 and refreshed from the post_save /
+post_delete signals in ``inventory.signals``.
+
+Set ``INVENTORY_SEARCH_BACKEND = 'icontains'`` to fall back to the old
+OR-of-icontains filter.
+"""
+
+import logging
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'inventory_inventoryitem_fts'
+ITEM_TABLE = 'inventory_inventoryitem'
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit.
+INDEX_CHUNK_SIZE = 500
+
+# Columns fed into the index, in weight order (A..D on PostgreSQL).
+SEARCH_COLUMNS = ['item_name', 'uid_no', 'serial_number', 'location', 'status', 'description']
+
+# Per-column bm25() weights mirroring the A/B/C/D weights used on PostgreSQL.
+_BM25_WEIGHTS = '10.0, 10.0, 10.0, 4.0, 2.0, 1.0'
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+_PG_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce(i.item_name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(i.uid_no, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(i.serial_number, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(
+        (SELECT l.name FROM inventory_location l WHERE l.id = i.location_id), '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(i.status, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(i.description, '')), 'D')
+"""
+
+
+def search_backend():
+    """Returns 'postgresql', 'sqlite' or 'icontains' for the default connection."""
+    if getattr(settings, 'INVENTORY_SEARCH_BACKEND', 'fulltext') == 'icontains':
+        return 'icontains'
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite' and _sqlite_index_exists():
+        return 'sqlite'
+    return 'icontains'
+
+
+_sqlite_index_cache = {}
+
+
+def _sqlite_index_exists():
+    # Cached per database file, so the test database is checked on its own.
+    name = connection.settings_dict['NAME']
+    if name not in _sqlite_index_cache:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _sqlite_index_cache[name] = cursor.fetchone() is not None
+    return _sqlite_index_cache[name]
+
+
+def _terms(query):
+    return [t.lower() for t in _TERM_RE.findall(query or '')]
+
+
+def legacy_filter(query):
+    """The original dashboard behaviour: one OR of icontains lookups."""
+    return (
+        Q(item_name__icontains=query) |
+        Q(uid_no__icontains=query) |
+        Q(serial_number__icontains=query) |
+        Q(location__name__icontains=query) |
+        Q(status__icontains=query) |
+        Q(description__icontains=query)
+    )
+
+
+def search_items(queryset, query, ranked=True):
+    """
+    Filters ``queryset`` down to items matching ``query`` and, if ``ranked``,
+    annotates each row with ``search_rank`` (higher is better). Every term is
+    matched as a prefix, so partially typed UIDs and serials still hit the
+    index. Pass ``ranked=False`` for aggregate queries that don't need it.
+    """
+    terms = _terms(query)
+    backend = search_backend()
+
+    if not terms or backend == 'icontains':
+        queryset = queryset.filter(legacy_filter(query))
+        if ranked:
+            queryset = queryset.annotate(search_rank=RawSQL('0', [], output_field=FloatField()))
+        return queryset
+
+    if backend == 'postgresql':
+        tsquery = ' & '.join(f'{t}:*' for t in terms)
+        queryset = queryset.filter(
+            RawSQL(f"{ITEM_TABLE}.search_vector @@ to_tsquery('simple', %s)", [tsquery],
+                   output_field=BooleanField())
+        )
+        if ranked:
+            queryset = queryset.annotate(
+                search_rank=RawSQL(f"ts_rank({ITEM_TABLE}.search_vector, to_tsquery('simple', %s))", [tsquery],
+                                   output_field=FloatField())
+            )
+        return queryset
+
+    match = ' '.join(f'"{t}"*' for t in terms)
+    queryset = queryset.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    )
+    if ranked:
+        # bm25() is lower-is-better, so negate it to keep one ordering convention.
+        queryset = queryset.annotate(
+            search_rank=RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, {_BM25_WEIGHTS}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {ITEM_TABLE}.id)",
+                [match], output_field=FloatField()
+            )
+        )
+    return queryset
+
+
+def index_items(item_ids):
+    """(Re)builds the index rows for the given item ids."""
+    item_ids = [int(pk) for pk in item_ids]
+    backend = search_backend()
+    for start in range(0, len(item_ids), INDEX_CHUNK_SIZE):
+        _index_chunk(backend, item_ids[start:start + INDEX_CHUNK_SIZE])
+
+
+def _index_chunk(backend, item_ids):
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            if backend == 'postgresql':
+                cursor.execute(
+                    f"UPDATE {ITEM_TABLE} AS i SET search_vector = {_PG_DOCUMENT} WHERE i.id = ANY(%s)",
+                    [item_ids]
+                )
+            elif backend == 'sqlite':
+                placeholders = ', '.join(['%s'] * len(item_ids))
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", item_ids)
+                cursor.execute(
+                    f"""INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)})
+                        SELECT i.id, i.item_name, i.uid_no, i.serial_number, l.name, i.status, i.description
+                        FROM {ITEM_TABLE} i LEFT JOIN inventory_location l ON l.id = i.location_id
+                        WHERE i.id IN ({placeholders})""",
+                    item_ids
+                )
+    except Exception as e:
+        logger.error(f"Failed to update search index for items {item_ids[:10]}: {e}")
+
+
+def remove_items(item_ids):
+    """Drops index rows for deleted items (PostgreSQL rows go with the item)."""
+    item_ids = [int(pk) for pk in item_ids]
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for start in range(0, len(item_ids), INDEX_CHUNK_SIZE):
+            chunk = item_ids[start:start + INDEX_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+
+def rebuild_index():
+    """Re-indexes every item; returns the number of rows processed."""
+    from .models import InventoryItem
+
+    if search_backend() == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    ids = list(InventoryItem.objects.order_by('id').values_list('id', flat=True))
+    index_items(ids)
+    return len(ids)
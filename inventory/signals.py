@@ -0,0 +1,131 @@
+# inventory_management/inventory/signals.py
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import category_match, counters, facets, fuzzy, lookups, search
+from .models import InventoryItem, ItemCategory, ItemStatus, Kit, Location, Project
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=InventoryItem)
+def index_saved_item(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_items([instance.pk])
+
+
+@receiver(post_delete, sender=InventoryItem)
+def unindex_deleted_item(sender, instance, **kwargs):
+    search.remove_items([instance.pk])
+
+
+@receiver(post_save, sender=InventoryItem)
+def update_fuzzy_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fuzzy.item_changed(instance)
+
+
+@receiver(post_delete, sender=InventoryItem)
+def remove_from_fuzzy_index(sender, instance, **kwargs):
+    fuzzy.item_removed(instance.pk)
+
+
+@receiver(post_save, sender=Location)
+def reindex_location_items(sender, instance, created=False, raw=False, **kwargs):
+    # Location names are part of the search document.
+    if not created and not raw:
+        search.index_items(InventoryItem.objects.filter(location=instance).values_list('id', flat=True))
+
+
+# --- Dashboard counters ---
+# _counter_state holds the values an instance had when it was loaded (or
+# last saved), so a save can subtract the old contribution and add the new.
+
+@receiver(post_init, sender=InventoryItem)
+def remember_counter_state(sender, instance, **kwargs):
+    instance._counter_state = counters.snapshot(instance)
+
+
+@receiver(pre_save, sender=InventoryItem)
+def load_counter_state(sender, instance, raw=False, **kwargs):
+    if not raw and instance._counter_state is None and instance.pk and not instance._state.adding:
+        instance._counter_state = counters.load_snapshot(instance.pk)
+
+
+@receiver(post_save, sender=InventoryItem)
+def update_counters_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    after = counters.snapshot(instance) or counters.load_snapshot(instance.pk)
+    counters.item_changed(None if created else instance._counter_state, after)
+    instance._counter_state = after
+
+
+@receiver(post_delete, sender=InventoryItem)
+def update_counters_on_delete(sender, instance, **kwargs):
+    counters.item_changed(instance._counter_state or counters.snapshot(instance), None)
+
+
+# --- Facet counts ---
+# Facet buckets carry category/location/project names, so renames count too.
+
+@receiver(post_save, sender=InventoryItem)
+@receiver(post_delete, sender=InventoryItem)
+@receiver(post_save, sender=ItemCategory)
+@receiver(post_delete, sender=ItemCategory)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_facets(sender, raw=False, **kwargs):
+    if not raw:
+        facets.invalidate()
+
+
+# --- Category matcher ---
+
+@receiver(post_save, sender=ItemCategory)
+@receiver(post_delete, sender=ItemCategory)
+def invalidate_category_matcher(sender, raw=False, **kwargs):
+    if not raw:
+        category_match.invalidate()
+
+
+# --- Lookup list versions ---
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_locations_version(sender, **kwargs):
+    lookups.bump('locations')
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def bump_projects_version(sender, **kwargs):
+    lookups.bump('projects')
+
+
+@receiver(post_save, sender=ItemStatus)
+@receiver(post_delete, sender=ItemStatus)
+def bump_statuses_version(sender, **kwargs):
+    lookups.bump('statuses')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_users_version(sender, update_fields=None, **kwargs):
+    # Every login saves last_login; that doesn't change the users list.
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    lookups.bump('users')
+
+
+@receiver(post_save, sender=Kit)
+@receiver(post_delete, sender=Kit)
+@receiver(m2m_changed, sender=Kit.items.through)
+def bump_kits_version(sender, action=None, **kwargs):
+    # Kit names and membership appear in exports; see inventory.export_jobs.
+    if action is None or action.startswith('post_'):
+        lookups.bump('kits')
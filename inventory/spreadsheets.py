@@ -0,0 +1,144 @@
+# inventory_management/inventory/spreadsheets.py
+
+"""
+Streaming readers for uploaded spreadsheets.
+
+``read_batches`` yields the rows of a CSV or XLSX upload as DataFrames of at
+most ``batch_size`` rows, with column names stripped and lower-cased, so
+validation and inserts can work batch by batch and peak memory depends on
+the batch size rather than the file size:
+
+* CSV goes through ``pd.read_csv(chunksize=...)``.
+* XLSX is opened with openpyxl in ``read_only`` mode and walked with
+  ``iter_rows``, which never materialises the whole sheet.
+* Legacy ``.xls`` has no streaming reader, so it is read whole by
+  ``pd.read_excel`` and then sliced; the format caps out at 65,536 rows.
+
+Django spools large uploads to a temporary file, so the readers stream from
+disk rather than from a copy of the upload held in memory.
+"""
+
+import codecs
+import os
+
+import openpyxl
+import pandas as pd
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Bytes sniffed to decide between UTF-8 and Latin-1 for CSV uploads.
+_SNIFF_BYTES = 1024 * 1024
+
+EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+def extension(name):
+    return os.path.splitext(name or '')[1].lower()
+
+
+def _normalise_columns(df):
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    return df
+
+
+def _csv_encoding(fileobj):
+    """UTF-8 unless the first megabyte doesn't decode as UTF-8, in which case Latin-1."""
+    head = fileobj.read(_SNIFF_BYTES)
+    fileobj.seek(0)
+    try:
+        # final=False tolerates a multi-byte character cut off at the end of the sample.
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin1'
+
+
+def _csv_batches(fileobj, batch_size):
+    encoding = _csv_encoding(fileobj)
+    # Any stray bytes past the sniffed sample are replaced rather than failing the import.
+    reader = pd.read_csv(fileobj, chunksize=batch_size, encoding=encoding, encoding_errors='replace')
+    with reader:
+        for chunk in reader:
+            yield _normalise_columns(chunk)
+
+
+def _xlsx_batches(fileobj, batch_size):
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [c if c is not None else f'unnamed: {i}' for i, c in enumerate(header)]
+        batch = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            batch.append(row[:len(columns)])
+            if len(batch) >= batch_size:
+                yield _normalise_columns(pd.DataFrame(batch, columns=columns))
+                batch = []
+        if batch:
+            yield _normalise_columns(pd.DataFrame(batch, columns=columns))
+    finally:
+        workbook.close()
+
+
+def _xls_batches(fileobj, batch_size):
+    df = _normalise_columns(pd.read_excel(fileobj))
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+
+def read_batches(uploaded_file, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yields DataFrames of up to ``batch_size`` rows from an uploaded CSV,
+    XLSX or XLS file. Each frame keeps the file's row positions in its index
+    (0 = first data row), so callers can report spreadsheet row numbers.
+    """
+    ext = extension(uploaded_file.name)
+    if ext not in EXTENSIONS:
+        raise UnsupportedFormat(f"Unsupported file format '{ext or uploaded_file.name}'.")
+
+    # The underlying file object: pandas only treats objects it can tell are
+    # binary as bytes, and UploadedFile hides the mode.
+    fileobj = getattr(uploaded_file, 'file', uploaded_file)
+    fileobj.seek(0)
+    readers = {'.csv': _csv_batches, '.xlsx': _xlsx_batches, '.xls': _xls_batches}
+    offset = 0
+    for df in readers[ext](fileobj, batch_size):
+        df.index = range(offset, offset + len(df))
+        offset += len(df)
+        yield df
+
+
+def count_rows(fileobj, name):
+    """
+    A cheap estimate of the data rows in an upload, for progress reporting:
+    newlines for CSV, the sheet dimensions for XLSX. None if unknown.
+    """
+    ext = extension(name)
+    fileobj.seek(0)
+    try:
+        if ext == '.csv':
+            lines, last = 0, b''
+            for chunk in iter(lambda: fileobj.read(_SNIFF_BYTES), b''):
+                lines += chunk.count(b'\n')
+                last = chunk[-1:]
+            if last and last != b'\n':
+                lines += 1
+            return max(lines - 1, 0)
+        if ext == '.xlsx':
+            workbook = openpyxl.load_workbook(fileobj, read_only=True)
+            try:
+                max_row = workbook.active.max_row
+            finally:
+                workbook.close()
+            return max(max_row - 1, 0) if max_row else None
+        return None
+    finally:
+        fileobj.seek(0)
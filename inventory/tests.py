@@ -1,3 +1,1454 @@
-from django.test import TestCase
+import csv
+import html
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+import openpyxl
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import close_old_connections, connection
+from django.db.models import QuerySet
+from django.http import FileResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import (
+    api, bulk, category_match, counters, export_jobs, exports, facets, fuzzy, import_jobs, imports, lookups, pagination,
+    purge, search, spreadsheets, uids,
+)
+from .models import (
+    ExportJob, ImportJob, InventoryDocument, InventoryItem, InventoryLog, InvoiceScan, ItemCategory, ItemStatus, Kit,
+    Location, LookupVersion, Project, TechnicalData, UIDCategorySequence,
+)
+
+User = get_user_model()
+
+
+class TempMediaMixin:
+    """Gives each test class its own MEDIA_ROOT, removed once the class is done."""
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root))
+        super().setUpClass()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.north = Location.objects.create(name='North Store')
+        cls.laptop = InventoryItem.objects.create(
+            item_name='Dell Latitude', serial_number='CN0R8H4K', description='Spare', location=cls.north,
+        )
+        cls.dock = InventoryItem.objects.create(item_name='Docking station', description='For the Dell Latitude')
+        cls.monitor = InventoryItem.objects.create(item_name='Samsung Monitor', serial_number='ZX99QW12')
+
+    def found(self, query):
+        return list(search.search_items(InventoryItem.objects.all(), query).order_by('-search_rank', 'id'))
+
+    def test_uses_the_fulltext_index(self):
+        self.assertIn(search.search_backend(), ('sqlite', 'postgresql'))
+
+    def test_every_term_must_match_as_a_prefix(self):
+        self.assertEqual(self.found('latit'), [self.laptop, self.dock])
+        self.assertEqual(self.found('cn0r8'), [self.laptop])
+        self.assertEqual(self.found('dell samsung'), [])
+
+    def test_name_matches_rank_above_description_matches(self):
+        ranked = self.found('dell')
+        self.assertEqual(ranked, [self.laptop, self.dock])
+        self.assertGreater(ranked[0].search_rank, ranked[1].search_rank)
+
+    def test_index_follows_item_and_location_changes(self):
+        self.monitor.item_name = 'Samsung Curved Monitor'
+        self.monitor.save()
+        self.assertEqual(self.found('curved'), [self.monitor])
+
+        self.north.name = 'Basement'
+        self.north.save()
+        self.assertEqual(self.found('basement'), [self.laptop])
+        self.assertEqual(self.found('north'), [])
+
+        self.monitor.delete()
+        self.assertEqual(self.found('samsung'), [])
+
+    def test_rebuild_restores_a_cleared_index(self):
+        search.remove_items([self.laptop.pk, self.dock.pk, self.monitor.pk])
+        self.assertEqual(self.found('dell'), [])
+        self.assertEqual(search.rebuild_index(), 3)
+        self.assertEqual(self.found('dell'), [self.laptop, self.dock])
+
+    @override_settings(INVENTORY_SEARCH_BACKEND='icontains')
+    def test_icontains_fallback(self):
+        self.assertEqual(search.search_backend(), 'icontains')
+        self.assertEqual(self.found('R8H4'), [self.laptop])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class DashboardQueryCountTests(TempMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pw')
+        category = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        location = Location.objects.create(name='Warehouse A')
+        project = Project.objects.create(name='Project X')
+        kit = Kit.objects.create(name='Starter Kit')
+        for i in range(30):
+            item = InventoryItem.objects.create(
+                item_name=f'Laptop {i:02d}', serial_number=f'SN-{i}', category=category,
+                location=location, project=project, created_by=cls.user,
+            )
+            kit.items.add(item)
+            InventoryDocument.objects.create(inventory_item=item, file=ContentFile(b'x', name=f'doc{i}.txt'))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _dashboard_queries(self, page_size):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/inventory/dashboard/', {'page_size': page_size})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), page_size)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.assertEqual(self._dashboard_queries(5), self._dashboard_queries(25))
+
+    def test_rows_carry_document_count_and_kit_names(self):
+        response = self.client.get('/inventory/dashboard/', {'page_size': 5})
+        row = response.context['page_obj'][0]
+        self.assertEqual(row.document_count, 1)
+        self.assertEqual(row.kit_names, 'Starter Kit')
+
+    def test_unindexed_sorts_fall_back_to_item_name(self):
+        for sort in ('description', 'location__name', 'project__name'):
+            with self.subTest(sort):
+                response = self.client.get('/inventory/dashboard/', {'sort': sort, 'direction': 'desc'})
+                self.assertEqual(response.context['sort'], 'item_name')
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Sorting on location name gives long runs of ties plus NULLs (no location).
+        north = Location.objects.create(name='North')
+        south = Location.objects.create(name='South')
+        for i in range(23):
+            location = [north, south, None][i % 3]
+            InventoryItem.objects.create(item_name=f'Item {i:02d}', quantity=i % 4, location=location)
+
+    def expected(self, descending):
+        rows = InventoryItem.objects.values_list('id', 'location__name')
+        key = lambda row: (row[1] is not None, row[1] or '', row[0])
+        return [pk for pk, _ in sorted(rows, key=key, reverse=descending)]
+
+    def walk(self, descending, per_page=4):
+        paginator = pagination.KeysetPaginator(InventoryItem.objects.all(), 'location__name', descending, per_page)
+        pages = [paginator.page()]
+        self.assertFalse(pages[0].has_previous())
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def assert_walks_cleanly(self, descending):
+        paginator, pages = self.walk(descending)
+        forward = [item.pk for page in pages for item in page]
+        self.assertEqual(forward, self.expected(descending))
+
+        # And back again from the last page: the same pages, nothing skipped or repeated.
+        page = pages[-1]
+        backward = [[item.pk for item in page]]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.append([item.pk for item in page])
+        self.assertEqual(backward[::-1], [[item.pk for item in p] for p in pages])
+
+    def test_ascending_walk_with_ties_and_nulls(self):
+        self.assert_walks_cleanly(descending=False)
+
+    def test_descending_walk_with_ties_and_nulls(self):
+        self.assert_walks_cleanly(descending=True)
+
+    def test_page_size_dividing_the_rows_exactly(self):
+        paginator = pagination.KeysetPaginator(InventoryItem.objects.all(), 'quantity', False, 23)
+        page = paginator.page()
+        self.assertEqual(len(page), 23)
+        self.assertFalse(page.has_next())
+
+    def test_tampered_cursors_are_rejected(self):
+        paginator = pagination.KeysetPaginator(InventoryItem.objects.all(), 'quantity', False, 5)
+        bad_value = pagination.encode_cursor('next', 'not-a-number', 1)
+        bad_pk = pagination.encode_cursor('next', 1, 'x')
+        bad_direction = pagination.encode_cursor('sideways', 1, 1)
+        for cursor in ('garbage!', 'e30', bad_value, bad_pk, bad_direction):
+            with self.assertRaises(pagination.InvalidCursor, msg=cursor):
+                paginator.page(cursor)
+
+    def test_paginate_falls_back_to_the_first_page_on_a_bad_cursor(self):
+        request = RequestFactory().get('/', {'cursor': 'garbage!'})
+        page, cursor_mode = pagination.paginate(request, InventoryItem.objects.all(), 'quantity', page_size=5)
+        self.assertTrue(cursor_mode)
+        self.assertFalse(page.has_previous())
+        self.assertEqual(len(page), 5)
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.laptops = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        cls.north = Location.objects.create(name='North')
+        cls.south = Location.objects.create(name='South')
+
+    def maintained(self):
+        return {dimension: counters.breakdown(dimension) for dimension in ['total'] + list(counters.DIMENSIONS)}
+
+    def assert_matches_recount(self):
+        maintained = self.maintained()
+        counters.recount()
+        self.assertEqual(maintained, self.maintained())
+
+    def create(self, **fields):
+        fields.setdefault('category', self.laptops)
+        fields.setdefault('location', self.north)
+        return InventoryItem.objects.create(item_name='Laptop', **fields)
+
+    def test_create(self):
+        self.create()
+        self.create(status='Online', location=None)
+        self.assertEqual(counters.total(), 2)
+        self.assert_matches_recount()
+
+    def test_status_and_location_change(self):
+        item = self.create()
+        item.status = 'Assigned'
+        item.location = self.south
+        item.save()
+        self.assertEqual(counters.breakdown('status'), {'Assigned': 1})
+        self.assert_matches_recount()
+
+    def test_change_through_an_instance_loaded_with_only(self):
+        item = self.create()
+        partial = InventoryItem.objects.only('id', 'status').get(pk=item.pk)
+        partial.status = 'Online'
+        partial.save()
+        self.assertEqual(counters.breakdown('status'), {'Online': 1})
+        self.assert_matches_recount()
+
+    def test_soft_delete_and_restore(self):
+        item = self.create()
+        self.create()
+        item.is_deleted = True
+        item.deleted_at = timezone.now()
+        item.save()
+        self.assertEqual(counters.total(), 1)
+        self.assert_matches_recount()
+
+        item.is_deleted = False
+        item.deleted_at = None
+        item.save()
+        self.assertEqual(counters.total(), 2)
+        self.assert_matches_recount()
+
+    def test_bulk_create(self):
+        bulk.create_items([
+            InventoryItem(item_name=f'Laptop {i}', category=self.laptops, location=self.south if i % 2 else None)
+            for i in range(7)
+        ])
+        self.assertEqual(counters.total(), 7)
+        self.assert_matches_recount()
+
+    def test_purge(self):
+        kept = self.create()
+        for _ in range(3):
+            gone = self.create(location=self.south)
+            gone.is_deleted = True
+            gone.deleted_at = timezone.now() - timedelta(days=1)
+            gone.save()
+        self.assertEqual(purge.purge_expired(chunk_size=2), 3)
+        self.assertEqual(counters.total(), 1)
+        self.assertEqual(list(InventoryItem.objects.values_list('pk', flat=True)), [kept.pk])
+        self.assert_matches_recount()
+
+    def test_hard_delete(self):
+        item = self.create()
+        item.delete()
+        self.assertEqual(counters.total(), 0)
+        self.assert_matches_recount()
+
+
+class PurgeCommandTests(TestCase):
+    def setUp(self):
+        self.kept = InventoryItem.objects.create(item_name='Kept Laptop')
+        self.expired = []
+        for i in range(3):
+            item = InventoryItem.objects.create(item_name=f'Purged Laptop {i}', serial_number=f'PRG{i}')
+            item.is_deleted = True
+            item.deleted_at = timezone.now() - timedelta(days=1)
+            item.save()
+            self.expired.append(item)
+        self.recent = InventoryItem.objects.create(item_name='Recently Deleted Laptop')
+        self.recent.is_deleted = True
+        self.recent.deleted_at = timezone.now()
+        self.recent.save()
+
+    def purge(self, *args):
+        out = io.StringIO()
+        call_command('purge_deleted_items', *args, stdout=out)
+        return out.getvalue().strip()
+
+    def test_purges_expired_items_and_their_dependents(self):
+        first = self.expired[0]
+        TechnicalData.objects.create(item=first, host_name='host-1')
+        InventoryDocument.objects.create(inventory_item=first, file='item_document/manual.pdf')
+        Kit.objects.create(name='Starter Kit').items.add(first, self.kept)
+        log = InventoryLog.objects.create(inventory_item=first, action='item_deleted', details='Deleted')
+
+        self.assertEqual(self.purge('--chunk-size', '2'), 'Purged 3 item(s).')
+
+        self.assertEqual(
+            set(InventoryItem.objects.values_list('pk', flat=True)), {self.kept.pk, self.recent.pk},
+        )
+        self.assertFalse(TechnicalData.objects.exists())
+        self.assertFalse(InventoryDocument.objects.exists())
+        self.assertEqual(list(Kit.objects.get().items.all()), [self.kept])
+        log.refresh_from_db()
+        self.assertIsNone(log.inventory_item)
+        self.assertEqual(
+            sorted(InventoryLog.objects.filter(action='item_purged').values_list('uid_number', flat=True)),
+            sorted(item.uid_no for item in self.expired),
+        )
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "reads the FTS5 table (PostgreSQL rows go with the item)")
+    def test_purged_items_leave_the_search_index(self):
+        self.purge()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid FROM {search.FTS_TABLE}")
+            indexed = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(indexed, {self.kept.pk, self.recent.pk})
+
+    def test_nothing_to_purge(self):
+        self.assertEqual(self.purge(), 'Purged 3 item(s).')
+        self.assertEqual(self.purge(), 'Purged 0 item(s).')
+
+
+class LookupEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('viewer', password='pw')
+        Location.objects.create(name='North')
+
+    def setUp(self):
+        # Payloads are cached per version, and versions restart with every test.
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get(self, name, **headers):
+        return self.client.get(f'/inventory/api/lookups/{name}/', **headers)
+
+    def test_lists_expose_only_ids_and_names(self):
+        data = self.get('users').json()
+        self.assertEqual(data['results'], [{'id': self.user.pk, 'username': 'viewer'}])
+        self.assertEqual([row['name'] for row in self.get('locations').json()['results']], ['North'])
+
+    def test_unchanged_list_revalidates_with_304(self):
+        first = self.get('locations')
+        self.assertEqual(first.status_code, 200)
+        again = self.get('locations', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+    def test_a_change_bumps_the_version_and_etag(self):
+        first = self.get('locations')
+        Location.objects.create(name='South')
+        again = self.get('locations', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 200)
+        self.assertNotEqual(again['ETag'], first['ETag'])
+        self.assertEqual(again.json()['version'], first.json()['version'] + 1)
+        self.assertEqual([row['name'] for row in again.json()['results']], ['North', 'South'])
+
+    def test_logging_in_does_not_bump_the_users_list(self):
+        before = lookups.current_versions(['users'])['users'].version
+        self.client.force_login(self.user)
+        self.assertEqual(lookups.current_versions(['users'])['users'].version, before)
+
+    def test_only_the_current_version_url_is_cached_outright(self):
+        version = self.get('projects').json()['version']
+        self.assertIn('no-cache', self.get('projects')['Cache-Control'])
+        cached = self.client.get('/inventory/api/lookups/projects/', {'v': version})
+        self.assertIn(f'max-age={lookups.CACHE_TIMEOUT}', cached['Cache-Control'])
+        stale = self.client.get('/inventory/api/lookups/projects/', {'v': version - 1})
+        self.assertIn('no-cache', stale['Cache-Control'])
+
+    def test_unknown_list_is_404(self):
+        self.assertEqual(self.get('passwords').status_code, 404)
+
+
+class ItemApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('viewer', password='pw')
+        location = Location.objects.create(name='Warehouse A')
+        cls.items = [
+            InventoryItem.objects.create(item_name=f'Laptop {i:02d}', quantity=i % 3, location=location)
+            for i in range(7)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, **params):
+        return self.client.get('/inventory/api/items/', params)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.get().status_code, 403)
+
+    def test_default_fields(self):
+        data = self.get(limit=1).json()
+        self.assertEqual(data['fields'], api.DEFAULT_FIELDS)
+        self.assertEqual(data['results'][0]['location_name'], 'Warehouse A')
+
+    def test_sparse_fields(self):
+        data = self.get(fields='item_name,location_name', limit=2).json()
+        self.assertEqual(data['results'], [
+            {'item_name': 'Laptop 00', 'location_name': 'Warehouse A'},
+            {'item_name': 'Laptop 01', 'location_name': 'Warehouse A'},
+        ])
+
+    def test_cursors_walk_every_row_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {'fields': 'id', 'sort': '-quantity', 'limit': 3}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.get(**params).json()
+            seen += [row['id'] for row in data['results']]
+            cursor = data['next']
+            if not cursor:
+                break
+        expected = sorted(self.items, key=lambda item: (item.quantity, item.pk), reverse=True)
+        self.assertEqual(seen, [item.pk for item in expected])
+
+    def test_bad_requests_are_rejected(self):
+        for params in ({'fields': 'item_name,secret'}, {'sort': 'description'}, {'sort': 'location_name'},
+                       {'limit': 'many'}, {'cursor': 'garbage!'}):
+            with self.subTest(params):
+                self.assertEqual(self.get(**params).status_code, 400)
+
+
+class FacetCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('viewer', password='pw')
+        cls.laptops = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        cls.monitors = ItemCategory.objects.create(name='Monitor', prefix='MON')
+        cls.north = Location.objects.create(name='North')
+        cls.south = Location.objects.create(name='South')
+        for category, location, status in [
+            (cls.laptops, cls.north, 'Online'), (cls.laptops, cls.north, 'Offline'),
+            (cls.laptops, cls.south, 'Online'), (cls.monitors, cls.south, 'Online'), (cls.monitors, None, 'Online'),
+        ]:
+            InventoryItem.objects.create(item_name='Item', category=category, location=location, status=status)
+        InventoryItem.objects.create(item_name='Gone', category=cls.laptops, is_deleted=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def counts(self, **params):
+        response = self.client.get('/inventory/api/items/facets/', params)
+        self.assertEqual(response.status_code, 200)
+        return {
+            dimension: {bucket['name']: bucket['count'] for bucket in buckets}
+            for dimension, buckets in response.json().items()
+        }
+
+    def test_counts_leave_out_their_own_selection(self):
+        counts = self.counts(category=self.laptops.pk)
+        self.assertEqual(counts['category'], {'Laptop': 3, 'Monitor': 2})
+        self.assertEqual(counts['location'], {'North': 2, 'South': 1})
+        self.assertEqual(counts['status'], {'Offline': 1, 'Online': 2})
+
+    def test_items_without_a_location(self):
+        self.assertEqual(self.counts()['location'], {'North': 2, 'South': 2, None: 1})
+
+    def test_results_are_cached_until_invalidated(self):
+        self.counts()
+        with self.assertNumQueries(1):  # the version lookup only
+            facets.facet_counts({})
+
+        # A write the signals don't see is served stale until someone invalidates.
+        InventoryItem.objects.filter(category=self.monitors).update(category=self.laptops)
+        self.assertEqual(self.counts()['category'], {'Laptop': 3, 'Monitor': 2})
+        facets.invalidate()
+        self.assertEqual(self.counts()['category'], {'Laptop': 5})
+
+    def test_item_saves_invalidate(self):
+        self.counts()
+        InventoryItem.objects.create(item_name='New', category=self.monitors, status='Assigned')
+        counts = self.counts()
+        self.assertEqual(counts['category'], {'Laptop': 3, 'Monitor': 3})
+        self.assertEqual(counts['status']['Assigned'], 1)
+
+    def test_generation_lives_in_the_database(self):
+        before = LookupVersion.objects.get_or_create(name=facets.VERSION_NAME)[0].version
+        facets.invalidate()
+        self.assertEqual(LookupVersion.objects.get(name=facets.VERSION_NAME).version, before + 1)
+
+
+class FuzzySuggestionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('viewer', password='pw')
+        cls.laptop = InventoryItem.objects.create(item_name='Dell Latitude 5420', serial_number='CN0R8H4K')
+        cls.monitor = InventoryItem.objects.create(item_name='Samsung Monitor', serial_number='ZX99QW12')
+
+    def setUp(self):
+        # The in-process index outlives a test's rolled back rows; give each test its own.
+        self.enterContext(mock.patch.object(fuzzy, '_index', fuzzy.TrigramIndex()))
+
+    def test_trigrams_and_similarity(self):
+        self.assertEqual(fuzzy.trigrams('Ab'), {'  a', ' ab', 'ab '})
+        self.assertEqual(fuzzy.similarity(fuzzy.trigrams('CN0R8H4K'), fuzzy.trigrams('cn0r8h4k')), 1.0)
+        self.assertEqual(fuzzy.similarity(set(), fuzzy.trigrams('x')), 0.0)
+
+    def test_misread_serial_suggests_the_item(self):
+        results = fuzzy.suggest('CN0R8H4X')
+        self.assertEqual(results[0]['id'], self.laptop.pk)
+        self.assertEqual(results[0]['matched_field'], 'serial_number')
+        self.assertNotIn(self.monitor.pk, [r['id'] for r in results])
+
+    def test_misspelled_name_suggests_the_item(self):
+        results = fuzzy.suggest('Samsng Monitr', limit=1)
+        self.assertEqual([(r['id'], r['matched_field']) for r in results], [(self.monitor.pk, 'item_name')])
+
+    def test_index_follows_saves_and_soft_deletes(self):
+        fuzzy.suggest('warmup')  # builds the index
+        added = InventoryItem.objects.create(item_name='Lenovo ThinkPad', serial_number='PF3KQ7Z1')
+        self.assertEqual(fuzzy.suggest('PF3KQ7Z2', limit=1)[0]['id'], added.pk)
+        added.is_deleted = True
+        added.save()
+        self.assertEqual(fuzzy.suggest('PF3KQ7Z2'), [])
+
+    def test_suggest_endpoint(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/inventory/api/items/suggest/').status_code, 400)
+        data = self.client.get('/inventory/api/items/suggest/', {'q': 'CN0R8H4X', 'limit': 1}).json()
+        self.assertEqual([r['serial_number'] for r in data['results']], ['CN0R8H4K'])
+
+
+@override_settings(INVENTORY_IMPORT_JOBS_IN_PROCESS=False)
+class ImportTestCase(TempMediaMixin, TestCase):
+    """Reference data and spreadsheet builders shared by the import tests."""
+
+    HEADER = ['item_name', 'description', 'serial_number', 'quantity', 'unit_price', 'category_id', 'location_id', 'status_id']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('importer', password='pw')
+        cls.category = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        cls.location = Location.objects.create(name='Warehouse A')
+        cls.status = ItemStatus.objects.create(name='Online')
+
+    def row(self, name, serial='', **overrides):
+        values = {
+            'item_name': name, 'description': f'{name} description', 'serial_number': serial, 'quantity': 1,
+            'unit_price': '10.00', 'category_id': self.category.pk, 'location_id': self.location.pk,
+            'status_id': self.status.pk,
+        }
+        values.update(overrides)
+        return [values[column] for column in self.HEADER]
+
+    def csv_upload(self, rows, name='items.csv', header=None):
+        lines = [','.join(header or self.HEADER)] + [','.join(str(v) for v in row) for row in rows]
+        return SimpleUploadedFile(name, ('\n'.join(lines) + '\n').encode('utf-8'), content_type='text/csv')
+
+    def xlsx_upload(self, rows, name='items.xlsx'):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append([column.upper() for column in self.HEADER])
+        for row in rows:
+            sheet.append(row)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class SpreadsheetReadTests(ImportTestCase):
+    def test_csv_is_read_in_batches_keeping_row_positions(self):
+        upload = self.csv_upload([self.row(f'Item {i}') for i in range(5)])
+        batches = list(spreadsheets.read_batches(upload, batch_size=2))
+        self.assertEqual([len(df) for df in batches], [2, 2, 1])
+        self.assertEqual([df.index.tolist() for df in batches], [[0, 1], [2, 3], [4]])
+        self.assertEqual(batches[2]['item_name'].tolist(), ['Item 4'])
+
+    def test_xlsx_is_read_in_batches_with_normalised_headers(self):
+        rows = [self.row(f'Item {i}') for i in range(3)] + [[None] * len(self.HEADER)] + [self.row('Item 3')]
+        batches = list(spreadsheets.read_batches(self.xlsx_upload(rows), batch_size=3))
+        self.assertEqual(list(batches[0].columns), self.HEADER)
+        self.assertEqual([len(df) for df in batches], [3, 1])  # the blank row is dropped
+        self.assertEqual(batches[1].index.tolist(), [3])
+
+    def test_latin1_csv_is_decoded(self):
+        upload = SimpleUploadedFile('items.csv', 'item_name\nCaf\xe9 table\n'.encode('latin1'))
+        df = next(spreadsheets.read_batches(upload))
+        self.assertEqual(df['item_name'].tolist(), ['Caf\xe9 table'])
+
+    def test_row_count_estimate(self):
+        upload = self.csv_upload([self.row(f'Item {i}') for i in range(4)])
+        self.assertEqual(spreadsheets.count_rows(upload.file, upload.name), 4)
+
+    def test_unsupported_format_is_rejected(self):
+        with self.assertRaises(spreadsheets.UnsupportedFormat):
+            list(spreadsheets.read_batches(SimpleUploadedFile('items.txt', b'x')))
+
+
+class SetWiseImportTests(ImportTestCase):
+    def import_csv(self, rows, batch_size=1000):
+        upload = self.csv_upload(rows)
+        return imports.import_rows(spreadsheets.read_batches(upload, batch_size=batch_size), self.user)
+
+    def test_valid_rows_are_imported(self):
+        result = self.import_csv([self.row('Laptop A', 'SN-A'), self.row('Laptop B', 'SN-B', quantity=3)])
+        self.assertEqual((result.created, result.skipped), (2, 0))
+        item = InventoryItem.objects.get(serial_number='SN-B')
+        self.assertEqual((item.quantity, item.location, item.status, item.created_by), (3, self.location, 'Online', self.user))
+        self.assertTrue(item.uid_no.startswith('LAP'))
+
+    def test_duplicate_serials_are_skipped(self):
+        InventoryItem.objects.create(item_name='Existing', serial_number='SN-OLD')
+        result = self.import_csv([
+            self.row('New', 'SN-1'),
+            self.row('Clash with database', 'SN-OLD'),
+            self.row('Clash within file', 'SN-1'),
+            self.row('Also new', 'SN-2'),
+        ], batch_size=2)
+        self.assertEqual(result.created, 2)
+        self.assertEqual([row for row, _ in result.errors], [3, 4])
+        self.assertEqual(sorted(InventoryItem.objects.values_list('serial_number', flat=True)), ['SN-1', 'SN-2', 'SN-OLD'])
+
+    def test_rows_with_unknown_references_are_skipped(self):
+        result = self.import_csv([self.row('No category', 'SN-X', category_id=999), self.row('Fine', 'SN-Y')])
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.errors, [(2, "Missing Category, Location, or Status.")])
+
+    def test_queries_per_batch_do_not_grow_with_rows(self):
+        def queries(count, offset):
+            with CaptureQueriesContext(connection) as ctx:
+                self.import_csv([self.row(f'Item {i}', f'SN-{offset + i}') for i in range(count)])
+            return len(ctx.captured_queries)
+
+        queries(1, 1000)  # creates the counter and UID sequence rows the later imports update
+        # 20 rows still fit one INSERT under SQLite's bound-parameter limit.
+        self.assertEqual(queries(5, 0), queries(20, 100))
+
+
+class ImportJobTests(ImportTestCase):
+    def enqueue(self, rows, kind='import', name='items.csv'):
+        job, created = import_jobs.enqueue(self.csv_upload(rows, name=name), self.user, kind)
+        self.assertTrue(created)
+        return job
+
+    def test_a_job_is_claimed_only_once(self):
+        job = self.enqueue([self.row('Laptop A', 'SN-A')])
+        claimed = import_jobs.claim_next()
+        self.assertEqual((claimed.pk, claimed.status), (job.pk, 'running'))
+        self.assertIsNotNone(claimed.started_at)
+        self.assertIsNone(import_jobs.claim_next())
+
+    def test_a_job_taken_by_another_worker_is_not_claimed_again(self):
+        job = self.enqueue([self.row('Laptop A', 'SN-A')])
+        real_update = QuerySet.update
+
+        # Another worker claims the job after this one has read the queue, so
+        # this worker's conditional UPDATE (status='queued') matches nothing.
+        def other_worker_first(queryset, **kwargs):
+            real_update(ImportJob.objects.filter(pk=job.pk), status='running')
+            return real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=other_worker_first):
+            self.assertIsNone(import_jobs.claim_next())
+        self.assertEqual(ImportJob.objects.get(pk=job.pk).status, 'running')
+
+    def test_oldest_queued_job_is_claimed_first(self):
+        first = self.enqueue([self.row('Laptop A', 'SN-A')], name='a.csv')
+        second = self.enqueue([self.row('Laptop B', 'SN-B')], name='b.csv')
+        self.assertEqual(import_jobs.claim_next().pk, first.pk)
+        self.assertEqual(import_jobs.claim_next().pk, second.pk)
+
+    def test_worker_runs_a_direct_import(self):
+        job = self.enqueue([self.row('Laptop A', 'SN-A'), self.row('Laptop B', 'SN-B')])
+        self.assertEqual(import_jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual((job.processed_rows, job.result['created'], job.result['skipped']), (2, 2, 0))
+        self.assertEqual(InventoryItem.objects.count(), 2)
+
+    def test_abandoned_running_jobs_fail(self):
+        job = self.enqueue([self.row('Laptop A', 'SN-A')])
+        ImportJob.objects.filter(pk=job.pk).update(status='running', started_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(import_jobs.fail_stale(max_age_seconds=3600), 1)
+        self.assertEqual(ImportJob.objects.get(pk=job.pk).status, 'failed')
+
+    def test_status_endpoint_reports_progress(self):
+        job = self.enqueue([self.row('Laptop A', 'SN-A')])
+        import_jobs.run_pending()
+        self.client.force_login(self.user)
+        data = self.client.get(f'/inventory/import/jobs/{job.pk}/').json()
+        self.assertEqual((data['status'], data['percent'], data['processed_rows']), ('done', 100, 1))
+
+
+@override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage', INVENTORY_IMPORT_REVIEW_PAGE_SIZE=2,
+)
+class ReviewStagingTests(ImportTestCase):
+    def review(self, rows, batch_size=1000):
+        job, _ = import_jobs.enqueue(self.csv_upload(rows), self.user, 'review')
+        read_batches = spreadsheets.read_batches
+        with mock.patch.object(spreadsheets, 'read_batches', lambda upload: read_batches(upload, batch_size=batch_size)):
+            import_jobs.run(import_jobs.claim_next())
+        job.refresh_from_db()
+        return job
+
+    def test_rows_are_staged_with_their_spreadsheet_row_numbers(self):
+        job = self.review([self.row(f'Item {i}') for i in range(5)], batch_size=2)
+        self.assertEqual((job.status, job.result['row_count'], job.processed_rows), ('done', 5, 5))
+        staged = list(job.staged_rows.order_by('row_no').values_list('row_no', 'item_name'))
+        self.assertEqual(staged, [(i + 2, f'Item {i}') for i in range(5)])
+        self.assertFalse(InventoryItem.objects.exists())
+
+    def test_running_a_job_again_replaces_its_staging(self):
+        job = self.review([self.row('Item 0'), self.row('Item 1')])
+        import_jobs.run(job)
+        self.assertEqual(job.staged_rows.count(), 2)
+
+    def test_expired_staging_is_dropped(self):
+        old = self.review([self.row('Old 0'), self.row('Old 1')])
+        ImportJob.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+        recent = self.review([self.row('Recent 0')])
+        self.assertEqual(import_jobs.expire_staging(max_age_seconds=24 * 60 * 60), 2)
+        self.assertFalse(old.staged_rows.exists())
+        self.assertEqual(recent.staged_rows.count(), 1)
+
+    def open_review(self, job):
+        cache.clear()  # lookup choices are cached per version, and versions roll back with each test
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['import_job_id'] = job.pk
+        session.save()
+
+    def post_review(self, action, forms=(), **extra):
+        data = {'form-TOTAL_FORMS': len(forms), 'form-INITIAL_FORMS': len(forms), 'action': action, **extra}
+        for i, form in enumerate(forms):
+            data.update({f'form-{i}-{field}': value for field, value in form.items()})
+        return self.client.post('/inventory/import/save/', data)
+
+    def test_review_page_shows_one_page_of_staged_rows(self):
+        job = self.review([self.row(f'Item {i}') for i in range(5)])
+        self.open_review(job)
+        response = self.client.get('/inventory/import/review/')
+        self.assertEqual([form.initial['row_no'] for form in response.context['formset']], [2, 3])
+        response = self.client.get('/inventory/import/review/', {'page': 3})
+        self.assertEqual([form.initial['row_no'] for form in response.context['formset']], [6])
+
+    def test_edits_are_saved_and_fill_only_sets_empty_fields(self):
+        job = self.review([self.row(f'Item {i}') for i in range(3)])
+        self.open_review(job)
+        other = Location.objects.create(name='Warehouse B')
+        self.post_review('save', [{'row_no': 3, 'item_name': ' Renamed ', 'quantity': 2, 'location': other.pk}])
+        response = self.post_review('fill', fill_location=self.location.pk, fill_status=self.status.pk)
+        self.assertEqual(response.status_code, 302)
+
+        staged = {row.row_no: row for row in job.staged_rows.all()}
+        self.assertEqual((staged[3].item_name, staged[3].quantity), ('Renamed', 2))
+        self.assertEqual([staged[n].location_id for n in (2, 3, 4)], [self.location.pk, other.pk, self.location.pk])
+        self.assertEqual({row.status_id for row in staged.values()}, {self.status.pk})
+
+    def test_commit_imports_every_staged_row(self):
+        InventoryItem.objects.create(item_name='Existing', serial_number='SN-TAKEN')
+        job = self.review([self.row(f'Item {i}') for i in range(3)])
+        self.open_review(job)
+
+        self.post_review('commit')  # nothing filled in yet
+        self.assertEqual(InventoryItem.objects.count(), 1)
+
+        self.post_review(
+            'fill', fill_category=self.category.pk, fill_location=self.location.pk, fill_status=self.status.pk,
+        )
+        self.post_review('save', [{
+            'row_no': 4, 'item_name': 'Item 2', 'serial_number': 'SN-TAKEN', 'category': self.category.pk,
+            'location': self.location.pk, 'status': self.status.pk,
+        }])
+        response = self.post_review('commit')
+        self.assertRedirects(response, '/inventory/dashboard/', fetch_redirect_response=False)
+
+        created = InventoryItem.objects.exclude(item_name='Existing').order_by('item_name')
+        self.assertEqual([item.item_name for item in created], ['Item 0', 'Item 1'])
+        self.assertEqual({(item.price, item.location_id, item.status) for item in created},
+                         {(Decimal('0.00'), self.location.pk, 'Online')})
+        self.assertFalse(job.staged_rows.exists())
+
+
+class CategoryMatchTests(TestCase):
+    def build(self, names, synonyms=None):
+        categories = [ItemCategory(id=pk, name=name) for pk, name in enumerate(names, start=1)]
+        return category_match.CategoryMatcher(categories, synonyms)
+
+    def test_keywords_only_match_at_a_word_start(self):
+        matcher = self.build(['Cable', 'RAM'])
+        self.assertEqual(matcher.match_name('HDMI Cables, 2m'), 'Cable')
+        self.assertEqual(matcher.match_name('Office program licence'), 'Other')
+        self.assertEqual(matcher.match_name('16GB-RAM module'), 'RAM')
+
+    def test_leftmost_then_longest_match_wins(self):
+        matcher = self.build(['Monitor', 'Laptop', 'Laptop Bag'])
+        self.assertEqual(matcher.match_name('Laptop with spare monitor'), 'Laptop')
+        self.assertEqual(matcher.match_name('Monitor for the laptop'), 'Monitor')
+        self.assertEqual(matcher.match_name('laptop bag, black'), 'Laptop Bag')
+
+    def test_synonyms_map_to_their_category(self):
+        matcher = self.build(['Laptop', 'Other'], {'laptop': ['notebook', ' '], 'Printer': ['inkjet']})
+        self.assertEqual(matcher.match_name('ThinkPad Notebook'), 'Laptop')
+        # Synonyms for a category that doesn't exist are ignored.
+        self.assertEqual(matcher.match_name('Inkjet cartridge', default=None), None)
+        self.assertEqual(matcher.other_id, 2)
+
+    def test_match_many_handles_missing_values(self):
+        matcher = self.build(['Laptop', 'Monitor'])
+        series = pd.Series(['Dell laptop', None, float('nan'), 'LG monitor', 'Dell laptop', 42], index=list('abcdef'))
+        with mock.patch.object(matcher, 'match', wraps=matcher.match) as match:
+            found = matcher.match_many(series)
+        self.assertEqual(list(found), [1, None, None, 2, 1, None])
+        self.assertEqual(list(found.index), list('abcdef'))
+        self.assertEqual(match.call_count, 4)  # each distinct value once
+
+    def test_matcher_is_rebuilt_after_a_category_save(self):
+        self.enterContext(mock.patch.object(category_match, '_matcher', None))
+        ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        self.assertEqual(category_match.matcher().match_name('Tablet stand'), 'Other')
+        shared = category_match.matcher()
+        self.assertIs(category_match.matcher(), shared)
+
+        ItemCategory.objects.create(name='Tablet', prefix='TAB')
+        self.assertEqual(category_match.matcher().match_name('Tablet stand'), 'Tablet')
+
+    def test_other_processes_pick_up_the_new_version(self):
+        self.enterContext(mock.patch.object(category_match, '_matcher', None))
+        stale = category_match.matcher()
+        # Another process saved a category: the row and version change, this process's matcher doesn't.
+        ItemCategory.objects.bulk_create([ItemCategory(name='Tablet', prefix='TAB')])
+        lookups.bump(category_match.VERSION_NAME)
+        self.assertIs(category_match.matcher(), stale)
+        with mock.patch.object(category_match, '_checked_at', 0.0):
+            self.assertEqual(category_match.matcher().match_name('Tablet stand'), 'Tablet')
+
+
+class ImportValidationTests(ImportTestCase):
+    def import_job(self, rows, header=None):
+        job, _ = import_jobs.enqueue(self.csv_upload(rows, header=header), self.user, 'import')
+        import_jobs.run(import_jobs.claim_next())
+        job.refresh_from_db()
+        return job
+
+    def error_sheet(self, job):
+        with job.error_sheet.open('rb') as f:
+            return list(csv.reader(io.TextIOWrapper(f, encoding='utf-8')))
+
+    def test_invalid_rows_fail_the_job_with_an_error_sheet_and_import_nothing(self):
+        job = self.import_job([
+            self.row('Laptop A', 'SN-A'),
+            self.row('', 'SN-B'),
+            self.row('Laptop C', 'SN-C', quantity='many', location_id=9999),
+            self.row('Laptop D', 'SN-A'),
+        ])
+        self.assertEqual((job.status, job.result['stage']), ('failed', 'validation'))
+        self.assertFalse(InventoryItem.objects.exists())
+
+        sheet = self.error_sheet(job)
+        self.assertEqual(sheet[0], imports.ERROR_SHEET_HEADER)
+        problems = sorted((int(row), column) for row, column, _, _ in sheet[1:])
+        self.assertEqual(problems, [(3, 'item_name'), (4, 'location_id'), (4, 'quantity'), (5, 'serial_number')])
+        self.assertEqual(job.error_count, 4)
+
+    def test_missing_columns_are_reported(self):
+        job = self.import_job([['Laptop A']], header=['item_name'])
+        self.assertEqual(job.status, 'failed')
+        missing = [column for _, column, _, _ in self.error_sheet(job)[1:]]
+        self.assertEqual(missing, ['category_id', 'location_id', 'status_id'])
+        self.assertFalse(InventoryItem.objects.exists())
+
+    def test_error_sheet_download(self):
+        job = self.import_job([self.row('')])
+        self.client.force_login(self.user)
+        response = self.client.get(f'/inventory/import/jobs/{job.pk}/errors/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Item name is required.', b''.join(response.streaming_content))
+
+    def test_clean_file_imports_without_an_error_sheet(self):
+        job = self.import_job([self.row('Laptop A', 'SN-A')])
+        self.assertEqual(job.status, 'done')
+        self.assertFalse(job.error_sheet)
+        self.assertEqual(InventoryItem.objects.count(), 1)
+
+
+class XlsxExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exporter', password='pw')
+        category = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        location = Location.objects.create(name='Warehouse A')
+        project = Project.objects.create(name='Project X')
+        kit = Kit.objects.create(name='Starter Kit')
+        cls.items = []
+        for i in range(25):
+            item = InventoryItem.objects.create(
+                item_name=f'Laptop {i:02d}', category=category, location=location, project=project,
+                created_by=cls.user if i % 2 else None,
+            )
+            if i % 2:
+                kit.items.add(item)
+            cls.items.append(item)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, items):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/inventory/export/', {'item_ids': ','.join(str(item.pk) for item in items)})
+            content = b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        sheet = openpyxl.load_workbook(io.BytesIO(content), read_only=True)['Inventory Data']
+        return list(sheet.iter_rows(values_only=True)), len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_row_count(self):
+        few, few_queries = self.export(self.items[:5])
+        many, many_queries = self.export(self.items)
+        self.assertEqual((len(few), len(many)), (6, 26))
+        self.assertEqual(few_queries, many_queries)
+
+    def test_rows_carry_related_names(self):
+        rows, _ = self.export(self.items[:2])
+        header, *rows = rows
+        self.assertEqual(list(header), [
+            'UID No', 'Item Name', 'Description', 'Serial Number', 'Quantity', 'Price', 'Category', 'Status',
+            'Location', 'Project', 'Kit', 'Created By', 'Created At',
+        ])
+        by_name = {row[1]: dict(zip(header, row)) for row in rows}
+        self.assertEqual(
+            (by_name['Laptop 00']['Kit'], by_name['Laptop 00']['Created By'], by_name['Laptop 00']['Project']),
+            ('N/A', None, 'Project X'),
+        )
+        self.assertEqual((by_name['Laptop 01']['Kit'], by_name['Laptop 01']['Created By']), ('Starter Kit', 'exporter'))
+
+
+@override_settings(INVENTORY_EXPORT_JOBS_IN_PROCESS=False)
+class ExportResponseTests(TempMediaMixin, TestCase):
+    HEADERS = [column.header for column in exports.ITEM_COLUMNS]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exporter', password='pw')
+        category = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        location = Location.objects.create(name='Warehouse A')
+        cls.items = [
+            InventoryItem.objects.create(item_name=f'Laptop {i}', serial_number=f'SN-{i}', category=category,
+                                         location=location, created_by=cls.user)
+            for i in range(5)
+        ]
+        Kit.objects.create(name='Starter Kit').items.add(cls.items[0])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def download(self, export_format, **params):
+        response = self.client.get('/inventory/export/', {'format': export_format, **params})
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_streams_a_header_and_one_row_per_item(self):
+        response, body = self.download('csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('filename="inventory_data.csv"', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], self.HEADERS)
+        self.assertEqual(len(rows) - 1, len(self.items))
+        by_name = {row[1]: dict(zip(self.HEADERS, row)) for row in rows[1:]}
+        self.assertEqual(
+            (by_name['Laptop 0']['Location'], by_name['Laptop 0']['Kit'], by_name['Laptop 1']['Kit']),
+            ('Warehouse A', 'Starter Kit', 'N/A'),
+        )
+
+    def test_jsonl_streams_one_object_per_item(self):
+        response, body = self.download('jsonl')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(records), len(self.items))
+        self.assertEqual(list(records[0]), self.HEADERS)
+        self.assertEqual({r['Serial Number'] for r in records}, {item.serial_number for item in self.items})
+
+    def test_selected_items_only(self):
+        _, body = self.download('csv', item_ids=f'{self.items[1].pk},{self.items[3].pk}')
+        rows = list(csv.reader(io.StringIO(body)))[1:]
+        self.assertEqual(sorted(row[1] for row in rows), ['Laptop 1', 'Laptop 3'])
+
+    def test_rows_are_read_in_chunks(self):
+        rows = list(exports.export_rows(exports.export_items(), exports.ITEM_COLUMNS, chunk_size=2))
+        self.assertEqual(sorted(row[0] for row in rows), sorted(item.uid_no for item in self.items))
+
+    @unittest.skipUnless(exports.ParquetFormat().available(), "pyarrow is not installed")
+    def test_parquet_file_has_typed_columns(self):
+        import pyarrow.parquet as pq
+
+        fileobj = io.BytesIO()
+        count = exports.write_file(exports.get_format('parquet'), fileobj, exports.export_items(), exports.ITEM_COLUMNS)
+        fileobj.seek(0)
+        table = pq.read_table(fileobj)
+        self.assertEqual((count, table.num_rows, table.column_names), (5, 5, self.HEADERS))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class LogExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', password='pw')
+        cls.bob = User.objects.create_user('bob', password='pw')
+        first_day = timezone.make_aware(datetime(2024, 3, 1))
+        for i in range(12):
+            log = InventoryLog.objects.create(
+                user=cls.alice if i % 2 else cls.bob, action='created' if i % 3 else 'updated',
+                details=f'Entry {i}', uid_number=f'LOG{i:03d}',
+            )
+            # Two entries a day, the second late in the evening; the last two share a timestamp.
+            if i < 10:
+                timestamp = first_day + timedelta(days=i // 2, hours=23 if i % 2 else 11, minutes=30)
+            else:
+                timestamp = first_day + timedelta(days=5, hours=12)
+            InventoryLog.objects.filter(pk=log.pk).update(timestamp=timestamp)
+
+    def setUp(self):
+        self.client.force_login(self.alice)
+
+    def page_details(self, filters):
+        response = self.client.get('/inventory/logs/', {**filters, 'page_size': 100})
+        return sorted(log.details for log in response.context['page_obj'])
+
+    def export_details(self, filters):
+        response = self.client.get('/inventory/export/all-logs-excel/', {**filters, 'format': 'csv'})
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(rows[0], [column.header for column in exports.LOG_COLUMNS])
+        return sorted(row[5] for row in rows[1:])
+
+    def test_export_applies_the_log_page_filters(self):
+        for filters in [
+            {},
+            {'user': self.alice.pk},
+            {'action': 'updat'},
+            {'uid_number': 'LOG00'},
+            {'item_name': 'Entry 1'},
+            {'start_date': '2024-03-02', 'end_date': '2024-03-03'},
+            {'user': self.bob.pk, 'action': 'created', 'end_date': '2024-03-04'},
+        ]:
+            with self.subTest(filters=filters):
+                shown = self.page_details(filters)
+                self.assertTrue(shown)
+                self.assertEqual(self.export_details(filters), shown)
+
+    def test_date_filters_include_the_whole_end_day(self):
+        self.assertEqual(self.export_details({'start_date': '2024-03-01', 'end_date': '2024-03-01'}), ['Entry 0', 'Entry 1'])
+
+    def test_invalid_filters_export_nothing(self):
+        response = self.client.get('/inventory/export/all-logs-excel/', {'start_date': 'not a date', 'format': 'csv'})
+        self.assertRedirects(response, '/inventory/logs/', fetch_redirect_response=False)
+
+    def test_chunked_read_yields_every_row_once(self):
+        logs = InventoryLog.objects.order_by('-timestamp', '-id')
+        rows = list(exports.export_rows(logs, exports.LOG_COLUMNS, chunk_size=5))
+        self.assertEqual(sorted(row[4] for row in rows), [f'LOG{i:03d}' for i in range(12)])
+
+
+class UIDSequenceTests(TestCase):
+    day = date(2024, 1, 1)
+
+    def counter(self, prefix='LAP', day=None):
+        return UIDCategorySequence.objects.get(category_prefix=prefix, day=uids.date_part(day or self.day))
+
+    def test_numbers_follow_on_per_prefix_and_day(self):
+        self.assertEqual(uids.next_uid('LAP', self.day), 'LAP2401010001')
+        self.assertEqual(uids.next_uid('LAP', self.day), 'LAP2401010002')
+        self.assertEqual(uids.next_uid('MON', self.day), 'MON2401010001')
+        self.assertEqual(uids.next_uid(None, self.day), 'OTH2401010001')
+        self.assertEqual(self.counter().last_sequence_number, 2)
+
+    def test_new_day_starts_its_own_sequence(self):
+        uids.next_uid('LAP', self.day)
+        uids.next_uid('LAP', self.day)
+        self.assertEqual(uids.next_uid('LAP', date(2024, 1, 2)), 'LAP2401020001')
+        self.assertEqual(uids.next_uid('LAP', self.day), 'LAP2401010003')
+
+    def test_first_use_of_a_day_continues_after_existing_uids(self):
+        category = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        for uid in ('LAP2401010007', 'LAP2401010003', 'LAP2401020050'):
+            InventoryItem.objects.create(item_name='Old laptop', category=category, uid_no=uid)
+        self.assertEqual(uids.next_uid('LAP', self.day), 'LAP2401010008')
+        self.assertEqual(self.counter().last_sequence_number, 8)
+
+    def test_concurrent_first_use_takes_a_number_from_the_winner(self):
+        # Another request creates the day's counter between our UPDATE (which
+        # found no row) and our INSERT, which then hits the unique constraint.
+        UIDCategorySequence.objects.create(category_prefix='LAP', day='240101', last_sequence_number=5)
+        real_increment = uids._increment
+        calls = []
+
+        def increment(prefix, day_part, n):
+            calls.append(n)
+            return None if len(calls) == 1 else real_increment(prefix, day_part, n)
+
+        with mock.patch.object(uids, '_increment', side_effect=increment):
+            self.assertEqual(uids.next_uid('LAP', self.day), 'LAP2401010006')
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.counter().last_sequence_number, 6)
+
+    def test_saving_an_item_allocates_its_uid_and_parts(self):
+        category = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        first = InventoryItem.objects.create(item_name='Laptop', category=category)
+        second = InventoryItem.objects.create(item_name='Laptop', category=category)
+        today = date.today()
+        self.assertEqual(first.uid_no, f"LAP{uids.date_part(today)}0001")
+        self.assertEqual((second.uid_prefix, second.uid_date, second.uid_seq), ('LAP', today, 2))
+
+
+class UIDReservationTests(TestCase):
+    day = date(2024, 1, 1)
+
+    def test_block_is_contiguous_and_moves_the_counter_to_its_end(self):
+        block = uids.reserve_uids('LAP', 5, self.day)
+        self.assertEqual(block, [f'LAP240101{seq:04d}' for seq in range(1, 6)])
+        counter = UIDCategorySequence.objects.get(category_prefix='LAP', day='240101')
+        self.assertEqual(counter.last_sequence_number, 5)
+
+    def test_block_does_not_overlap_single_allocations(self):
+        before = uids.next_uid('LAP', self.day)
+        block = uids.reserve_uids('LAP', 3, self.day)
+        after = uids.next_uid('LAP', self.day)
+        self.assertEqual(before, 'LAP2401010001')
+        self.assertEqual(block, ['LAP2401010002', 'LAP2401010003', 'LAP2401010004'])
+        self.assertEqual(after, 'LAP2401010005')
+        counter = UIDCategorySequence.objects.get(category_prefix='LAP', day='240101')
+        self.assertEqual(counter.last_sequence_number, 5)
+
+    def test_bulk_assignment_reserves_one_block_per_prefix(self):
+        laptops = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        monitors = ItemCategory.objects.create(name='Monitor', prefix='MON')
+        items = [InventoryItem(item_name=f'Item {i}', category=laptops if i % 2 else monitors) for i in range(6)]
+        with CaptureQueriesContext(connection) as ctx:
+            uids.assign_uids(items)
+        counter_updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(counter_updates), 2)
+        laptop_seqs = [item.uid_seq for item in items if item.category == laptops]
+        self.assertEqual(laptop_seqs, [1, 2, 3])
+        self.assertEqual(len({item.uid_no for item in items}), 6)
+
+    def test_nothing_reserved_for_an_empty_block(self):
+        self.assertEqual(uids.reserve_uids('LAP', 0, self.day), [])
+        self.assertFalse(UIDCategorySequence.objects.exists())
+
+
+class InvoiceIngestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('scanner', password='pw')
+        cls.laptops = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        InventoryItem.objects.create(item_name='Existing', serial_number='TAKEN-1')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post(self, rows):
+        data = {'invoice_number': 'INV-7'}
+        for idx, row in enumerate(rows):
+            data.update({f'items[{idx}][{field}]': value for field, value in row.items()})
+            data.setdefault(f'items[{idx}][category_id]', str(self.laptops.pk))
+        response = self.client.post('/inventory/add-items-from-invoice/', data)
+        self.assertEqual(response.status_code, 302)
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_whole_invoice_is_saved_with_one_uid_block(self):
+        notes = self.post([{'item_name': f'Laptop {i}', 'serial_number': f'SN-{i}'} for i in range(3)])
+        self.assertEqual(notes, ['3 scanned item(s) saved successfully.'])
+        items = InventoryItem.objects.filter(invoice_number='INV-7').order_by('uid_seq')
+        self.assertEqual([item.uid_seq for item in items], [1, 2, 3])
+        self.assertEqual(InventoryLog.objects.filter(action='item_added').count(), 3)
+
+    def test_bad_rows_are_reported_and_the_rest_saved(self):
+        notes = self.post([
+            {'item_name': 'Good laptop', 'serial_number': 'SN-1'},
+            {'item_name': 'x' * 300},
+            {'item_name': 'Bad status', 'status': 'Lost'},
+            {'item_name': 'Duplicate serial', 'serial_number': 'TAKEN-1'},
+            {'item_name': 'Also good', 'serial_number': 'SN-1-B'},
+        ])
+        self.assertEqual(
+            sorted(InventoryItem.objects.filter(invoice_number='INV-7').values_list('item_name', flat=True)),
+            ['Also good', 'Good laptop'],
+        )
+        self.assertEqual(notes[0], '2 scanned item(s) saved successfully.')
+        self.assertIn('Row 1: item_name:', notes[1])
+        self.assertIn('Row 2: status:', notes[1])
+        self.assertIn("Row 3: Serial Number 'TAKEN-1' already exists.", notes[1])
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "needs concurrent writers (PostgreSQL)")
+class ConcurrentUIDReservationTests(TransactionTestCase):
+    day = date(2024, 1, 1)
+
+    def test_blocks_and_single_allocations_never_overlap(self):
+        issued, lock = [], threading.Lock()
+
+        def work(reserve):
+            try:
+                for _ in range(10):
+                    taken = uids.reserve_uids('LAP', 5, self.day) if reserve else [uids.next_uid('LAP', self.day)]
+                    with lock:
+                        issued.append(taken)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=work, args=(i % 2 == 0,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        flat = [uid for block in issued for uid in block]
+        self.assertEqual(len(flat), len(set(flat)))
+        for block in issued:
+            seqs = [int(uid[-4:]) for uid in block]
+            self.assertEqual(seqs, list(range(seqs[0], seqs[0] + len(seqs))))
+        counter = UIDCategorySequence.objects.get(category_prefix='LAP', day='240101')
+        self.assertEqual(counter.last_sequence_number, len(flat))
+
+
+class UIDPartsTests(TestCase):
+    def test_standard_uid_is_split(self):
+        self.assertEqual(uids.split_uid('LAP2401010042', 'LAP'), ('LAP', date(2024, 1, 1), 42))
+        self.assertEqual(uids.split_uid('MON2401010007'), ('MON', date(2024, 1, 1), 7))
+
+    def test_parts_that_would_not_fit_their_columns_are_not_split(self):
+        self.assertIsNone(uids.split_uid('LEGACYASSETTAG2401010001'))
+        self.assertIsNone(uids.split_uid('LAP240101' + '9' * 12, 'LAP'))
+        self.assertIsNone(uids.split_uid('LAP2413010001'))  # no 13th month
+
+    def test_item_with_an_oversized_legacy_uid_still_saves(self):
+        item = InventoryItem.objects.create(item_name='Legacy', uid_no='LEGACYASSETTAG2401010001')
+        item.refresh_from_db()
+        self.assertEqual(item.uid_no, 'LEGACYASSETTAG2401010001')
+        self.assertIsNone(item.uid_prefix)
+        self.assertIsNone(item.uid_seq)
+
+    def test_parts_are_only_split_again_when_the_uid_changes(self):
+        item = InventoryItem.objects.create(item_name='Legacy', uid_no='LEGACYASSETTAG2401010001')
+        item = InventoryItem.objects.get(pk=item.pk)
+        with mock.patch.object(uids, 'fill_parts', wraps=uids.fill_parts) as fill_parts:
+            item.description = 'Edited'
+            item.save()
+            fill_parts.assert_not_called()
+
+            item.uid_no = 'LAP2401010009'
+            item.save()
+            fill_parts.assert_called_once_with(item)
+        self.assertEqual((item.uid_prefix, item.uid_seq), ('LAP', 9))
+
+        item.uid_no = 'LEGACYASSETTAG2401010002'
+        item.save()
+        self.assertEqual((item.uid_prefix, item.uid_date, item.uid_seq), (None, None, None))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class UIDFilterPagingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('viewer', password='pw')
+        laptops = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        monitors = ItemCategory.objects.create(name='Monitor', prefix='MON')
+        cls.expected = []
+        for day in (1, 2, 3):
+            for seq in range(1, 4):
+                item = InventoryItem.objects.create(
+                    item_name=f'Laptop {day}-{seq}', category=laptops, uid_no=f'LAP24010{day}{seq:04d}',
+                )
+                if day >= 2:
+                    cls.expected.append(item.pk)
+                InventoryItem.objects.create(
+                    item_name=f'Monitor {day}-{seq}', category=monitors, uid_no=f'MON24010{day}{seq:04d}',
+                )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_numbered_page_links_keep_the_uid_filters(self):
+        url = '/inventory/dashboard/?' + urlencode({
+            'uid_prefix': 'LAP', 'received_from': '2024-01-02', 'received_to': '2024-01-03', 'page_size': 4,
+        })
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertFalse(response.context['cursor_mode'])
+            seen += [item.pk for item in response.context['page_obj']]
+            match = re.search(r'href="([^"]*)">Next</a>', response.content.decode())
+            url = '/inventory/dashboard/' + html.unescape(match.group(1)) if match else None
+        self.assertEqual(sorted(seen), sorted(self.expected))
+        self.assertEqual(len(seen), len(set(seen)))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class OcrScanTests(TestCase):
+    ITEMS = [{'item_name': 'Monitor', 'quantity': 2, 'total_price': '300.00'}]
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('scanner', password='pw'))
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(self.settings(MEDIA_ROOT=media_root))
+        self.invoices_dir = f'{media_root}/documents/invoices'
+        self.ocr = self.enterContext(mock.patch('inventory.views.get_text_from_image', return_value=self.ITEMS))
+        self.invoice_number = self.enterContext(mock.patch('inventory.views.extract_invoice_number'))
+
+    def upload(self, content=b'%PDF-1.4 invoice'):
+        invoice_file = SimpleUploadedFile('invoice.pdf', content, content_type='application/pdf')
+        return self.client.post('/inventory/ocr_scan/', {'invoice_file': invoice_file})
+
+    def test_same_file_with_an_existing_invoice_number_is_rejected(self):
+        self.invoice_number.return_value = 'INV42'
+        self.assertEqual(self.upload().status_code, 200)
+        response = self.upload()
+        self.assertRedirects(response, '/inventory/ocr_scan/', fetch_redirect_response=False)
+        messages = [str(m) for m in response.wsgi_request._messages]
+        self.assertTrue(any('INV42 already exists' in m for m in messages))
+        self.assertEqual(self.ocr.call_count, 1)  # the second upload reused the stored scan
+        self.assertEqual(len(os.listdir(self.invoices_dir)), 1)
+
+    def test_same_file_without_an_invoice_number_reuses_the_scan(self):
+        self.invoice_number.return_value = ''
+        self.upload()
+        response = self.upload()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['scanned_items'], self.ITEMS)
+        self.assertEqual(self.ocr.call_count, 1)
+        self.assertEqual(InvoiceScan.objects.count(), 1)
+
+
+@override_settings(INVENTORY_EXPORT_JOBS_IN_PROCESS=False)
+class ExportJobTests(TempMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exporter', password='pw')
+        cls.category = ItemCategory.objects.create(name='Laptop', prefix='LAP')
+        cls.location = Location.objects.create(name='Warehouse A')
+        cls.items = [
+            InventoryItem.objects.create(item_name=f'Laptop {i}', category=cls.category, location=cls.location)
+            for i in range(3)
+        ]
+        cls.params = export_jobs.normalise({'format': 'csv'})
+
+    def build(self):
+        job, created = export_jobs.request_export(self.params, self.user)
+        self.assertTrue(created)
+        export_jobs.run(export_jobs.claim_next())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.row_count), ('done', InventoryItem.objects.count()))
+        return job
+
+    def test_identical_requests_share_a_queued_job(self):
+        job, created = export_jobs.request_export(self.params, self.user)
+        again, created_again = export_jobs.request_export(export_jobs.normalise({'format': 'csv'}), self.user)
+        self.assertEqual((again.pk, created, created_again), (job.pk, True, False))
+        other, created_other = export_jobs.request_export(export_jobs.normalise({'format': 'jsonl'}), self.user)
+        self.assertTrue(created_other)
+
+    def test_requests_during_a_build_share_the_running_job(self):
+        job, _ = export_jobs.request_export(self.params, self.user)
+        claimed = export_jobs.claim_next()
+        self.assertEqual((claimed.pk, claimed.status, claimed.data_count), (job.pk, 'running', 3))
+
+        shared = []
+        write_file = exports.write_file
+
+        def write_and_ask_again(*args, **kwargs):
+            shared.extend(export_jobs.request_export(self.params, self.user) for _ in range(2))
+            return write_file(*args, **kwargs)
+
+        with mock.patch.object(exports, 'write_file', write_and_ask_again):
+            export_jobs.run(claimed)
+        self.assertEqual(shared, [(claimed, False), (claimed, False)])
+        self.assertEqual(ExportJob.objects.count(), 1)
+
+    def test_an_edit_during_a_build_gets_its_own_job(self):
+        export_jobs.request_export(self.params, self.user)
+        running = export_jobs.claim_next()
+        self.items[0].description = 'Edited'
+        self.items[0].save()
+        job, created = export_jobs.request_export(self.params, self.user)
+        self.assertTrue(created)
+        self.assertNotEqual(job.pk, running.pk)
+
+    def test_artifact_is_reused_while_nothing_changes(self):
+        job = self.build()
+        self.client.force_login(self.user)  # saving last_login doesn't touch the users list
+        self.assertEqual(export_jobs.fresh_artifact(self.params).pk, job.pk)
+        self.assertEqual(export_jobs.request_export(self.params, self.user), (job, False))
+        response = self.client.get('/inventory/export/', {'format': 'csv'})
+        self.assertIsInstance(response, FileResponse)  # the stored file, not a fresh stream
+        response.close()
+        self.assertGreater(ExportJob.objects.get(pk=job.pk).last_used_at, job.last_used_at)
+
+    def test_item_edit_makes_the_artifact_stale(self):
+        self.build()
+        item = self.items[0]
+        item.description = 'Edited'
+        item.save()
+        self.assertIsNone(export_jobs.fresh_artifact(self.params))
+        job, created = export_jobs.request_export(self.params, self.user)
+        self.assertTrue(created)
+
+    def test_purged_item_makes_the_artifact_stale(self):
+        self.build()
+        InventoryItem.objects.filter(pk=self.items[0].pk).delete()
+        self.assertIsNone(export_jobs.fresh_artifact(self.params))
+
+    def test_related_changes_make_the_artifact_stale(self):
+        changes = {
+            'location rename': lambda: Location.objects.filter(pk=self.location.pk).get().save(),
+            'category rename': lambda: ItemCategory.objects.get(pk=self.category.pk).save(),
+            'kit membership': lambda: Kit.objects.create(name='Starter Kit').items.add(self.items[1]),
+        }
+        for name, change in changes.items():
+            with self.subTest(name):
+                self.build()
+                change()
+                self.assertIsNone(export_jobs.fresh_artifact(self.params))
+
+    def test_superseded_artifacts_are_evicted(self):
+        first = self.build()
+        self.location.name = 'Warehouse B'
+        self.location.save()
+        second = self.build()
+        self.assertFalse(ExportJob.objects.filter(pk=first.pk).exists())
+        self.assertEqual(export_jobs.fresh_artifact(self.params).pk, second.pk)
@@ -0,0 +1,217 @@
+# inventory_management/inventory/uids.py
+
+"""
+UID allocation.
+
+UIDs look like ``{prefix}{yymmdd}{seq:04d}``. The last sequence number handed
+out for each (prefix, day) lives in one ``UIDCategorySequence`` row, and
+taking the next one is a single ``UPDATE ... SET n = n + 1`` on that row, so
+concurrent creates only ever wait on that row for the length of one
+statement instead of locking and scanning the day's items.
+
+A counter row is seeded from the highest existing UID the first time its
+(prefix, day) is used, so UIDs issued before this table was maintained are
+never reissued. ``manage.py seed_uid_sequences`` does the same for every
+(prefix, day) at once.
+
+Bulk paths call ``reserve_uids`` (or ``assign_uids``) to take a whole block
+of numbers in that one statement.
+"""
+
+import re
+from datetime import date, datetime
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+from .models import InventoryItem, ItemCategory, UIDCategorySequence
+
+DEFAULT_PREFIX = 'OTH'
+
+
+def date_part(day=None):
+    return (day or date.today()).strftime('%y%m%d')
+
+
+def format_uid(prefix, day_part, seq):
+    return f"{prefix}{day_part}{seq:04d}"
+
+
+def uid_pattern(prefix):
+    """Matches UIDs of ``prefix``; groups are the date part and the sequence."""
+    return re.compile(rf'^{re.escape(prefix)}(\d{{6}})(\d{{4,}})$')
+
+
+# Any prefix without digits, for UIDs whose category is unknown.
+_ANY_UID = re.compile(r'^(\D+)(\d{6})(\d{4,})$')
+
+# What InventoryItem.uid_prefix and uid_seq can hold; UIDs outside these aren't split.
+MAX_PREFIX_LENGTH = 10
+MAX_SEQ = 2147483647
+
+
+def split_uid(uid, prefix=None):
+    """``(prefix, date, seq)`` for a UID, or None if it isn't in the standard format."""
+    match = uid_pattern(prefix).match(uid or '') if prefix else None
+    if match:
+        groups = (prefix,) + match.groups()
+    else:
+        match = _ANY_UID.match(uid or '')
+        if not match:
+            return None
+        groups = match.groups()
+    seq = int(groups[2])
+    if len(groups[0]) > MAX_PREFIX_LENGTH or seq > MAX_SEQ:
+        return None
+    try:
+        day = datetime.strptime(groups[1], '%y%m%d').date()
+    except ValueError:
+        return None
+    return groups[0], day, seq
+
+
+def _set_uid(item, prefix, day_part, seq):
+    item.uid_no = format_uid(prefix, day_part, seq)
+    item.uid_prefix = prefix
+    item.uid_date = datetime.strptime(day_part, '%y%m%d').date()
+    item.uid_seq = seq
+
+
+def fill_parts(item):
+    """Sets uid_prefix/uid_date/uid_seq from an already set uid_no; all None where it doesn't parse."""
+    parts = split_uid(item.uid_no, item.category.prefix if item.category else None)
+    item.uid_prefix, item.uid_date, item.uid_seq = parts or (None, None, None)
+
+
+def highest_issued(prefix, day_part):
+    """The largest sequence number among existing UIDs for (prefix, day)."""
+    pattern = uid_pattern(prefix)
+    highest = 0
+    for uid in InventoryItem.objects.filter(uid_no__startswith=f'{prefix}{day_part}').values_list('uid_no', flat=True):
+        match = pattern.match(uid)
+        if match and match.group(1) == day_part:
+            highest = max(highest, int(match.group(2)))
+    return highest
+
+
+def _supports_returning():
+    if connection.vendor == 'postgresql':
+        return True
+    return connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35)
+
+
+def _increment(prefix, day_part, n):
+    """Adds ``n`` to an existing counter row; returns the new value, or None if there is no row."""
+    table = UIDCategorySequence._meta.db_table
+    if _supports_returning():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET last_sequence_number = last_sequence_number + %s "
+                f"WHERE category_prefix = %s AND day = %s RETURNING last_sequence_number",
+                [n, prefix, day_part]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    counter = UIDCategorySequence.objects.filter(category_prefix=prefix, day=day_part)
+    if not counter.update(last_sequence_number=F('last_sequence_number') + n):
+        return None
+    return counter.values_list('last_sequence_number', flat=True).get()
+
+
+def _advance(prefix, day_part, n):
+    """Moves the (prefix, day) counter on by ``n`` and returns its new value."""
+    with transaction.atomic():
+        last = _increment(prefix, day_part, n)
+        if last is not None:
+            return last
+        try:
+            with transaction.atomic():
+                seed = highest_issued(prefix, day_part)
+                UIDCategorySequence.objects.create(
+                    category_prefix=prefix, day=day_part, last_sequence_number=seed + n
+                )
+            return seed + n
+        except IntegrityError:
+            # Another request created the row first; take a number from it.
+            return _increment(prefix, day_part, n)
+
+
+def reserve_uids(prefix, n, day=None):
+    """
+    Reserves a contiguous block of ``n`` UIDs for ``prefix`` (``OTH`` if
+    blank) on ``day`` (today) with one counter update, for bulk paths that
+    assign UIDs in memory and ``bulk_create`` the items.
+    """
+    if n < 1:
+        return []
+    prefix = prefix or DEFAULT_PREFIX
+    day_part = date_part(day)
+    last = _advance(prefix, day_part, n)
+    return [format_uid(prefix, day_part, seq) for seq in range(last - n + 1, last + 1)]
+
+
+def next_uid(prefix=None, day=None):
+    """Allocates the next UID for ``prefix`` (``OTH`` if blank) on ``day`` (today)."""
+    return reserve_uids(prefix, 1, day)[0]
+
+
+def allocate(item):
+    """Gives a new item the next UID for its category, along with the UID parts."""
+    assign_uids([item])
+
+
+def assign_uids(items):
+    """
+    Gives every item without a UID one from a block reserved per category
+    prefix; items that already have one get its parts filled in.
+    """
+    pending = {}
+    for item in items:
+        if item.uid_no:
+            if item.uid_prefix is None:
+                fill_parts(item)
+            continue
+        prefix = (item.category.prefix if item.category else None) or DEFAULT_PREFIX
+        pending.setdefault(prefix, []).append(item)
+
+    day_part = date_part()
+    for prefix, group in pending.items():
+        last = _advance(prefix, day_part, len(group))
+        for seq, item in enumerate(group, start=last - len(group) + 1):
+            _set_uid(item, prefix, day_part, seq)
+
+
+def seed_sequences():
+    """
+    Raises every counter to at least the highest UID already issued for its
+    (prefix, day), creating missing rows. Returns the number of counters
+    created or raised.
+    """
+    prefixes = set(ItemCategory.objects.values_list('prefix', flat=True)) | {DEFAULT_PREFIX}
+    # Longest first, so 'LAPT' claims 'LAPT2401010001' before 'LAP' is tried.
+    patterns = [(p, uid_pattern(p)) for p in sorted(filter(None, prefixes), key=len, reverse=True)]
+
+    highest = {}
+    uids = InventoryItem.objects.exclude(uid_no__isnull=True).values_list('uid_no', flat=True)
+    for uid in uids.iterator(chunk_size=2000):
+        for prefix, pattern in patterns:
+            match = pattern.match(uid)
+            if match:
+                key = (prefix, match.group(1))
+                highest[key] = max(highest.get(key, 0), int(match.group(2)))
+                break
+
+    changed = 0
+    for (prefix, day_part), seq in highest.items():
+        with transaction.atomic():
+            counter, created = UIDCategorySequence.objects.select_for_update().get_or_create(
+                category_prefix=prefix, day=day_part, defaults={'last_sequence_number': seq}
+            )
+            if created:
+                changed += 1
+            elif counter.last_sequence_number < seq:
+                counter.last_sequence_number = seq
+                counter.save(update_fields=['last_sequence_number'])
+                changed += 1
+    return changed
@@ -0,0 +1,49 @@
+# inventory_management/inventory/uploads.py
+
+"""
+Content hashes for uploaded files.
+
+``HashingUploadHandler`` sits first in ``FILE_UPLOAD_HANDLERS`` and feeds
+every chunk of every uploaded file through SHA-256 as Django receives it, so
+the hash costs no extra pass over the file. The import and invoice-scan
+views use it to recognise a file they have already processed.
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """Records the SHA-256 of each uploaded file on the request, by field name."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, '_upload_sha256'):
+            self.request._upload_sha256 = {}
+        self.request._upload_sha256[self.field_name] = self.digest.hexdigest()
+        # The next handler builds the UploadedFile.
+        return None
+
+
+def content_hash(request, field_name):
+    """
+    The SHA-256 hex digest of ``request.FILES[field_name]``: the one recorded
+    while it streamed in, or, if the handler wasn't installed, read now.
+    """
+    recorded = getattr(request, '_upload_sha256', {}).get(field_name)
+    if recorded:
+        return recorded
+    uploaded_file = request.FILES[field_name]
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
@@ -1,7 +1,7 @@
 # inventory_management/inventory/urls.py
 
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'inventory' 
 
@@ -17,6 +17,8 @@ urlpatterns = [
     path('ocr_review/', views.ocr_review, name='ocr_review'),
     path('import/', views.import_items_view, name='import'),
     path('import/submit/', views.import_items_submit, name='import_items_submit'),
+    path('import/jobs/<int:pk>/', views.import_job_status, name='import_job_status'),
+    path('import/jobs/<int:pk>/errors/', views.import_job_errors, name='import_job_errors'),
     path('import/review/', views.import_review, name='import_review'),
     path('import/save/', views.save_imported_items, name='save_imported_items'),
     path('import/get_new_uid/', views.get_new_uid, name='get_new_uid'),
@@ -27,6 +29,10 @@ urlpatterns = [
      path('create-kit/', views.create_kit, name='create_kit'),
     
     path('dashboard/', views.dashboard_view, name='dashboard'),
+    path('api/lookups/<str:name>/', views.lookup_list, name='lookup_list'),
+    path('api/items/', api.item_list, name='api_item_list'),
+    path('api/items/facets/', api.item_facets, name='api_item_facets'),
+    path('api/items/suggest/', api.item_suggestions, name='api_item_suggestions'),
     path('add_item/', views.add_item_view, name='add_item'),
     path('edit/<int:pk>/', views.edit_item, name='edit_item'),
     path('details/<int:pk_or_uid>/', views.item_details, name='item_details'),
@@ -67,6 +73,9 @@ urlpatterns = [
     
     path('export/all-logs-excel/', views.export_all_logs_excel, name='export_all_logs_excel'),
      path('export/', views.export_inventory, name='export_inventory'),
+    path('export/jobs/', views.export_job_start, name='export_job_start'),
+    path('export/jobs/<int:pk>/', views.export_job_status, name='export_job_status'),
+    path('export/jobs/<int:pk>/download/', views.export_job_download, name='export_job_download'),
      path('import_items/submit/', views.import_items_submit, name='import_items_submit'),
      path('import/review/', views.import_review, name='import_review'),
 
@@ -10,7 +10,7 @@ from django.db.models import Q,Count,F,Max
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db import IntegrityError, transaction
 from django.contrib.auth import authenticate, login, logout
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.contrib.auth.models import User
 from django.forms import formset_factory
 import json
@@ -29,7 +29,7 @@ from .ocr_parser import extract_details_with_llm, get_text_from_image
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.core.exceptions import FieldDoesNotExist 
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 from .forms import BatchDeleteForm, ModifyItemForm,EditItemForm,AddItemForm,FilterForm,LoginForm,InventoryLogFilterForm, InvoiceScanForm,InventoryDocumentForm, DeleteItemForm, BatchTransferForm
 from django.forms.models import model_to_dict
 from django.views.decorators.csrf import csrf_exempt
@@ -59,7 +59,12 @@ from decimal import Decimal
 from .models import InventoryItem,TechnicalData, Location, Project, InventoryLog,UIDCategorySequence,ItemCategory,DocumentTag,InventoryDocument,Category,ItemStatus
 from django.contrib.auth.forms import UserCreationForm
 from .forms import InventoryDocumentForm
-from .models import Kit
+from .models import ExportJob, ImportJob, ImportStagingRow, InvoiceScan, Kit
+from . import bulk, category_match, counters, export_jobs, exports, fuzzy, import_jobs, imports, lookups, search, spreadsheets, uploads
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from .querysets import apply_filters, with_row_annotations
+from .pagination import paginate, pagination_query
 
 logger = logging.getLogger(__name__)
 pytesseract.pytesseract.tesseract_cmd = r'"C:\Program Files\Tesseract-OCR\tesseract.exe"'
@@ -95,46 +100,48 @@ def clear_all_logs(request):
 
     
 
+def _filter_logs(logs, form):
+    """Applies a valid InventoryLogFilterForm's filters to ``logs``."""
+    user_filter = form.cleaned_data.get('user')
+    action_filter = form.cleaned_data.get('action')
+    item_name_filter = form.cleaned_data.get('item_name')
+    uid_number_filter = form.cleaned_data.get('uid_number')
+    start_date_filter = form.cleaned_data.get('start_date')
+    end_date_filter = form.cleaned_data.get('end_date')
+
+    if user_filter:
+        logs = logs.filter(user=user_filter)
+    if action_filter:
+        logs = logs.filter(action__icontains=action_filter)
+    if item_name_filter:
+        logs = logs.filter(Q(inventory_item__item_name__icontains=item_name_filter) | Q(details__icontains=item_name_filter))
+    if uid_number_filter:
+        logs = logs.filter(uid_number__icontains=uid_number_filter)
+    # Day bounds as timestamps rather than timestamp__date, so the timestamp index applies.
+    if start_date_filter:
+        logs = logs.filter(timestamp__gte=timezone.make_aware(datetime.combine(start_date_filter, datetime.min.time())))
+    if end_date_filter:
+        next_day = end_date_filter + timedelta(days=1)
+        logs = logs.filter(timestamp__lt=timezone.make_aware(datetime.combine(next_day, datetime.min.time())))
+    return logs
+
 @login_required(login_url='inventory:login')
 def inventory_logs(request):
     logs = InventoryLog.objects.all()
     form = InventoryLogFilterForm(request.GET or None)
 
     if form.is_valid():
-        user_filter = form.cleaned_data.get('user')
-        action_filter = form.cleaned_data.get('action')
-        item_name_filter = form.cleaned_data.get('item_name')
-        uid_number_filter = form.cleaned_data.get('uid_number')
-        start_date_filter = form.cleaned_data.get('start_date')
-        end_date_filter = form.cleaned_data.get('end_date')
-
-        if user_filter:
-            logs = logs.filter(user=user_filter)
-        if action_filter:
-            logs = logs.filter(action__icontains=action_filter)
-        if item_name_filter:
-            logs = logs.filter(Q(inventory_item__item_name__icontains=item_name_filter) | Q(details__icontains=item_name_filter))
-        if uid_number_filter:
-            logs = logs.filter(uid_number__icontains=uid_number_filter)
-        if start_date_filter:
-            logs = logs.filter(timestamp__date__gte=start_date_filter)
-        if end_date_filter:
-            logs = logs.filter(timestamp__date__lte=end_date_filter)
-
-    logs = logs.order_by('-timestamp')
+        logs = _filter_logs(logs, form)
+
+    logs = logs.select_related('user', 'inventory_item').order_by('-timestamp', '-id')
 
     page_size = request.GET.get('page_size', 10)
-    paginator = Paginator(logs, page_size)
-    page_number = request.GET.get('page', 1)
-    try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+    page_obj, cursor_mode = paginate(request, logs, 'timestamp', descending=True, page_size=page_size)
 
     context = {
         'page_obj': page_obj,
+        'cursor_mode': cursor_mode,
+        'pagination_query': pagination_query(request),
         'form': form,
         'page_sizes': [5, 10, 25, 50, 100],
         'page_size': int(page_size),
@@ -218,10 +225,17 @@ def user_register(request):
 
 # --- INVENTORY MANAGEMENT VIEWS ---
 
+# Column headers the dashboard can sort by; anything else falls back to item_name.
+# Each has a unique or (column, id) index on InventoryItem, so deep pages stay cheap.
+DASHBOARD_SORTS = ['item_name', 'uid_no', 'serial_number', 'quantity', 'status', 'search_rank']
+
+# Reference lists the dashboard's modals load from lookup_list.
+DASHBOARD_LOOKUPS = ['users', 'locations', 'projects']
+
+
 @login_required(login_url='inventory:login')
 def dashboard_view(request):
     items = InventoryItem.objects.filter(is_deleted=False)
-    purge_old_deletions()
 
     # ✅ Initialize filter_form
     if request.method == "GET":
@@ -229,75 +243,82 @@ def dashboard_view(request):
     else:
         filter_form = FilterForm()
 
+    search_query = None
     if filter_form.is_valid():
         search_query = filter_form.cleaned_data.get('search')
-        if search_query:
-            items = items.filter(
-                Q(item_name__icontains=search_query) |
-                Q(uid_no__icontains=search_query) |
-                Q(serial_number__icontains=search_query) |
-                Q(location__name__icontains=search_query) |
-                Q(status__icontains=search_query) |
-                Q(description__icontains=search_query)
-            )
-
-    sort = request.GET.get('sort', 'item_name')
-    direction = request.GET.get('direction', 'asc')
+        items = apply_filters(items, filter_form.cleaned_data)
+
+    # Searches are ranked by relevance unless the user picked a column.
+    default_sort = 'search_rank' if search_query and 'sort' not in request.GET else 'item_name'
+    sort = request.GET.get('sort', default_sort)
+    if sort not in DASHBOARD_SORTS or (sort == 'search_rank' and not search_query):
+        sort = 'item_name'
+    direction = request.GET.get('direction', 'desc' if sort == 'search_rank' else 'asc')
     
-    if sort == 'location__name':
-        items = items.order_by('-location__name' if direction == 'desc' else 'location__name')
-    elif sort == 'project__name':
-        items = items.order_by('-project__name' if direction == 'desc' else 'project__name')
+    if sort == 'search_rank':
+        items = items.order_by('-search_rank', 'item_name')
     else:
         if direction == 'desc':
             sort = f'-{sort}'
         items = items.order_by(sort)
 
+    items = with_row_annotations(items)
+
     page_size = request.GET.get('page_size', 10)
-    paginator = Paginator(items, page_size)
-    page_number = request.GET.get('page', 1)
-    try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+    keyset_sort = None if sort == 'search_rank' else sort.lstrip('-')
+    page_obj, cursor_mode = paginate(request, items, keyset_sort, descending=direction == 'desc', page_size=page_size)
 
-    locations = Location.objects.all().order_by('name')
-    projects = Project.objects.all().order_by('name')
-    users = User.objects.all().order_by('username')
+    # Reference lists are fetched by the browser from versioned, cacheable URLs.
+    lookup_urls = {
+        name: f"{reverse('inventory:lookup_list', args=[name])}?v={current.version}"
+        for name, current in lookups.current_versions(DASHBOARD_LOOKUPS).items()
+    }
 
-    total_item_count = InventoryItem.objects.filter(is_deleted=False).count()
+    total_item_count = counters.total()
+    status_counts = counters.breakdown('status')
 
     context = {
         'filter_form': filter_form,
         'page_obj': page_obj,
+        'cursor_mode': cursor_mode,
+        'pagination_query': pagination_query(request),
         'page_sizes': [5, 10, 25, 50, 100],
         'page_size': int(page_size),
         'sort': sort.lstrip('-'),
         'direction': direction,
-        'locations': locations,
-        'projects': projects,
-        'users': users,
         'total_item_count': total_item_count,
-        'locations_json': json.dumps([model_to_dict(loc) for loc in locations], cls=DjangoJSONEncoder),
-        'projects_json': json.dumps([model_to_dict(proj) for proj in projects], cls=DjangoJSONEncoder),
-        'users_json': json.dumps([model_to_dict(user) for user in users], cls=DjangoJSONEncoder),
+        'status_counts': status_counts,
+        'lookup_urls': lookup_urls,
     }
     return render(request, 'inventory/dashboard.html', context)
 
-def generate_uid(category_prefix, current_seq):
+@login_required(login_url='inventory:login')
+def lookup_list(request, name):
     """
-    Helper function to generate a new unique UID.
-    This now uses a passed sequence number to ensure continuity within a batch.
+    Versioned JSON for a reference list (locations, projects, users).
+    URLs carrying the current ``?v=`` may be cached by the browser outright;
+    anything else is revalidated through ETag / Last-Modified.
     """
-    if not category_prefix:
-        category_prefix = 'OTH'
-        
-    today_str = date.today().strftime('%y%m%d')
-    prefix_with_date = f"{category_prefix}{today_str}"
-    
-    return f"{prefix_with_date}{current_seq:04d}"
+    if name not in lookups.LOOKUPS:
+        return JsonResponse({'error': 'Unknown lookup.'}, status=404)
+
+    current = lookups.current_versions([name])[name]
+    etag = lookups.etag(name, current.version)
+    last_modified = int(current.updated_at.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = JsonResponse({
+            'version': current.version,
+            'results': lookups.payload(name, current.version),
+        })
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if request.GET.get('v') == str(current.version):
+        patch_cache_control(response, private=True, max_age=lookups.CACHE_TIMEOUT)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @login_required(login_url='inventory:login')
@@ -349,6 +370,11 @@ def add_item_view(request):
     }
     return render(request, 'inventory/add_item.html', context)
 
+# Invoice rows are checked field by field before the bulk insert; references
+# were resolved in bulk already and the UID is assigned on insert.
+INVOICE_ROW_UNCHECKED = ['category', 'location', 'project', 'created_by', 'uid_no', 'uid_prefix', 'uid_date', 'uid_seq']
+
+
 @login_required(login_url='inventory:login')
 @require_POST
 def add_items_from_invoice(request):
@@ -365,8 +391,20 @@ def add_items_from_invoice(request):
         if m:
             indices.add(int(m.group(1)))
 
-    saved_count = 0
     errors = []
+    new_items = []
+
+    # Reference rows are resolved once for the whole invoice, not per line.
+    def posted_ids(field):
+        values = (request.POST.get(f"items[{idx}][{field}]", "") for idx in indices)
+        return [int(v) for v in values if v.isdigit()]
+
+    categories = {str(pk): c for pk, c in ItemCategory.objects.in_bulk(posted_ids("category_id")).items()}
+    other_category = ItemCategory.objects.filter(name__iexact="Other").first()
+    locations = {str(pk): l for pk, l in Location.objects.in_bulk(posted_ids("location_id")).items()}
+
+    serials = {request.POST.get(f"items[{idx}][serial_number]", "").strip() for idx in indices} - {""}
+    taken = set(InventoryItem.objects.filter(serial_number__in=serials).values_list('serial_number', flat=True))
 
     for idx in sorted(indices):
         prefix = f"items[{idx}]"
@@ -389,60 +427,70 @@ def add_items_from_invoice(request):
         except Exception:
             price = Decimal("0.00")
 
-        # resolve category (fallback to Other)
-        category_obj = None
-        if category_val and category_val != "other":
-            try:
-                category_obj = ItemCategory.objects.filter(id=int(category_val)).first()
-            except Exception:
-                category_obj = None
-        if not category_obj:
-            category_obj = ItemCategory.objects.filter(name__iexact="Other").first()
-
-        # resolve location
-        location_obj = None
-        if location_val:
-            try:
-                location_obj = Location.objects.filter(id=int(location_val)).first()
-            except Exception:
-                location_obj = None
+        # resolve category (fallback to Other) and location
+        category_obj = categories.get(category_val) or other_category
+        location_obj = locations.get(location_val)
 
+        if serial_number and serial_number in taken:
+            errors.append(f"Row {idx}: Serial Number '{serial_number}' already exists.")
+            continue
+
+        inv_item = InventoryItem(
+            item_name=item_name or "Untitled",
+            description=description,
+            invoice_number=invoice_number,
+            category=category_obj,
+            status=status_val or InventoryItem.STATUS_CHOICES[0][0],
+            serial_number=serial_number or None,
+            quantity=qty,
+            price=price,
+            location=location_obj,
+            created_by=request.user
+        )
+        # A bad row is reported and left out; the rest of the invoice still saves.
         try:
-            inv_item = InventoryItem(
-                item_name=item_name or "Untitled",
-                description=description,
-                invoice_number=invoice_number,
-                category=category_obj,
-                status=status_val or InventoryItem.STATUS_CHOICES[0][0],
-                serial_number=serial_number or None,
-                quantity=qty,
-                price=price,
-                location=location_obj,
-                created_by=request.user
-            )
-            inv_item.save()
-            saved_count += 1
+            inv_item.clean_fields(exclude=INVOICE_ROW_UNCHECKED)
+        except ValidationError as e:
+            problems = "; ".join(f"{field}: {' '.join(msgs)}" for field, msgs in e.message_dict.items())
+            errors.append(f"Row {idx}: {problems}")
+            continue
+        if serial_number:
+            taken.add(serial_number)
+        new_items.append(inv_item)
+
+    saved_count = 0
+    try:
+        with transaction.atomic():
+            # One UID block per category, then batched inserts.
+            bulk.create_items(new_items)
 
             # ✅ link the SAME invoice copy to each item
             if invoice_file_path and os.path.exists(invoice_file_path):
                 tag, _ = DocumentTag.objects.get_or_create(name="Invoice")
-                InventoryDocument.objects.create(
+                InventoryDocument.objects.bulk_create([
+                    InventoryDocument(
+                        inventory_item=inv_item,
+                        tag=tag,
+                        file=invoice_rel_path,  # relative to MEDIA_ROOT
+                        description=f"Invoice document for {invoice_number or 'N/A'}",
+                        uploaded_by=request.user
+                    )
+                    for inv_item in new_items
+                ])
+
+            InventoryLog.objects.bulk_create([
+                InventoryLog(
+                    user=request.user,
                     inventory_item=inv_item,
-                    tag=tag,
-                    file=invoice_rel_path,  # relative to MEDIA_ROOT
-                    description=f"Invoice document for {invoice_number or 'N/A'}",
-                    uploaded_by=request.user
+                    action="item_added",
+                    details=f"Scanned item '{inv_item.item_name}' was added from invoice {invoice_number or 'N/A'}.",
+                    uid_number=inv_item.uid_no,
                 )
-
-                create_log_entry(
-                user=request.user,
-                item=inv_item,
-                action="item_added",
-                details=f"Scanned item '{inv_item.item_name}' was added from invoice {invoice_number or 'N/A'}."
-            )
-
-        except Exception as e:
-            errors.append(f"Row {idx}: {e}")
+                for inv_item in new_items
+            ])
+        saved_count = len(new_items)
+    except Exception as e:
+        errors.append(f"Invoice items could not be saved: {e}")
 
     if saved_count:
         messages.success(request, f"{saved_count} scanned item(s) saved successfully.")
@@ -556,22 +604,8 @@ def delete_item_view(request, pk):
     })
 
 
-def purge_old_deletions():
-    expiry_time = timezone.now() - timedelta(seconds=30)  # keep 30s for undo
-    old_items = InventoryItem.objects.filter(is_deleted=True, deleted_at__lt=expiry_time)
-    for item in old_items:
-            create_log_entry(
-                user=None,  # system action
-                item=None,
-                action="item_purged",
-                details=f'Item "{item.item_name}" (UID {item.uid_no}) was permanently deleted.',
-                uid_number_for_log=item.uid_no
-            )
-
-    count = old_items.count()
-    if count:
-        logger.info(f"Purging {count} items permanently.")
-        old_items.delete()
+# Per-row import problems listed as messages; the rest are summarised.
+IMPORT_ERRORS_SHOWN = 20
 
 
 @login_required(login_url='inventory:login')
@@ -581,63 +615,19 @@ def import_items_view(request):
         if form.is_valid():
             try:
                 uploaded_file = request.FILES['document_file']
-                file_ext = os.path.splitext(uploaded_file.name)[1].lower()
-
-                if file_ext in ['.xlsx', '.xls']:
-                    df = pd.read_excel(uploaded_file)
-                elif file_ext == '.csv':
-                    df = pd.read_csv(uploaded_file)
-                else:
+                if spreadsheets.extension(uploaded_file.name) not in spreadsheets.EXTENSIONS:
                     messages.error(request, 'Invalid file format. Please upload an Excel or CSV file.')
                     return redirect('inventory:dashboard')
 
-                with transaction.atomic():
-                    df.columns = df.columns.str.strip().str.lower()
-                    for index, row in df.iterrows():
-                        try:
-                            raw_serial = row.get('serial_number')
-                            
-                            # ✅ Check for duplicate serial number
-                            if pd.isna(raw_serial) or str(raw_serial).strip() == "":
-                                serial_number = None
-                            else:
-                                serial_number = str(raw_serial).strip()
-                            if serial_number and InventoryItem.objects.filter(serial_number=serial_number).exists():
-                                messages.warning(request, f"Skipped row {index+2}: Serial Number '{serial_number}'is duplicate.")
-                                
-                                continue
-
-                            category_id = row.get('category_id')
-                            location_id = row.get('location_id')
-                            status_id = row.get('status_id')
-
-                            category = ItemCategory.objects.get(id=category_id)
-                            location = Location.objects.get(id=location_id)
-                            status = ItemStatus.objects.get(id=status_id)
-
-                            unit_price = Decimal(str(row.get('unit_price', '0')))
-                            quantity = int(row.get('quantity', 0))
-
-                            InventoryItem.objects.create(
-                                uid_no=row.get('uid_no'),
-                                item_name=row.get('item_name'),
-                                description=row.get('description'),
-                                serial_number=serial_number,
-                                quantity=quantity,
-                                price=unit_price,
-                                category=category,
-                                status=status,
-                                location=location,
-                                created_by=request.user,
-                            )
-                        except (ItemCategory.DoesNotExist, Location.DoesNotExist, ItemStatus.DoesNotExist) as e:
-                            messages.error(request, f"Skipped row {index + 2}: Missing Category, Location, or Status.")
-                            continue
-                        except Exception as e:
-                            messages.error(request, f"Skipped row {index + 2}: {e}")
-                            continue
-
-                messages.success(request, 'Items imported successfully.')
+                # Rows are inserted set-wise, batch by batch, by the import worker.
+                job, created = import_jobs.enqueue(
+                    uploaded_file, request.user, kind='import',
+                    content_hash=uploads.content_hash(request, 'document_file'),
+                )
+                if created:
+                    messages.info(request, f"Import #{job.pk} of '{uploaded_file.name}' has been queued.")
+                else:
+                    messages.info(request, f"'{uploaded_file.name}' was already uploaded as import #{job.pk} ({job.get_status_display().lower()}).")
                 return redirect('inventory:dashboard')
 
             except Exception as e:
@@ -651,67 +641,39 @@ def import_items_view(request):
 @login_required
 def export_inventory(request):
     """
-    Exports a filtered or complete list of inventory items to an Excel file.
+    Exports a filtered or complete list of inventory items. ``format`` picks
+    xlsx (the default), csv, jsonl or parquet.
     """
+    try:
+        export_format = exports.get_format(request.GET.get('format'))
+    except exports.UnavailableFormat as e:
+        messages.error(request, str(e))
+        return redirect('inventory:dashboard')
+
     try:
         # Get item IDs from the query parameters
         item_ids_str = request.GET.get('item_ids', '')
         if item_ids_str:
             item_ids = [int(item_id) for item_id in item_ids_str.split(',') if item_id.isdigit()]
-            items = InventoryItem.objects.filter(id__in=item_ids).order_by('item_name')
+            items = exports.export_items(item_ids)
         else:
             # If no specific items are selected, export all items
-            items = InventoryItem.objects.all().order_by('item_name')
+            items = exports.export_items()
 
-        if not items:
+        if not items.exists():
             messages.warning(request, "No items found to export.")
             return redirect('inventory:dashboard')
 
-        # Create a DataFrame from the queryset
-        data = []
-        for item in items:
-            # Safely get the status display name. The .get_status_display() method
-            # correctly handles the value from the choices tuple.
-            status_display = item.get_status_display()
-            
-            # Safely get related object names, handling cases where they might be None.
-            category_name = item.category.name if item.category else 'N/A'
-            location_name = item.location.name if item.location else 'N/A'
-            project_name = item.project.name if item.project else 'N/A'
-
-            # This is the crucial fix for the 'str' object error.
-            # It correctly joins the names of all related kits.
-            kit_names = ", ".join([k.name for k in item.kits.all()]) if item.kits.exists() else 'N/A'
-            
-            data.append({
-                'UID No': item.uid_no,
-                'Item Name': item.item_name,
-                'Description': item.description,
-                'Serial Number': item.serial_number,
-                'Quantity': item.quantity,
-                'Price': item.price,
-                'Category': category_name,
-                'Status': status_display,
-                'Location': location_name,
-                'Project': project_name,
-                'Kit': kit_names,
-                'Created By': item.created_by.username,
-                'Created At': item.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            })
-        
-        df = pd.DataFrame(data)
+        # A file the export worker already built from the same, unchanged items is sent as is.
+        artifact = export_jobs.fresh_artifact(export_jobs.normalise(request.GET))
+        if artifact is not None:
+            return _export_download(artifact)
+
+        # Rows stream from the database cursor; see inventory.exports.
+        return exports.response(
+            export_format, items, exports.ITEM_COLUMNS, 'inventory_data', sheet_name='Inventory Data'
+        )
 
-        # Create an in-memory buffer for the Excel file
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name='Inventory Data')
-        
-        # Prepare the response
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="inventory_data.xlsx"'
-        return response
-    
     except Exception as e:
         logging.error(f"Error during inventory export: {e}")
         messages.error(request, "An unexpected error occurred during export.")
@@ -774,86 +736,75 @@ def delete_item_general(request):
 
 @login_required(login_url='inventory:login')
 def save_imported_items(request):
-    if request.method == 'POST':
-        ImportItemFormSet = formset_factory(ImportItemForm)
-        formset = ImportItemFormSet(request.POST)
-
-        if formset.is_valid():
-            saved_count = 0
-            skipped_count = 0
-
-            with transaction.atomic():
-                # Get the latest sequence for each category in one pass
-                sequential_uids = {}
-                for form in formset:
-                    category_id = form.cleaned_data.get('category').id
-                    if category_id not in sequential_uids:
-                        category_prefix = ItemCategory.objects.get(id=category_id).prefix
-                        max_uid = InventoryItem.objects.select_for_update().filter(
-                            uid_no__startswith=category_prefix
-                        ).aggregate(max_uid=Max('uid_no'))
-
-                        latest_seq = 0
-                        if max_uid['max_uid']:
-                            try:
-                                latest_seq = int(max_uid['max_uid'][-4:])
-                            except (ValueError, IndexError):
-                                latest_seq = 0
-                        sequential_uids[category_id] = latest_seq
-
-                for idx, form in enumerate(formset, start=2):  # start=2 to match Excel row numbers
-                    item_data = form.cleaned_data
-                    category_id = item_data.get('category').id
-                    sequential_uids[category_id] += 1
-                    uid_no = generate_uid(item_data.get('category').prefix, sequential_uids[category_id])
-
-                    # ✅ Clean serial number
-                    raw_serial = item_data.get('serial_number')
-                    if not raw_serial or str(raw_serial).strip().lower() in ["", "nan", "none"]:
-                        serial_number = None
-                    else:
-                        serial_number = str(raw_serial).strip()
-
-                    # ✅ Duplicate check
-                    if serial_number and InventoryItem.objects.filter(serial_number=serial_number).exists():
-                        messages.warning(request, f"Skipped row {idx}: Serial Number '{serial_number}' already exists.")
-                        skipped_count += 1
-                        continue
-
-                    price_val = item_data.get('price') or Decimal('1.00')
-
-                    InventoryItem.objects.create(
-                        uid_no=uid_no,
-                        item_name=item_data.get('item_name'),
-                        description=item_data.get('description'),
-                        quantity=item_data.get('quantity'),
-                        price=price_val,
-                        serial_number=serial_number,
-                        category=item_data.get('category'),
-                        location=item_data.get('location'),
-                        status=item_data.get('status'),
-                        project=item_data.get('project'),
-                        created_by=request.user
-                    )
-                    saved_count += 1
+    """
+    Every button on the review page first writes that page's edits back to
+    the staged rows in one bulk_update. Then 'save' moves on to ``next``
+    (another page), 'fill' sets the chosen category/location/status/project
+    on every staged row still missing one, and 'commit' imports all staged
+    rows in bulk.
+    """
+    if request.method != 'POST':
+        return redirect('inventory:import')
 
-            messages.success(request, f"✅ {saved_count} items imported successfully. ⚠️ {skipped_count} skipped due to duplicates.")
-            if 'import_data' in request.session:
-                del request.session['import_data']
-            return redirect('inventory:dashboard')
+    job = _review_job(request)
+    if job is None:
+        messages.error(request, 'No data found. Please upload a file first.')
+        return redirect('inventory:import')
 
-        else:
-            messages.error(request, "Error saving items. Please correct the errors below.")
-            context = {
-                'formset': formset,
-                'item_categories': ItemCategory.objects.all(),
-                'locations': Location.objects.all(),
-                'statuses': ItemStatus.objects.all(),
-                'projects': Project.objects.all(),
-            }
-            return render(request, 'inventory/import_review.html', context)
+    review_url = reverse('inventory:import_review')
+    next_url = request.POST.get('next') or review_url
+    if not next_url.startswith(review_url):
+        next_url = review_url
+
+    choices = _review_choices()
+    ImportItemFormSet = formset_factory(ImportItemForm)
+    formset = ImportItemFormSet(request.POST, form_kwargs={'choices': choices})
+    if not formset.is_valid():
+        messages.error(request, "Error saving items. Please correct the errors below.")
+        context = _review_context(job, formset, choices, current_url=request.POST.get('current', ''))
+        return render(request, 'inventory/import_review.html', context)
+
+    edits = {form.cleaned_data['row_no']: form.cleaned_data for form in formset if form.cleaned_data}
+    staged_rows = list(job.staged_rows.filter(row_no__in=list(edits)))
+    for row in staged_rows:
+        for field, attribute in REVIEW_FIELDS.items():
+            value = edits[row.row_no][field]
+            if field in ('item_name', 'serial_number'):
+                value = (value or '').strip()
+            setattr(row, attribute, value)
+    ImportStagingRow.objects.bulk_update(staged_rows, list(REVIEW_FIELDS.values()), batch_size=500)
+
+    action = request.POST.get('action', 'save')
+    if action == 'fill':
+        filled = 0
+        for field, lookup in ImportItemForm.CHOICE_LOOKUPS.items():
+            valid_ids = {str(pk): pk for pk, _ in choices[lookup]}
+            value = request.POST.get(f'fill_{field}')
+            if value in valid_ids:
+                filled += job.staged_rows.filter(**{f'{field}__isnull': True}).update(**{f'{field}_id': valid_ids[value]})
+        messages.success(request, f"Filled in {filled} empty field(s).")
+        return redirect(next_url)
+
+    if action == 'commit':
+        incomplete = _incomplete_rows(job)
+        first_row = incomplete.order_by('row_no').values_list('row_no', flat=True).first()
+        if first_row is not None:
+            messages.error(
+                request,
+                f"{incomplete.count()} row(s), starting with spreadsheet row {first_row}, still need a name, category, location and status."
+            )
+            return redirect(next_url)
+
+        result = imports.commit_staged(job, request.user)
+        for row_no, message in result.errors[:IMPORT_ERRORS_SHOWN]:
+            messages.warning(request, f"Skipped row {row_no}: {message}")
+        if result.skipped > IMPORT_ERRORS_SHOWN:
+            messages.warning(request, f"...and {result.skipped - IMPORT_ERRORS_SHOWN} more row(s) skipped.")
+        messages.success(request, f"✅ {result.created} items imported successfully. ⚠️ {result.skipped} skipped due to duplicates.")
+        request.session.pop('import_job_id', None)
+        return redirect('inventory:dashboard')
 
-    return redirect('inventory:import')
+    return redirect(next_url)
 
 
 @login_required(login_url='inventory:login')
@@ -1003,16 +954,22 @@ def undo_last_deletion(request):
         return redirect("inventory:dashboard")
 
     items = InventoryItem.objects.filter(id__in=last_ids, is_deleted=True)
-    restored_count = items.count()
+    restored_count = 0
 
-    items.update(is_deleted=False, deleted_at=None)
-    request.session['last_deleted_ids'] = []  
-    create_log_entry(
+    # Saved one by one (not .update()) so the post_save hooks keep the
+    # dashboard counters and search index in step.
+    for item in items:
+        item.is_deleted = False
+        item.deleted_at = None
+        item.save()
+        restored_count += 1
+        create_log_entry(
             user=request.user,
             item=item,
             action="item_restored",
             details=f'Item "{item.item_name}" (UID {item.uid_no}) was restored (undo last deletion).'
         )
+    request.session['last_deleted_ids'] = []  
     
 
     messages.success(request, f"Restored {restored_count} item(s).")
@@ -1049,38 +1006,19 @@ def export_selected_items_to_excel(request):
     except ValueError:
         return HttpResponse("Invalid item IDs provided.", status=400)
 
-    items_to_export = InventoryItem.objects.filter(id__in=selected_ids)
+    try:
+        export_format = exports.get_format(request.GET.get('format'))
+    except exports.UnavailableFormat as e:
+        return HttpResponse(str(e), status=400)
+
+    items_to_export = exports.export_items(selected_ids)
     if not items_to_export.exists():
         return HttpResponse("No items found matching the selected IDs.", status=404)
 
-    data = []
-    for item in items_to_export:
-        data.append({
-            'Item Name': item.item_name,
-            'UID No': item.uid_no,
-            'Serial Number': item.serial_number if item.serial_number else 'N/A',
-            'Quantity': item.quantity,
-            'Location': item.location.name if item.location else 'N/A',
-            'Project': item.project.name if item.project else 'N/A',
-            'Status': item.get_status_display(),
-            'Description': item.description if item.description else 'N/A',
-            'Date Added': item.created_at.strftime('%Y-%m-%d %H:%M:%S') if item.created_at else 'N/A',
-            'Created At': item.created_at.strftime('%Y-%m-%d %H:%M:%S') if item.created_at else 'N/A', 
-            'Updated At': item.updated_at.strftime('%Y-%m-%d %H:%M:%S') if item.updated_at else 'N/A',
-        })
-
-    import pandas as pd
-    df = pd.DataFrame(data)
-
-    from io import BytesIO
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Selected Items')
-    output.seek(0)
-
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename="selected_inventory_items.xlsx"'
-    response.write(output.read())
+    response = exports.response(
+        export_format, items_to_export, exports.SELECTED_ITEM_COLUMNS,
+        'selected_inventory_items', sheet_name='Selected Items'
+    )
     create_log_entry(
         user=request.user,
         item=None,
@@ -1092,8 +1030,41 @@ def export_selected_items_to_excel(request):
 
 
 
+@login_required(login_url='inventory:login')
 def export_all_logs_excel(request):
-    pass
+    """
+    Exports the audit log, narrowed by the same filters as the log page, as
+    xlsx (the default) or any other format in inventory.exports (``format``).
+    Rows are read from the database a chunk at a time, so the size of the
+    range doesn't matter.
+    """
+    form = InventoryLogFilterForm(request.GET or None)
+    if request.GET and not form.is_valid():
+        messages.error(request, "Invalid log filters; nothing was exported.")
+        return redirect('inventory:inventory_logs')
+    try:
+        export_format = exports.get_format(request.GET.get('format'))
+    except exports.UnavailableFormat as e:
+        messages.error(request, str(e))
+        return redirect('inventory:inventory_logs')
+
+    # The log as it stood when asked for; entries written while a long export streams are left out.
+    logs = InventoryLog.objects.filter(timestamp__lte=timezone.now())
+    if form.is_bound:
+        logs = _filter_logs(logs, form)
+    logs = logs.order_by('-timestamp', '-id')
+
+    try:
+        response = exports.response(
+            export_format, logs, exports.LOG_COLUMNS, 'inventory_logs', sheet_name='Audit Log'
+        )
+    except Exception as e:
+        logging.error(f"Error during audit log export: {e}")
+        messages.error(request, "An unexpected error occurred during export.")
+        return redirect('inventory:inventory_logs')
+
+    create_log_entry(request.user, None, 'logs_exported', f"Exported the audit log as {export_format.extension}.")
+    return response
 
 
 
@@ -1196,28 +1167,167 @@ def batch_transfer_items(request):
             logger.exception("An unexpected error occurred during batch transfer.")
             return JsonResponse({'success': False, 'message': f'An unexpected server error occurred: {str(e)}'}, status=500)
 
+def _review_job(request):
+    """The finished review job whose id the session carries, or None."""
+    return ImportJob.objects.filter(
+        pk=request.session.get('import_job_id'), kind='review', status='done'
+    ).first()
+
+
+# ImportItemForm field -> ImportStagingRow attribute, for the page's edits.
+REVIEW_FIELDS = {
+    'item_name': 'item_name', 'description': 'description', 'quantity': 'quantity',
+    'serial_number': 'serial_number', 'category': 'category_id', 'location': 'location_id',
+    'status': 'status_id', 'project': 'project_id',
+}
+
+
+def _review_choices():
+    return lookups.choices(list(ImportItemForm.CHOICE_LOOKUPS.values()))
+
+
+def _review_context(job, formset, choices, page_obj=None, cursor_mode=False, current_url=''):
+    """
+    The review template renders each choice list once (the "fill" selects)
+    and gives every row's select only its current option, which the page's
+    script swaps for the full list on first use.
+    """
+    labels = {lookup: dict(options) for lookup, options in choices.items()}
+    rows = []
+    for form in formset:
+        selected = {}
+        for field, lookup in ImportItemForm.CHOICE_LOOKUPS.items():
+            value = form[field].value()
+            try:
+                value = int(value) if value not in (None, '') else None
+            except (TypeError, ValueError):
+                value = None
+            selected[field] = {'id': value, 'name': labels[lookup].get(value)}
+        rows.append({'form': form, 'selected': selected})
+
+    return {
+        'formset': formset,
+        'rows': rows,
+        'choices': choices,
+        'job': job,
+        'page_obj': page_obj,
+        'cursor_mode': cursor_mode,
+        'current_url': current_url or reverse('inventory:import_review'),
+        'staged_count': job.staged_rows.count(),
+        'incomplete_count': _incomplete_rows(job).count(),
+    }
+
+
+def _incomplete_rows(job):
+    return job.staged_rows.filter(
+        Q(item_name='') | Q(category__isnull=True) | Q(location__isnull=True) | Q(status__isnull=True)
+    )
+
+
 def import_review(request):
-    if 'import_data' not in request.session:
+    job = _review_job(request)
+    if job is None or not job.staged_rows.exists():
         messages.error(request, 'No data found. Please upload a file first.')
         return redirect('inventory:import')
-    
-    import_data = request.session['import_data']
-    
+
+    # Staged rows are read a page at a time along the (job, row_no) index.
+    page_size = getattr(settings, 'INVENTORY_IMPORT_REVIEW_PAGE_SIZE', 100)
+    staged = job.staged_rows.order_by('row_no')
+    page_obj, cursor_mode = paginate(request, staged, 'row_no', page_size=page_size)
+    initial = [
+        {'row_no': row.row_no, **{field: getattr(row, attribute) for field, attribute in REVIEW_FIELDS.items()}}
+        for row in page_obj.object_list
+    ]
+
     # Do not generate UIDs here anymore
+    choices = _review_choices()
     ImportItemFormSet = formset_factory(ImportItemForm, extra=0)
-    formset = ImportItemFormSet(initial=import_data)
+    formset = ImportItemFormSet(initial=initial, form_kwargs={'choices': choices})
 
-    context = {
-        'formset': formset,
-        'item_categories': ItemCategory.objects.all(),
-        'locations': Location.objects.all(),
-        'statuses': ItemStatus.objects.all(),
-        'projects': Project.objects.all(),
-    }
+    context = _review_context(job, formset, choices, page_obj, cursor_mode, request.get_full_path())
     return render(request, 'inventory/import_review.html', context)
 
 
 
+@login_required(login_url='inventory:login')
+def import_job_status(request, pk):
+    """Progress of an upload being processed in the background, polled by the import UI."""
+    job = get_object_or_404(ImportJob, pk=pk)
+    if job.created_by_id != request.user.pk and not request.user.is_staff:
+        return JsonResponse({'error': 'Not found.'}, status=404)
+
+    data = import_jobs.summary(job)
+    if job.status == 'done':
+        data['redirect_url'] = reverse('inventory:import_review') if job.kind == 'review' else reverse('inventory:dashboard')
+    if job.error_sheet:
+        data['error_sheet_url'] = reverse('inventory:import_job_errors', args=[job.pk])
+    return JsonResponse(data)
+
+
+@login_required(login_url='inventory:login')
+def import_job_errors(request, pk):
+    """Downloads the validation error sheet of an import job."""
+    job = get_object_or_404(ImportJob, pk=pk)
+    if (job.created_by_id != request.user.pk and not request.user.is_staff) or not job.error_sheet:
+        raise Http404("No error sheet for this import.")
+    return FileResponse(
+        job.error_sheet.open('rb'), as_attachment=True, content_type='text/csv',
+        filename=f"{os.path.splitext(job.original_name)[0]}-errors.csv",
+    )
+
+
+@login_required(login_url='inventory:login')
+@require_POST
+def export_job_start(request):
+    """
+    Asks for an inventory export (``format``, optional ``item_ids``). Answers
+    with the job's status; the download link is there straight away when an
+    up-to-date file already exists, otherwise the page polls ``status_url``.
+    """
+    try:
+        params = export_jobs.normalise(request.POST)
+    except exports.UnavailableFormat as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    job, created = export_jobs.request_export(params, request.user)
+    return JsonResponse(_export_job_data(job), status=202 if job.status in ('queued', 'running') else 200)
+
+
+def _export_job_data(job):
+    data = export_jobs.summary(job)
+    data['status_url'] = reverse('inventory:export_job_status', args=[job.pk])
+    if job.status == 'done':
+        data['download_url'] = reverse('inventory:export_job_download', args=[job.pk])
+    return data
+
+
+def _export_download(job):
+    export_jobs.touch(job)
+    return FileResponse(
+        job.file.open('rb'), as_attachment=True, filename=f"inventory_data.{job.format}",
+        content_type=exports.FORMATS[job.format].content_type,
+    )
+
+
+@login_required(login_url='inventory:login')
+def export_job_status(request, pk):
+    """Progress of a background export, polled by the dashboard."""
+    job = get_object_or_404(ExportJob, pk=pk)
+    return JsonResponse(_export_job_data(job))
+
+
+@login_required(login_url='inventory:login')
+def export_job_download(request, pk):
+    """Downloads a finished export's file. Artifacts are shared: anyone who may export may fetch one."""
+    job = get_object_or_404(ExportJob, pk=pk)
+    if job.status != 'done' or not job.file:
+        raise Http404("This export isn't ready or has expired.")
+    try:
+        return _export_download(job)
+    except FileNotFoundError:
+        raise Http404("This export has expired.")
+
+
 def import_items_submit(request):
     if request.method == 'POST':
         file = request.FILES.get('file')
@@ -1227,64 +1337,31 @@ def import_items_submit(request):
 
         try:
             file_name = file.name
-            
-            # Read file content into a buffer to be handled by pandas
-            file_content = file.read()
-            
-            if file_name.endswith(('.xlsx', '.xls')):
-                df = pd.read_excel(io.BytesIO(file_content))
-            elif file_name.endswith('.csv'):
-                # Handle potential encoding issues more robustly
-                try:
-                    df = pd.read_csv(io.BytesIO(file_content), encoding='utf-8')
-                except UnicodeDecodeError:
-                    try:
-                        df = pd.read_csv(io.BytesIO(file_content), encoding='latin1')
-                    except UnicodeDecodeError:
-                        df = pd.read_csv(io.BytesIO(file_content), encoding='utf-8', errors='replace')
-
-            else:
+            if spreadsheets.extension(file_name) not in spreadsheets.EXTENSIONS:
                 return JsonResponse({'success': False, 'message': 'Unsupported file format. Please upload a .xlsx, .xls, or .csv file.'}, status=400)
-            
-            df.columns = df.columns.str.strip().str.lower()
-            
-            columns_to_extract = ['item_name', 'description', 'quantity']
-            data_to_review = df.reindex(columns=columns_to_extract).to_dict('records')
-            
-            # --- UPDATED LOGIC ---
-            # Automatically match category and set serial_number to blank
-            all_categories = {re.escape(cat.name.lower()): cat.id for cat in ItemCategory.objects.all()}
-            category_regex = re.compile('|'.join(all_categories.keys()))
-            
-            for item in data_to_review:
-                item_desc = str(item.get('description', '')).lower()
-                matched_category_id = None
-                
-                match = category_regex.search(item_desc)
-                if match:
-                    category_name = match.group(0)
-                    matched_category_id = all_categories.get(category_name)
-                
-                # If no match, set to 'Other' category ID. You MUST have 'Other' in your database.
-                if not matched_category_id:
-                    other_category = ItemCategory.objects.filter(name__iexact='Other').first()
-                    if other_category:
-                        matched_category_id = other_category.id
-                
-                item['category_id'] = matched_category_id
-                item['serial_number'] = '' # Force serial number to be blank
-            # --- END OF UPDATED LOGIC ---
 
-            request.session['import_data'] = data_to_review
-
-            create_log_entry(
-                user=request.user,
-                item=None,
-                action="import_submitted",
-                details=f"User {request.user.username} submitted file '{file_name}' for import review. {len(data_to_review)} rows processed."
+            # Parsing and category matching run in the import worker; the
+            # browser polls status_url and moves on to review when it's done.
+            # The same file sent again (say, after a timeout) picks up its existing job.
+            job, created = import_jobs.enqueue(
+                file, request.user, kind='review', content_hash=uploads.content_hash(request, 'file'),
             )
-            
-            return JsonResponse({'success': True, 'redirect_url': '/inventory/import/review/'})
+            request.session['import_job_id'] = job.pk
+
+            if created:
+                create_log_entry(
+                    user=request.user,
+                    item=None,
+                    action="import_submitted",
+                    details=f"User {request.user.username} submitted file '{file_name}' for import review (job #{job.pk})."
+                )
+
+            return JsonResponse({
+                'success': True,
+                'job_id': job.pk,
+                'status_url': reverse('inventory:import_job_status', args=[job.pk]),
+                'message': 'File uploaded. Processing...' if created else 'This file was already uploaded.',
+            }, status=202)
 
         except Exception as e:
             return JsonResponse({'success': False, 'message': f'Error processing file: {e}'}, status=400)
@@ -1332,6 +1409,7 @@ def get_new_uid(request):
 @login_required(login_url='inventory:login')
 def modify_item(request):
     item = None
+    suggestions = []
     form = ModifyItemForm(request.GET or None)
 
     if request.method == 'GET' and form.is_valid():
@@ -1349,12 +1427,14 @@ def modify_item(request):
                 return redirect('inventory:edit_item', pk=item.pk)
             except InventoryItem.DoesNotExist:
                 messages.error(request, f"No asset found with UID or Serial Number: '{search_query}'. Please try again.")
+                suggestions = fuzzy.suggest(search_query, limit=5)
             except InventoryItem.MultipleObjectsReturned:
                 messages.warning(request, f"Multiple assets found for '{search_query}'. Please be more specific.")
     
     context = {
         'form': form,
         'item': item,
+        'suggestions': suggestions,
     }
     return render(request, 'inventory/modify_item.html', context)
 
@@ -1813,15 +1893,22 @@ def ocr_scan_view(request):
 
     if request.method == "POST" and request.FILES.get("invoice_file"):
         uploaded_file = request.FILES["invoice_file"]
-        scanned_items = get_text_from_image(uploaded_file)
+        manual_invoice_number = request.POST.get("invoice", "").strip()
 
-        # ✅ Extract invoice from OCR
-        invoice_number = extract_invoice_number(uploaded_file)
+        # ✅ The same file uploaded again reuses its first OCR result instead of scanning it twice
+        content_hash = uploads.content_hash(request, "invoice_file")
+        previous_scan = InvoiceScan.objects.filter(content_hash=content_hash).first()
+        if previous_scan is not None:
+            scanned_items = previous_scan.items
+            scanned_invoice_number = previous_scan.invoice_number
+        else:
+            scanned_items = get_text_from_image(uploaded_file)
+
+            # ✅ Extract invoice from OCR
+            scanned_invoice_number = extract_invoice_number(uploaded_file)
 
         # ✅ If user entered manually in Scan Now form, override OCR result
-        manual_invoice_number = request.POST.get("invoice", "").strip()
-        if manual_invoice_number:
-            invoice_number = manual_invoice_number
+        invoice_number = manual_invoice_number or scanned_invoice_number
 
         invoices_dir = os.path.join(settings.MEDIA_ROOT, "documents", "invoices")
         os.makedirs(invoices_dir, exist_ok=True)
@@ -1848,15 +1935,21 @@ def ocr_scan_view(request):
         # ✅ Store relative path for add_items_from_invoice
         request.session["uploaded_invoice_path"] = os.path.relpath(saved_invoice_path, settings.MEDIA_ROOT)
 
+        # ✅ Remember the scan under the file's hash
+        if previous_scan is not None:
+            messages.info(request, f"'{uploaded_file.name}' was scanned before; reusing that result.")
+        elif scanned_items:
+            InvoiceScan.objects.get_or_create(content_hash=content_hash, defaults={
+                "original_name": uploaded_file.name,
+                "invoice_number": scanned_invoice_number or "",
+                "items": scanned_items,
+                "file_path": request.session["uploaded_invoice_path"],
+                "created_by": request.user if request.user.is_authenticated else None,
+            })
+
         # ✅ calculate total
-        for item in scanned_items:
-            try:
-                price = Decimal(str(item.get("total_price") or 0))
-                total_estimated += price
-            except Exception:
-                continue
+        total_estimated = _scanned_total(scanned_items)
 
-        
         create_log_entry(
             user=request.user,
             item=None,
@@ -1880,6 +1973,16 @@ def ocr_scan_view(request):
     }
     return render(request, "inventory/scan_invoice_page.html", context)
 
+def _scanned_total(scanned_items):
+    total = Decimal("0.00")
+    for item in scanned_items:
+        try:
+            total += Decimal(str(item.get("total_price") or 0))
+        except Exception:
+            continue
+    return total
+
+
 def extract_invoice_number(image_file):
     # Try to detect "Invoice No", "Bill No", "Quote No" etc.
     try:
@@ -1910,11 +2013,7 @@ def parse_extracted_data(text):
     items = []
     lines = text.split("\n")
 
-    # Fetch categories
-    categories = list(ItemCategory.objects.all())
-
-    # Precompute lowercase names
-    cat_names = {c.name.lower(): c.id for c in categories}
+    matcher = category_match.matcher()
 
     item_pattern = re.compile(r"(.+?)\s+(\d+)\s+([\d.]+)")
 
@@ -1927,19 +2026,8 @@ def parse_extracted_data(text):
         quantity = int(match.group(2))
         unit_price = float(match.group(3))
 
-        # Default → None (template selects "Other")
-        category_id = None
-        desc_lower = description.lower()
-
-        # ✅ 1. Exact match
-        if desc_lower in cat_names:
-            category_id = cat_names[desc_lower]
-        else:
-            # ✅ 2. Whole-word match
-            for cat in categories:
-                if re.search(rf"\b{re.escape(cat.name.lower())}\b", desc_lower):
-                    category_id = cat.id
-                    break
+        # None when nothing matches (template selects "Other")
+        category_id = matcher.match(description)
 
         items.append({
             "category_id": category_id,
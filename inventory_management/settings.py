@@ -52,8 +52,18 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'widget_tweaks',
     'crispy_forms',
+    'rest_framework',
 ]
 
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+}
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     # WhiteNoise must be first in the list for static file serving.
@@ -138,6 +148,13 @@ USE_L10N = True
 
 USE_TZ = True
 
+# The first handler hashes uploads as they stream in (see inventory.uploads); the other two are Django's defaults.
+FILE_UPLOAD_HANDLERS = [
+    'inventory.uploads.HashingUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
@@ -162,5 +179,48 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Dashboard search: 'fulltext' uses the tsvector/FTS5 index, 'icontains' the old OR of substring filters.
+INVENTORY_SEARCH_BACKEND = os.environ.get('INVENTORY_SEARCH_BACKEND', 'fulltext')
+
+# Listings with more rows than this switch from numbered pages to cursor (keyset) pages.
+INVENTORY_NUMBERED_PAGINATION_MAX_ROWS = 5000
+
+# Seconds a soft-deleted item can still be restored before `manage.py purge_deleted_items` removes it.
+INVENTORY_UNDO_WINDOW_SECONDS = int(os.environ.get('INVENTORY_UNDO_WINDOW_SECONDS', 30))
+
+# Seconds before the in-process trigram index (non-PostgreSQL "did you mean") is rebuilt from the database.
+INVENTORY_FUZZY_INDEX_TTL = int(os.environ.get('INVENTORY_FUZZY_INDEX_TTL', 300))
+
+# Spreadsheet uploads are processed by `manage.py run_import_jobs`; with this on (the default
+# in DEBUG) the web process also runs them itself on a small thread pool.
+INVENTORY_IMPORT_JOBS_IN_PROCESS = os.environ.get('INVENTORY_IMPORT_JOBS_IN_PROCESS', str(DEBUG)).lower() in ('1', 'true', 'yes')
+INVENTORY_IMPORT_WORKER_THREADS = int(os.environ.get('INVENTORY_IMPORT_WORKER_THREADS', 2))
+
+# Seconds parsed rows wait in the import staging table for review before the import worker discards them.
+INVENTORY_IMPORT_STAGING_TTL = 24 * 60 * 60
+# Staged rows shown per import review page.
+INVENTORY_IMPORT_REVIEW_PAGE_SIZE = 100
+
+# Inventory exports requested from the dashboard are built by `manage.py run_export_jobs`; with
+# this on (the default in DEBUG) the web process also builds them itself.
+INVENTORY_EXPORT_JOBS_IN_PROCESS = os.environ.get('INVENTORY_EXPORT_JOBS_IN_PROCESS', str(DEBUG)).lower() in ('1', 'true', 'yes')
+INVENTORY_EXPORT_WORKER_THREADS = int(os.environ.get('INVENTORY_EXPORT_WORKER_THREADS', 1))
+# Finished export files are reused while the items are unchanged; they are deleted after this many
+# seconds, or least recently downloaded first once together they pass INVENTORY_EXPORT_CACHE_MAX_BYTES.
+INVENTORY_EXPORT_CACHE_TTL = int(os.environ.get('INVENTORY_EXPORT_CACHE_TTL', 24 * 60 * 60))
+INVENTORY_EXPORT_CACHE_MAX_BYTES = int(os.environ.get('INVENTORY_EXPORT_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+# Extra keywords that identify a category in descriptions and invoice lines, on top of the
+# category's own name (see inventory.category_match). Keys are ItemCategory names.
+INVENTORY_CATEGORY_SYNONYMS = {
+    'Server': ['server'],
+    'Docking Station': ['docking', 'dock'],
+    'Monitor': ['monitor', 'display'],
+    'Printer': ['printer'],
+    'Cables': ['cable'],
+    'Chargers': ['charger', 'adapter'],
+    'Laptop': ['laptop', 'notebook'],
+}
+
 # Use an environment variable for the Gemini API key for security.
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")